@@ -11,6 +11,9 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 from datetime import datetime, timezone
 
+from app.game import codec
+from app.game.sqlite_store import SqliteStore, DB_FILE
+
 
 class CampaignManager:
     """Manage multiple D&D campaigns"""
@@ -43,27 +46,25 @@ class CampaignManager:
             overview_file = campaign_dir / "campaign-overview.json"
             if overview_file.exists():
                 try:
-                    with open(overview_file, 'r', encoding='utf-8') as f:
-                        overview = json.load(f)
+                    overview = codec.read_file(overview_file)
                     campaign_info["campaign_name"] = overview.get("campaign_name", "Unnamed")
                     campaign_info["current_location"] = overview.get("player_position", {}).get("current_location")
                     campaign_info["session_count"] = overview.get("session_count", 0)
-                except (json.JSONDecodeError, IOError):
+                except (codec.JSONDecodeError, IOError):
                     campaign_info["campaign_name"] = "Unknown"
 
             # Try to read character info
             char_file = campaign_dir / "character.json"
             if char_file.exists():
                 try:
-                    with open(char_file, 'r', encoding='utf-8') as f:
-                        char = json.load(f)
+                    char = codec.read_file(char_file)
                     campaign_info["character"] = {
                         "name": char.get("name", "Unknown"),
                         "race": char.get("race", "?"),
                         "class": char.get("class", "?"),
                         "level": char.get("level", 1)
                     }
-                except (json.JSONDecodeError, IOError) as e:
+                except (codec.JSONDecodeError, IOError) as e:
                     print(f"[WARNING] Could not read character for {campaign_dir.name}: {e}", file=sys.stderr)
 
             campaigns.append(campaign_info)
@@ -221,32 +222,33 @@ class CampaignManager:
         overview_file = campaign_path / "campaign-overview.json"
         if overview_file.exists():
             try:
-                with open(overview_file, 'r', encoding='utf-8') as f:
-                    info["overview"] = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
+                info["overview"] = codec.read_file(overview_file)
+            except (codec.JSONDecodeError, IOError) as e:
                 print(f"[WARNING] Could not read campaign overview for {name}: {e}", file=sys.stderr)
 
         # Read character
         char_file = campaign_path / "character.json"
         if char_file.exists():
             try:
-                with open(char_file, 'r', encoding='utf-8') as f:
-                    info["character"] = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
+                info["character"] = codec.read_file(char_file)
+            except (codec.JSONDecodeError, IOError) as e:
                 print(f"[WARNING] Could not read character for {name}: {e}", file=sys.stderr)
 
         # Count NPCs, locations, etc.
+        store = SqliteStore.for_campaign(campaign_path)
         for filename in ["npcs.json", "locations.json", "facts.json"]:
+            if store is not None:
+                info[filename.replace('.json', '_count')] = store.count(SqliteStore.table_for(filename))
+                continue
             filepath = campaign_path / filename
             if filepath.exists():
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = codec.read_file(filepath)
                     if isinstance(data, dict):
                         info[filename.replace('.json', '_count')] = len(data)
                     elif isinstance(data, list):
                         info[filename.replace('.json', '_count')] = len(data)
-                except (json.JSONDecodeError, IOError) as e:
+                except (codec.JSONDecodeError, IOError) as e:
                     print(f"[WARNING] Could not read {filename} for {name}: {e}", file=sys.stderr)
 
         # Count saves
@@ -276,6 +278,8 @@ class CampaignManager:
             campaign_name: Display name for the campaign
             preserve_existing: If True, don't overwrite files that already exist
         """
+        # Entity files of a SQLite-backed campaign live in campaign.db
+        store_backed = (campaign_path / DB_FILE).exists()
 
         # campaign-overview.json
         overview_path = campaign_path / "campaign-overview.json"
@@ -297,32 +301,27 @@ class CampaignManager:
                 "current_character": None,
                 "session_count": 0
             }
-            with open(overview_path, 'w', encoding='utf-8') as f:
-                json.dump(overview, f, indent=2)
+            codec.write_file(overview_path, overview)
 
         # npcs.json
         npcs_path = campaign_path / "npcs.json"
-        if not preserve_existing or not npcs_path.exists():
-            with open(npcs_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f, indent=2)
+        if not store_backed and (not preserve_existing or not npcs_path.exists()):
+            codec.write_file(npcs_path, {})
 
         # locations.json
         locations_path = campaign_path / "locations.json"
-        if not preserve_existing or not locations_path.exists():
-            with open(locations_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f, indent=2)
+        if not store_backed and (not preserve_existing or not locations_path.exists()):
+            codec.write_file(locations_path, {})
 
         # facts.json
         facts_path = campaign_path / "facts.json"
-        if not preserve_existing or not facts_path.exists():
-            with open(facts_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f, indent=2)
+        if not store_backed and (not preserve_existing or not facts_path.exists()):
+            codec.write_file(facts_path, {})
 
         # consequences.json
         consequences_path = campaign_path / "consequences.json"
-        if not preserve_existing or not consequences_path.exists():
-            with open(consequences_path, 'w', encoding='utf-8') as f:
-                json.dump({"active": [], "resolved": []}, f, indent=2)
+        if not store_backed and (not preserve_existing or not consequences_path.exists()):
+            codec.write_file(consequences_path, {"active": [], "resolved": []})
 
         # session-log.md - ALWAYS preserve if exists (append only)
         session_log_path = campaign_path / "session-log.md"
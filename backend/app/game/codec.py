@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+JSON codec for world-state I/O
+Uses orjson or msgspec when installed and falls back to the stdlib json module.
+All world-state reads and writes go through loads()/dumps() here.
+
+Environment:
+    ASTRAL_JSON_CODEC   auto (default), orjson, msgspec or json
+    ASTRAL_JSON_PRETTY  1 (default) writes indented files, 0 writes compact ones
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+# Decode errors from every backend are raised as json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+PRETTY = os.environ.get('ASTRAL_JSON_PRETTY', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+BACKEND = 'json'
+
+
+def is_available(name: str) -> bool:
+    """Check whether a codec backend can be used"""
+    if name == 'orjson':
+        return orjson is not None
+    if name == 'msgspec':
+        return msgspec is not None
+    return name == 'json'
+
+
+def set_backend(name: str = 'auto') -> str:
+    """
+    Select the codec backend ('auto' picks the fastest installed one)
+    Returns the backend actually in use
+    """
+    global BACKEND
+    if name == 'auto':
+        name = next(b for b in BACKENDS if is_available(b))
+    elif name not in BACKENDS:
+        print(f"[WARNING] Unknown JSON codec '{name}', using auto", file=sys.stderr)
+        return set_backend('auto')
+    elif not is_available(name):
+        print(f"[WARNING] JSON codec '{name}' is not installed, using auto", file=sys.stderr)
+        return set_backend('auto')
+    BACKEND = name
+    return BACKEND
+
+
+def _stdlib_dumps(obj: Any, pretty: bool, default: Optional[Callable]) -> bytes:
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=default)
+    return text.encode('utf-8')
+
+
+def dumps_bytes(obj: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes
+    pretty=None uses the ASTRAL_JSON_PRETTY setting; pretty output is indented by 2
+    """
+    if pretty is None:
+        pretty = PRETTY
+    try:
+        if BACKEND == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=default, option=option)
+        if BACKEND == 'msgspec':
+            data = msgspec.json.encode(obj, enc_hook=default)
+            return msgspec.json.format(data, indent=2) if pretty else data
+    except (TypeError, ValueError, OverflowError):
+        # Values the fast encoders reject (e.g. ints beyond 64 bits) fall
+        # back to the stdlib so behaviour matches json.dumps
+        pass
+    return _stdlib_dumps(obj, pretty, default)
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> str:
+    """Serialize to a JSON string (see dumps_bytes)"""
+    return dumps_bytes(obj, pretty, default).decode('utf-8')
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Parse JSON text or bytes. Raises json.JSONDecodeError on invalid input."""
+    if BACKEND == 'orjson':
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+    if BACKEND == 'msgspec':
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else '', 0) from None
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def read_file(filepath: Union[str, Path]) -> Any:
+    """Read and parse a JSON file"""
+    with open(filepath, 'rb') as f:
+        return loads(f.read())
+
+
+def write_file(filepath: Union[str, Path], obj: Any, pretty: Optional[bool] = None):
+    """Serialize obj and write it to filepath (not atomic; see JsonOperations for that)"""
+    data = dumps_bytes(obj, pretty)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+
+set_backend(os.environ.get('ASTRAL_JSON_CODEC', 'auto').strip().lower() or 'auto')
+
+
+# ==================== Benchmark ====================
+
+def benchmark(files: List[Path], rounds: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Time loads/dumps for every installed backend over a set of JSON files
+    Returns {backend: {'loads_ms', 'dumps_pretty_ms', 'dumps_compact_ms'}} per round
+    """
+    payloads = [(path, path.read_bytes()) for path in files]
+    previous = BACKEND
+    results = {}
+    try:
+        for name in BACKENDS:
+            if not is_available(name):
+                continue
+            set_backend(name)
+            parsed = [loads(raw) for _, raw in payloads]
+
+            timings = {}
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for _, raw in payloads:
+                    loads(raw)
+            timings['loads_ms'] = (time.perf_counter() - start) * 1000 / rounds
+
+            for label, pretty in (('dumps_pretty_ms', True), ('dumps_compact_ms', False)):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for doc in parsed:
+                        dumps_bytes(doc, pretty)
+                timings[label] = (time.perf_counter() - start) * 1000 / rounds
+
+            results[name] = timings
+    finally:
+        set_backend(previous)
+    return results
+
+
+def main():
+    """CLI interface: show the active codec or benchmark backends on campaign files"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='World-state JSON codec')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    subparsers.add_parser('info', help='Show the active codec')
+
+    bench_parser = subparsers.add_parser('bench', help='Benchmark installed codecs on a campaign')
+    bench_parser.add_argument('campaign_dir', nargs='?',
+                              default=str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver'),
+                              help='Campaign directory (default: bundled Lost Mine of Phandelver)')
+    bench_parser.add_argument('--rounds', type=int, default=20, help='Rounds per measurement')
+
+    args = parser.parse_args()
+
+    if args.action == 'bench':
+        campaign_dir = Path(args.campaign_dir)
+        files = sorted(p for p in campaign_dir.glob('*.json') if p.is_file())
+        if not files:
+            print(f"[ERROR] No JSON files in {campaign_dir}")
+            sys.exit(1)
+
+        total = sum(p.stat().st_size for p in files)
+        print(f"{len(files)} files, {total / 1024:.0f} KB, {args.rounds} rounds")
+        results = benchmark(files, args.rounds)
+        baseline = results['json']
+        print(f"{'codec':<10}{'loads ms':>12}{'dumps pretty':>15}{'dumps compact':>15}")
+        for name, timings in results.items():
+            print(f"{name:<10}{timings['loads_ms']:>12.2f}"
+                  f"{timings['dumps_pretty_ms']:>15.2f}{timings['dumps_compact_ms']:>15.2f}"
+                  f"   ({baseline['loads_ms'] / timings['loads_ms']:.1f}x load, "
+                  f"{baseline['dumps_pretty_ms'] / timings['dumps_pretty_ms']:.1f}x dump)")
+    else:
+        print(f"codec: {BACKEND} (pretty={PRETTY})")
+        print(f"installed: {', '.join(b for b in BACKENDS if is_available(b))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,19 +10,20 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 
 from app.game.entity_manager import EntityManager
+from app.game.json_ops import clone_json
 
 
 class ConsequenceManager(EntityManager):
     """Manage consequence/event tracking. Inherits from EntityManager for common functionality."""
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
         self.consequences_file = "consequences.json"
         self._ensure_file()
 
     def _ensure_file(self):
         """Ensure consequences file has proper structure"""
-        data = self.json_ops.load_json(self.consequences_file)
+        data = self.json_ops.load_json(self.consequences_file, readonly=True)
         if not isinstance(data, dict) or 'active' not in data:
             data = {'active': [], 'resolved': []}
             self.json_ops.save_json(self.consequences_file, data)
@@ -55,8 +56,8 @@ class ConsequenceManager(EntityManager):
         """
         Get all pending consequences
         """
-        data = self.json_ops.load_json(self.consequences_file)
-        return data.get('active', [])
+        data = self.json_ops.load_json(self.consequences_file, readonly=True)
+        return clone_json(data.get('active', []))
 
     def resolve(self, consequence_id: str) -> bool:
         """
@@ -91,8 +92,8 @@ class ConsequenceManager(EntityManager):
         """
         Get all resolved consequences
         """
-        data = self.json_ops.load_json(self.consequences_file)
-        return data.get('resolved', [])
+        data = self.json_ops.load_json(self.consequences_file, readonly=True)
+        return clone_json(data.get('resolved', []))
 
 
 def main():
@@ -5,12 +5,14 @@ Provides common initialization and CRUD patterns.
 """
 
 import sys
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from pathlib import Path
 
-from app.game.json_ops import JsonOperations
+from app.game.json_ops import JsonOperations, clone_json
 from app.game.validators import Validators
 from app.game.campaign_manager import CampaignManager
+from app.game.name_index import NameIndex
+from app.game.secondary_index import SecondaryIndex
 
 
 class EntityManager:
@@ -20,27 +22,54 @@ class EntityManager:
     to ensure consistent campaign directory handling and JSON operations.
     """
 
-    def __init__(self, world_state_dir: str = None):
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
         """Initialize the entity manager with campaign context.
 
         Args:
             world_state_dir: Base world state directory. Defaults to "world-state".
+            campaign_dir: Campaign to operate on, as a directory or a campaign ID
+                under <world_state_dir>/campaigns. When given, the global
+                active-campaign.txt is never read. Defaults to the active campaign.
 
         Raises:
-            RuntimeError: If no active campaign is set.
+            RuntimeError: If no campaign is given and no active campaign is set,
+                or the given campaign does not exist.
         """
-        base_dir = world_state_dir or "world-state"
-        self.campaign_mgr = CampaignManager(base_dir)
+        self._base_dir = world_state_dir or "world-state"
+        self._campaign_mgr = None
 
-        # Get the active campaign directory
-        active_dir = self.campaign_mgr.get_active_campaign_dir()
-
-        if active_dir is None:
-            raise RuntimeError("No active campaign. Run /new-game or /import first.")
+        if campaign_dir is not None:
+            active_dir = self._resolve_campaign_dir(self._base_dir, campaign_dir)
+        else:
+            # Fall back to the globally active campaign
+            active_dir = self.campaign_mgr.get_active_campaign_dir()
+            if active_dir is None:
+                raise RuntimeError("No active campaign. Run /new-game or /import first.")
 
         self.campaign_dir = active_dir
         self.json_ops = JsonOperations(str(active_dir))
         self.validators = Validators()
+        # Typo-tolerant name lookup, shared by every manager of this campaign
+        self.names = NameIndex.for_dir(self.json_ops.world_state_dir)
+        # Field indexes (NPC tags, plot status/type, location dungeon)
+        self.indexes = SecondaryIndex.for_dir(self.json_ops.world_state_dir)
+
+    @staticmethod
+    def _resolve_campaign_dir(base_dir: str, campaign: str) -> Path:
+        """Resolve a campaign directory path or campaign ID to an existing directory."""
+        campaign_path = Path(campaign)
+        if not campaign_path.is_dir():
+            campaign_path = Path(base_dir) / "campaigns" / str(campaign)
+        if not campaign_path.is_dir():
+            raise RuntimeError(f"Campaign '{campaign}' not found")
+        return campaign_path
+
+    @property
+    def campaign_mgr(self) -> CampaignManager:
+        """Campaign manager for the base directory (created on first use)."""
+        if self._campaign_mgr is None:
+            self._campaign_mgr = CampaignManager(self._base_dir)
+        return self._campaign_mgr
 
     def _load_entities(self, filename: str) -> dict:
         """Load entities from JSON file.
@@ -53,6 +82,14 @@ class EntityManager:
         """
         return self.json_ops.load_json(filename) or {}
 
+    def _view_entities(self, filename: str) -> dict:
+        """Load entities as a shared read-only view (no copy).
+
+        Use for scans and lookups; the returned dict must not be modified.
+        Copy anything handed back to callers with clone_json().
+        """
+        return self.json_ops.load_json(filename, readonly=True) or {}
+
     def _save_entities(self, filename: str, data: dict) -> bool:
         """Save entities to JSON file.
 
@@ -101,12 +138,11 @@ class EntityManager:
         Returns:
             True on success, False on failure.
         """
-        entities = self._load_entities(filename)
-        if name not in entities:
+        if not self._entity_exists(filename, name):
             return False
 
-        entities[name].update(updates)
-        return self._save_entities(filename, entities)
+        # Single-entity update: a row write when the campaign is SQLite-backed
+        return self.json_ops.update_json(filename, updates, [name])
 
     def _delete_entity(self, filename: str, name: str) -> bool:
         """Delete an entity.
@@ -118,34 +154,51 @@ class EntityManager:
         Returns:
             True on success, False on failure.
         """
-        entities = self._load_entities(filename)
-        if name not in entities:
-            return False
-
-        del entities[name]
-        return self._save_entities(filename, entities)
+        return self.json_ops.delete_key(filename, name)
 
     def _get_entity(self, filename: str, name: str) -> Optional[dict]:
         """Get a single entity by name.
 
         Returns the entity dict if found, None otherwise.
         """
-        entities = self._load_entities(filename)
-        return entities.get(name)
+        entities = self._view_entities(filename)
+        return clone_json(entities.get(name))
+
+    def _find_entity_name(self, filename: str, name: str, fuzzy: bool = True) -> Optional[str]:
+        """Find actual entity key, tolerating case, punctuation, aliases and typos.
+
+        Args:
+            filename: Name of the JSON file
+            name: Name as given by the caller
+            fuzzy: Also accept a clear-winner trigram match for misspellings
+
+        Returns:
+            The actual key name if found (exact match preferred), None otherwise.
+        """
+        return self.names.resolve(self.json_ops, filename, name, fuzzy)
+
+    def _suggest_names(self, filename: str, name: str, limit: int = 5) -> List[str]:
+        """Closest existing entity names for a failed lookup, best first."""
+        return self.names.suggest(self.json_ops, filename, name, limit)
+
+    def _report_missing(self, label: str, filename: str, name: str):
+        """Print a not-found error with "did you mean" suggestions."""
+        suggestions = self._suggest_names(filename, name)
+        hint = f" (did you mean: {', '.join(suggestions)}?)" if suggestions else ""
+        print(f"[ERROR] {label} '{name}' not found{hint}")
+
+    def transaction(self):
+        """Batch every load/modify/save in a block into one atomic commit.
 
-    def _find_entity_name(self, filename: str, name: str) -> Optional[str]:
-        """Find actual entity key using case-insensitive matching.
+        Usage:
+            with manager.transaction():
+                ...  # saves are staged in memory and visible to later loads
 
-        Returns the actual key name if found (exact match preferred), None otherwise.
+        All staged files are committed together behind a single fsync'd
+        write-ahead journal. Nested transactions join the outer one, and an
+        exception inside the block discards every staged write.
         """
-        entities = self._load_entities(filename)
-        if name in entities:
-            return name
-        name_lower = name.lower()
-        for key in entities:
-            if key.lower() == name_lower:
-                return key
-        return None
+        return self.json_ops.transaction()
 
     def get_timestamp(self) -> str:
         """Get current UTC timestamp in ISO format."""
@@ -153,5 +206,5 @@ class EntityManager:
 
     @property
     def campaign_name(self) -> Optional[str]:
-        """Get the name of the active campaign."""
-        return self.campaign_mgr.get_active()
+        """Get the name of the campaign this manager operates on."""
+        return self.campaign_dir.name
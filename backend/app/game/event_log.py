@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Append-only event journal for entity histories
+NPC and plot events are appended to events.jsonl as one line each instead of
+rewriting the entity file, merged into loaded documents on read, and
+periodically compacted back into the snapshot files
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import codec
+
+
+EVENTS_FILE = "events.jsonl"
+
+# Fold the journal back into the snapshot files once this many events are pending
+COMPACT_THRESHOLD = 200
+
+_logs: Dict[str, "EventLog"] = {}
+_logs_lock = threading.Lock()
+
+
+def overlay_events(data: Dict[str, Any], pending: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Append pending events (entity -> [event, ...]) to the entities' 'events' lists
+    Returns a new top-level dict; only the affected entities are copied
+    """
+    merged = dict(data)
+    for entity, events in pending.items():
+        current = merged.get(entity)
+        if not isinstance(current, dict):
+            continue  # entity missing from (or deleted in) the snapshot
+        entity_copy = dict(current)
+        existing = entity_copy.get('events')
+        existing = list(existing) if isinstance(existing, list) else []
+        # A crash between a snapshot write and its journal discard can
+        # leave events in both places; they sit at the snapshot's tail
+        tail = existing[-len(events):]
+        existing.extend(event for event in events if event not in tail)
+        entity_copy['events'] = existing
+        merged[entity] = entity_copy
+    return merged
+
+
+class EventLog:
+    """Per-campaign event journal. Use EventLog.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / EVENTS_FILE
+        self._lock = threading.RLock()
+        # Parsed journal: filename -> entity -> [event, ...]
+        self._pending: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._count = 0
+        self._offset = 0
+        self._inode = None
+        self._generation = 0
+        # filename -> (base document, generation, merged document)
+        self._merged: Dict[str, Tuple[Any, int, Any]] = {}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "EventLog":
+        """Get the shared event log for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _logs_lock:
+            log = _logs.get(key)
+            if log is None:
+                log = cls(Path(key))
+                _logs[key] = log
+            return log
+
+    # ==================== Journal I/O ====================
+
+    def _reset(self):
+        self._pending = {}
+        self._count = 0
+        self._offset = 0
+        self._inode = None
+        self._generation += 1
+        self._merged.clear()
+
+    def _refresh(self):
+        """Read any lines appended since the last refresh (re-read fully if the file was replaced)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._inode is not None or self._count:
+                self._reset()
+            return
+
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read(st.st_size - self._offset)
+
+        # Only consume complete lines; a torn trailing line is re-read later
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = codec.loads(line)
+                filename, entity, event = record['file'], record['entity'], record['event']
+            except (codec.JSONDecodeError, KeyError, TypeError) as e:
+                print(f"[WARNING] Skipping corrupt line in {self.path.name}: {e}")
+                continue
+            self._pending.setdefault(filename, {}).setdefault(entity, []).append(event)
+            self._count += 1
+
+        self._offset += end
+        self._generation += 1
+
+    def append(self, filename: str, entity: str, event: Dict[str, Any]) -> int:
+        """
+        Append one event for an entity in filename
+        Returns the number of pending (uncompacted) events
+        """
+        return self.append_many([(filename, entity, event)])
+
+    def append_many(self, records: List[Tuple[str, str, Dict[str, Any]]], txn: Optional[str] = None) -> int:
+        """
+        Append (filename, entity, event) records in one write
+        txn tags the lines with the transaction that wrote them (see has_transaction)
+        Returns the number of pending (uncompacted) events
+        """
+        tag = {'txn': txn} if txn else {}
+        lines = b''.join(
+            codec.dumps_bytes({'file': filename, 'entity': entity, 'event': event, **tag}, pretty=False) + b'\n'
+            for filename, entity, event in records
+        )
+        with self._lock:
+            # O_APPEND keeps concurrent writers from interleaving within a line
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, lines)
+            finally:
+                os.close(fd)
+            self._refresh()
+            return self._count
+
+    def has_transaction(self, txn: Optional[str]) -> bool:
+        """Whether lines tagged with transaction txn are in the journal (replays check this)"""
+        if not txn:
+            return False
+        needle = codec.dumps_bytes({'txn': txn}, pretty=False)[1:-1]
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    return needle in f.read()
+            except FileNotFoundError:
+                return False
+
+    def discard(self, filename: str):
+        """Drop all pending events for filename (its snapshot now contains them)"""
+        with self._lock:
+            self._refresh()
+            if filename not in self._pending:
+                return
+
+            remaining = []
+            for name, entities in self._pending.items():
+                if name == filename:
+                    continue
+                for entity, events in entities.items():
+                    for event in events:
+                        remaining.append({'file': name, 'entity': entity, 'event': event})
+
+            if remaining:
+                fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{EVENTS_FILE}.", suffix='.tmp')
+                temp_path = Path(temp_name)
+                os.chmod(temp_path, 0o644)
+                with os.fdopen(fd, 'wb') as f:
+                    for record in remaining:
+                        f.write(codec.dumps_bytes(record, pretty=False) + b'\n')
+                temp_path.replace(self.path)
+            else:
+                self.path.unlink(missing_ok=True)
+            self._reset()
+            self._refresh()
+
+    # ==================== Views ====================
+
+    def pending_count(self, filename: Optional[str] = None) -> int:
+        """Number of uncompacted events (for one file, or overall)"""
+        with self._lock:
+            self._refresh()
+            if filename is None:
+                return self._count
+            return sum(len(events) for events in self._pending.get(filename, {}).values())
+
+    def pending_files(self) -> List[str]:
+        """Files that have uncompacted events"""
+        with self._lock:
+            self._refresh()
+            return list(self._pending.keys())
+
+    def version(self) -> Tuple[Optional[int], int]:
+        """Change token for the journal (inode, consumed offset)"""
+        with self._lock:
+            self._refresh()
+            return (self._inode, self._offset)
+
+    def merge(self, filename: str, data: Any, cache: bool = True) -> Any:
+        """
+        Overlay pending events onto a loaded document
+        Returns data unchanged if nothing is pending. Otherwise returns a new
+        top-level dict that shares every untouched entity with data; only the
+        affected entities are copied. With cache=True the result is kept until
+        the base document or the journal changes.
+        """
+        with self._lock:
+            self._refresh()
+            pending = self._pending.get(filename)
+            if not pending or not isinstance(data, dict):
+                return data
+
+            cached = self._merged.get(filename) if cache else None
+            if cached is not None and cached[0] is data and cached[1] == self._generation:
+                return cached[2]
+
+            merged = overlay_events(data, pending)
+
+            if cache:
+                self._merged[filename] = (data, self._generation, merged)
+            return merged
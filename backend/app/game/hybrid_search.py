@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Hybrid retrieval over world state and imported source material
+Fuses BM25 hits on world-state entities with vector hits on the module chunks
+stored by the import pipeline (reciprocal rank fusion), then trims the fused
+list to a token budget. Falls back to BM25 alone when no vector engine or
+sentence-transformers is installed or the campaign has no vectors.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import codec
+from app.game.search_index import SearchIndex, DEFAULT_LIMIT
+
+
+# Reciprocal rank fusion: score = sum(weight / (RRF_K + rank)) over result lists
+RRF_K = 60
+LEXICAL_WEIGHT = 1.0
+SEMANTIC_WEIGHT = 1.0
+
+# Budget for one fused result, estimated at CHARS_PER_TOKEN characters per token
+DEFAULT_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+
+# Source chunks are cut to this many characters in results
+SOURCE_EXCERPT_CHARS = 1200
+
+# Chunks fetched from the vector store per query
+VECTOR_CANDIDATES = 8
+
+# Cached query embeddings (process-wide) and vector results (per campaign)
+EMBEDDING_CACHE_SIZE = 512
+RESULT_CACHE_SIZE = 256
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+_embeddings_lock = threading.Lock()
+_embedding_stats = {'hits': 0, 'misses': 0}
+
+
+def semantic_key(query: str) -> str:
+    """
+    Cache key for the vector side of a query: lowercased, whitespace collapsed
+    Unlike normalize_query (BM25 terms), stopwords, word order and stemming
+    still change the embedding, so they stay in the key
+    """
+    return " ".join(query.lower().split())
+
+
+def _get_embedder():
+    """Lazy-init singleton LocalEmbedder, or None if sentence-transformers is missing"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            try:
+                from app.import_pipeline.embedder import LocalEmbedder
+            except ImportError:
+                return None
+            if not LocalEmbedder.is_available():
+                return None
+            _embedder = LocalEmbedder()
+        return _embedder
+
+
+def embed_query(query: str) -> Optional[List[float]]:
+    """Embedding for a query, cached by semantic_key (None if no embedder)"""
+    key = semantic_key(query)
+    with _embeddings_lock:
+        cached = _embeddings.get(key)
+        if cached is not None:
+            _embeddings.move_to_end(key)
+            _embedding_stats['hits'] += 1
+            return cached
+        _embedding_stats['misses'] += 1
+
+    embedder = _get_embedder()
+    if embedder is None:
+        return None
+    vector = embedder.embed(query).tolist()
+
+    with _embeddings_lock:
+        _embeddings[key] = vector
+        while len(_embeddings) > EMBEDDING_CACHE_SIZE:
+            _embeddings.popitem(last=False)
+    return vector
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count of a value as it will be sent to the model"""
+    return len(codec.dumps_bytes(value, pretty=False)) // CHARS_PER_TOKEN + 1
+
+
+class HybridRetriever:
+    """BM25 + vector retriever for one campaign"""
+
+    def __init__(self, campaign_dir: Path, index: SearchIndex):
+        self.campaign_dir = Path(campaign_dir)
+        self.vectors_dir = self.campaign_dir / "vectors"
+        self.index = index
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # (query key, n) -> (vectors stamp, hits)
+        self._results: "OrderedDict[Tuple[str, int], Tuple[tuple, List[Dict[str, Any]]]]" = OrderedDict()
+        self.stats = {'vector_queries': 0, 'vector_cache_hits': 0, 'vector_errors': 0}
+
+    # ==================== Semantic side ====================
+
+    def _vector_store(self):
+        """The campaign's CampaignVectorStore, or None if vectors can't be queried"""
+        if not self.vectors_dir.is_dir():
+            return None
+        with self._store_lock:
+            if self._store is None:
+                try:
+                    from app.import_pipeline.vector_store import CampaignVectorStore
+                except ImportError:
+                    return None
+                if not CampaignVectorStore.is_available():
+                    return None
+                self._store = CampaignVectorStore(str(self.campaign_dir))
+            return self._store
+
+    def semantic_available(self) -> bool:
+        """Whether vector search can run for this campaign"""
+        return self._vector_store() is not None and _get_embedder() is not None
+
+    def vectors_stamp(self) -> tuple:
+        """Change token for the persisted vectors (they only change on re-import)"""
+        stamp = []
+        # ChromaDB's database and the local index's row table
+        for path in (self.vectors_dir / "chroma.sqlite3", self.vectors_dir / "document_chunks" / "index.json"):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append((0, 0))
+        return tuple(stamp)
+
+    def vector_hits(self, query: str, n: int = VECTOR_CANDIDATES) -> List[Dict[str, Any]]:
+        """Closest source chunks as [{'id', 'text', 'metadata', 'distance'}], best first"""
+        if not self.semantic_available():
+            return []
+
+        key = (semantic_key(query), n)
+        stamp = self.vectors_stamp()
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._results.move_to_end(key)
+                self.stats['vector_cache_hits'] += 1
+                return cached[1]
+
+        vector = embed_query(query)
+        if vector is None:
+            return []
+        try:
+            raw = self._vector_store().query_similar(vector, n_results=n)
+        except Exception as e:
+            # A broken or empty collection shouldn't fail the lexical half
+            print(f"[WARNING] Vector search failed: {e}")
+            self.stats['vector_errors'] += 1
+            return []
+
+        hits = [
+            {
+                'id': chunk_id,
+                'text': raw['documents'][i],
+                'metadata': raw['metadatas'][i] if raw['metadatas'] else {},
+                'distance': raw['distances'][i] if raw['distances'] else 0.0,
+            }
+            for i, chunk_id in enumerate(raw['ids'])
+        ]
+        with self._lock:
+            self.stats['vector_queries'] += 1
+            self._results[key] = (stamp, hits)
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return hits
+
+    # ==================== Fusion ====================
+
+    def search(self, json_ops, query: str, limit: int = DEFAULT_LIMIT) -> List[Tuple[str, Any, float]]:
+        """
+        Fused ranking of world-state entities and source chunks
+        Returns up to limit hits as ('world', (kind, key, position), score)
+        or ('source', chunk, score), best first
+        """
+        lexical = self.index.search(json_ops, query, limit=limit)
+        semantic = self.vector_hits(query, min(limit, VECTOR_CANDIDATES))
+
+        fused: Dict[Tuple[str, Any], Tuple[float, Any]] = {}
+        for rank, (kind, key, position, _) in enumerate(lexical, 1):
+            fused[('world', (kind, key, position))] = (LEXICAL_WEIGHT / (RRF_K + rank), (kind, key, position))
+        for rank, chunk in enumerate(semantic, 1):
+            ident = ('source', chunk['id'])
+            previous = fused.get(ident, (0.0, chunk))[0]
+            fused[ident] = (previous + SEMANTIC_WEIGHT / (RRF_K + rank), chunk)
+
+        ranked = sorted(fused.items(), key=lambda item: -item[1][0])[:limit]
+        return [(ident[0], payload, score) for ident, (score, payload) in ranked]
+
+
+def main():
+    """CLI interface: run a hybrid query against a campaign"""
+    import argparse
+    import sys
+    import time
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='Hybrid world-state and source search')
+    parser.add_argument('query', nargs='+', help='Search query')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='Maximum hits')
+
+    args = parser.parse_args()
+
+    json_ops = JsonOperations(args.campaign_dir)
+    retriever = HybridRetriever(Path(args.campaign_dir), SearchIndex.for_dir(Path(args.campaign_dir)))
+    if not retriever.semantic_available():
+        print("[WARNING] Vector search unavailable; showing BM25 results only", file=sys.stderr)
+
+    query = ' '.join(args.query)
+    start = time.perf_counter()
+    hits = retriever.search(json_ops, query, args.limit)
+    elapsed = (time.perf_counter() - start) * 1000
+    for source, payload, score in hits:
+        if source == 'world':
+            kind, key, _ = payload
+            print(f"  {score:.4f}  {kind:<13}{key}")
+        else:
+            print(f"  {score:.4f}  {'source':<13}{payload['id']}: {payload['text'][:60]!r}")
+    print(f"{len(hits)} hits in {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
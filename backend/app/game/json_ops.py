@@ -4,12 +4,403 @@ JSON operations module for DM tools
 Provides safe JSON read/write/update operations with proper error handling
 """
 
+import functools
 import json
 import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Iterable, Optional, Tuple, Union
 from datetime import datetime, timezone
 
+from app.game import codec
+from app.game.sqlite_store import SqliteStore, DB_FILE
+from app.game.event_log import EventLog, COMPACT_THRESHOLD, overlay_events
+from app.game.locks import get_campaign_lock
+
+
+# Process-wide cache of parsed documents: abs path -> (mtime_ns, size, data)
+CACHE_MAX_ENTRIES = 256
+_doc_cache: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+_doc_cache_lock = threading.Lock()
+_doc_cache_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+# Per-campaign world-state versions: abs dir -> [version, {filename: stamp last seen}]
+_world_versions: Dict[str, List[Any]] = {}
+_world_versions_lock = threading.Lock()
+
+
+def clone_json(data: Any) -> Any:
+    """Copy a JSON-shaped value (dicts, lists, scalars). Faster than deepcopy."""
+    if isinstance(data, dict):
+        return {k: clone_json(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [clone_json(v) for v in data]
+    return data
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Get document cache counters (hits, misses, writes, evictions, entries)"""
+    with _doc_cache_lock:
+        stats = dict(_doc_cache_stats)
+        stats['entries'] = len(_doc_cache)
+    return stats
+
+
+def clear_cache():
+    """Drop all cached documents and reset counters"""
+    with _doc_cache_lock:
+        _doc_cache.clear()
+        for key in _doc_cache_stats:
+            _doc_cache_stats[key] = 0
+
+
+def _cache_put(key: str, mtime_ns: int, size: int, data: Any):
+    """Store a parsed document, evicting the least recently used entry if full"""
+    with _doc_cache_lock:
+        _doc_cache[key] = (mtime_ns, size, data)
+        _doc_cache.move_to_end(key)
+        while len(_doc_cache) > CACHE_MAX_ENTRIES:
+            _doc_cache.popitem(last=False)
+            _doc_cache_stats['evictions'] += 1
+
+
+def _write_file(filepath: Path, data: Any, indent: int = 2, sync: bool = False,
+                cache: bool = True) -> os.stat_result:
+    """Write JSON to a temp file and rename it over filepath. Returns the new file's stat."""
+    # indent=None asks for compact output; otherwise the codec's pretty setting applies
+    payload = codec.dumps_bytes(data, pretty=None if indent else False)
+    # Unique temp name so concurrent writers never share (and clobber) a temp file
+    fd, temp_name = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix='.tmp')
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # mkstemp creates 0600; keep the replaced file's mode (or a normal 0644)
+            try:
+                mode = os.stat(filepath).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            f.write(payload)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+
+        # Atomic rename (keeps the temp file's mtime and size)
+        temp_path.replace(filepath)
+    except Exception:
+        # Clean up temp file if it exists
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+
+    # Write through to the document cache
+    if cache:
+        _cache_put(os.path.abspath(filepath), st.st_mtime_ns, st.st_size, clone_json(data))
+        with _doc_cache_lock:
+            _doc_cache_stats['writes'] += 1
+    return st
+
+
+def _fsync_dir(directory: Path):
+    """Flush directory entries (renames) to disk where the platform allows it"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Write-ahead journal for multi-file transactions, kept in the campaign directory
+JOURNAL_FILE = ".transaction-journal.json"
+
+_active_transaction: ContextVar[Optional["Transaction"]] = ContextVar("json_ops_transaction", default=None)
+
+
+class Transaction:
+    """Unit of work that batches document saves across files.
+
+    Saves made while the transaction is active are staged in memory (and
+    visible to loads in the same context). commit() writes every staged
+    document in one go:
+
+    1. The full set of documents is written to a journal file and fsynced.
+       This is the single durability barrier; once it lands the commit is
+       decided.
+    2. Each document is renamed into place and the directory is fsynced,
+       then staged entity events are appended to the event journal (so an
+       event-only transaction never rewrites a snapshot file).
+    3. The journal is removed.
+
+    If step 2 fails it is retried once; if it still fails commit() raises
+    and the journal stays behind. A crash between 1 and 3 leaves it behind
+    too. Either way it is replayed before the next write to the directory
+    (and when a JsonOperations is opened on it), so a pending journal is
+    never overwritten and never replayed over newer data.
+    """
+
+    def __init__(self, journal_path: Path):
+        self.journal_path = journal_path
+        self._staged: "OrderedDict[str, Tuple[Any, int, Optional[Tuple[str, str]]]]" = OrderedDict()
+        # (filename, entity, event) lines for the event journal
+        self._events: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, data) for a staged document"""
+        with self._lock:
+            if key in self._staged:
+                return True, self._staged[key][0]
+        return False, None
+
+    def stage(self, key: str, data: Any, indent: int = 2, table: Tuple[str, str] = None):
+        """
+        Stage a document write (the transaction keeps its own copy)
+        table is (db_path, table_name) for documents stored in SQLite
+        """
+        with self._lock:
+            self._staged[key] = (clone_json(data), indent, table)
+
+    def stage_event(self, filename: str, entity: str, event: Dict[str, Any]):
+        """Stage an event journal line for an entity in filename"""
+        with self._lock:
+            self._events.append((filename, entity, clone_json(event)))
+
+    def events_for(self, filename: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Staged events for filename, as entity -> [event, ...]"""
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for name, entity, event in self._events:
+                if name == filename:
+                    pending.setdefault(entity, []).append(event)
+        return pending
+
+    @property
+    def staged_files(self) -> List[str]:
+        """Absolute paths of the documents that will be written on commit"""
+        with self._lock:
+            return list(self._staged.keys())
+
+    def commit(self) -> bool:
+        """Write all staged documents atomically.
+
+        Returns False if the journal could not be written (nothing applied).
+        Raises IOError if the journal was written but could not be applied.
+        """
+        with self._lock:
+            staged = list(self._staged.items())
+            events = self._events
+            self._staged.clear()
+            self._events = []
+        if not staged and not events:
+            return True
+
+        directory = self.journal_path.parent
+        # A journal left by an earlier failed commit must land first
+        recover_transactions(directory)
+
+        journal = {
+            'id': uuid.uuid4().hex,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'files': [],
+            'events': [],
+        }
+        for path, (data, indent, table) in staged:
+            entry = {'path': path, 'indent': indent, 'data': data}
+            if table:
+                entry['db'], entry['table'] = table
+            journal['files'].append(entry)
+        # Events for a document rewritten here are already in its snapshot
+        # (loads inside the transaction saw them merged in)
+        rewritten = {os.path.basename(path) for path, _ in staged
+                     if os.path.dirname(path) == os.path.abspath(directory)}
+        journal['events'] = [list(record) for record in events if record[0] not in rewritten]
+
+        try:
+            _write_file(self.journal_path, journal, indent=None, sync=True, cache=False)
+            _fsync_dir(directory)
+        except Exception as e:
+            print(f"[ERROR] Failed to write transaction journal: {e}")
+            return False
+
+        try:
+            _apply_journal(journal, directory)
+        except Exception as e:
+            print(f"[WARNING] Failed to apply transaction, retrying: {e}")
+            try:
+                _apply_journal(journal, directory, replay=True)
+            except Exception as e:
+                raise IOError(f"Transaction journaled but not applied ({e}); "
+                              f"it is replayed before the next write") from e
+
+        self.journal_path.unlink(missing_ok=True)
+        return True
+
+    def rollback(self):
+        """Discard all staged writes"""
+        with self._lock:
+            self._staged.clear()
+            self._events.clear()
+
+
+def _apply_journal(journal: Dict[str, Any], directory: Path, replay: bool = False):
+    """
+    Rename every journaled document into place, fsync the directories, then
+    append the journaled events. Safe to repeat: with replay=True events
+    already appended by an earlier attempt are not appended again.
+    """
+    directory = Path(os.path.abspath(directory))
+    directories = set()
+    databases: Dict[str, Dict[str, Any]] = {}
+    for entry in journal.get('files', []):
+        if entry.get('table'):
+            databases.setdefault(entry['db'], {})[entry['table']] = entry['data']
+            continue
+        filepath = Path(entry['path'])
+        _write_file(filepath, entry['data'], indent=entry.get('indent', 2))
+        directories.add(filepath.parent)
+    for db_path, documents in databases.items():
+        SqliteStore.open(Path(db_path)).save_documents(documents)
+    for path in directories:
+        _fsync_dir(path)
+
+    # A full snapshot write of a file supersedes its journaled events
+    events = EventLog.for_dir(directory)
+    for entry in journal.get('files', []):
+        filepath = Path(entry['path'])
+        if filepath.parent == directory:
+            events.discard(filepath.name)
+    records = [tuple(record) for record in journal.get('events', [])]
+    if records and not (replay and events.has_transaction(journal.get('id'))):
+        events.append_many(records, txn=journal.get('id'))
+
+
+def recover_transactions(directory: Path) -> bool:
+    """Replay a journal left behind by an interrupted or failed commit.
+
+    Returns True if a journal was found and replayed. Raises OSError (or
+    sqlite3.Error) if it still can't be applied; the journal is kept.
+    """
+    journal_path = Path(directory) / JOURNAL_FILE
+    if not journal_path.exists():
+        return False
+
+    try:
+        journal = codec.read_file(journal_path)
+    except (json.JSONDecodeError, IOError) as e:
+        # The journal is written via temp file + rename, so a torn journal
+        # means the commit never happened; nothing was applied.
+        print(f"[WARNING] Discarding unreadable transaction journal in {directory}: {e}")
+        journal_path.unlink(missing_ok=True)
+        return False
+
+    _apply_journal(journal, Path(directory), replay=True)
+    journal_path.unlink(missing_ok=True)
+    print(f"[INFO] Replayed interrupted transaction ({len(journal.get('files', []))} files) in {directory}")
+    return True
+
+
+def _apply_update(data: Any, updates: Any, path: List[str] = None) -> Any:
+    """Apply update_json semantics to a loaded document. Returns the new document."""
+    if path:
+        # Navigate to nested path
+        current = data
+        for key in path[:-1]:
+            if key not in current:
+                current[key] = {}
+            current = current[key]
+
+        # Update at the target path
+        if isinstance(updates, dict) and isinstance(current.get(path[-1]), dict):
+            current[path[-1]].update(updates)
+        else:
+            current[path[-1]] = updates
+    else:
+        # Update root level
+        if isinstance(data, dict) and isinstance(updates, dict):
+            data.update(updates)
+        else:
+            data = updates
+    return data
+
+
+def _apply_append(data: Any, item: Any, path: List[str], filename: str) -> bool:
+    """Apply append_to_list semantics to a loaded document in place"""
+    if path:
+        # Navigate to nested path
+        current = data
+        for key in path[:-1]:
+            if key not in current:
+                current[key] = {}
+            current = current[key]
+
+        # Ensure target is a list
+        if path[-1] not in current:
+            current[path[-1]] = []
+        if not isinstance(current[path[-1]], list):
+            print(f"[ERROR] Target at {'.'.join(path)} is not a list")
+            return False
+
+        current[path[-1]].append(item)
+    else:
+        # Root must be a list
+        if not isinstance(data, list):
+            print(f"[ERROR] Root of {filename} is not a list")
+            return False
+        data.append(item)
+    return True
+
+
+def _apply_delete(data: Any, key: str, path: List[str] = None) -> bool:
+    """Apply delete_key semantics to a loaded document in place"""
+    if path:
+        # Navigate to nested path
+        current = data
+        for p in path[:-1]:
+            if not isinstance(current, dict) or p not in current:
+                return False
+            current = current[p]
+
+        if isinstance(current.get(path[-1]), dict) and key in current[path[-1]]:
+            del current[path[-1]][key]
+        else:
+            return False
+    else:
+        if isinstance(data, dict) and key in data:
+            del data[key]
+        else:
+            return False
+    return True
+
+
+def _locked(method):
+    """
+    Run a JsonOperations read-modify-write method under the campaign lock
+    The world version is bumped once the write has landed
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock.hold():
+            # Never write on top of a half-applied transaction
+            if not self._recover():
+                return False
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._bump_version()
+    return wrapper
+
 
 class JsonOperations:
     """Safe JSON file operations for world state management"""
@@ -17,22 +408,100 @@ class JsonOperations:
     def __init__(self, world_state_dir: str = "world-state"):
         self.world_state_dir = Path(world_state_dir)
         self.world_state_dir.mkdir(parents=True, exist_ok=True)
+        # Campaigns imported into SQLite keep their entity files in campaign.db
+        self.store = SqliteStore.for_campaign(self.world_state_dir)
+        # Entity history events are journaled here and merged on load
+        self.events = EventLog.for_dir(self.world_state_dir)
+        # Serializes writers to this campaign across threads and processes
+        self.lock = get_campaign_lock(self.world_state_dir)
+        with self.lock.hold():
+            self._recover()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Batch every save made inside the block into one atomic commit.
+        Nested calls join the outer transaction. If the block raises, all
+        staged writes are discarded. The campaign lock is held from start to
+        commit, so load/modify/save sequences inside cannot interleave with
+        other writers.
+        """
+        current = _active_transaction.get()
+        if current is not None:
+            yield current
+            return
+
+        with self.lock.hold():
+            if not self._recover():
+                raise IOError(f"Pending transaction in {self.world_state_dir} could not be applied")
+            txn = Transaction(self.world_state_dir / JOURNAL_FILE)
+            token = _active_transaction.set(txn)
+            try:
+                yield txn
+            except BaseException:
+                txn.rollback()
+                raise
+            finally:
+                _active_transaction.reset(token)
+            try:
+                if not txn.commit():
+                    raise IOError("Transaction commit failed")
+            finally:
+                self._bump_version()
+            if self.events.pending_count() >= COMPACT_THRESHOLD:
+                self.compact_events()
+
+    def _recover(self) -> bool:
+        """
+        Replay a transaction journal left in the directory, if any
+        Returns False if it still can't be applied (callers must not write)
+        """
+        if _active_transaction.get() is not None or not (self.world_state_dir / JOURNAL_FILE).exists():
+            return True
+        try:
+            recover_transactions(self.world_state_dir)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[ERROR] Pending transaction in {self.world_state_dir} could not be applied: {e}")
+            return False
+        finally:
+            self._bump_version()
+        return True
 
-    def load_json(self, filename: str, default: Any = None) -> Any:
+    def load_json(self, filename: str, default: Any = None, readonly: bool = False) -> Any:
         """
         Load JSON file with error handling
         Returns default value if file doesn't exist or is invalid
+
+        Parsed documents are cached process-wide and revalidated against the
+        file's mtime and size. Callers get a private copy they may mutate;
+        pass readonly=True to get the shared cached object instead (cheaper,
+        but it must not be modified). Entity files of a campaign imported into
+        SQLite are assembled from campaign.db instead.
         """
         filepath = self._resolve_path(filename)
 
-        if not filepath.exists():
+        txn = _active_transaction.get()
+        if txn is not None:
+            found, data = txn.get(os.path.abspath(filepath))
+            if found:
+                return data if readonly else clone_json(data)
+
+        table = self._store_table(filepath)
+        if table:
+            try:
+                data = self.store.load_document(table)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Failed to read {filename} from {DB_FILE}: {e}")
+                return default if default is not None else {}
+            data = self._merge_events(filepath, data)
+            return data if readonly else clone_json(data)
+
+        try:
+            data = self._load_cached(filepath)
+        except FileNotFoundError:
             if default is None:
                 default = {}
             return default
-
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
         except json.JSONDecodeError as e:
             print(f"[ERROR] Invalid JSON in {filename}: {e}")
             return default if default is not None else {}
@@ -40,89 +509,139 @@ class JsonOperations:
             print(f"[ERROR] Failed to read {filename}: {e}")
             return default if default is not None else {}
 
+        data = self._merge_events(filepath, data)
+        return data if readonly else clone_json(data)
+
+    def _load_cached(self, filepath: Path) -> Any:
+        """Return the parsed document for filepath, re-reading only if it changed on disk"""
+        st = os.stat(filepath)
+        key = os.path.abspath(filepath)
+
+        with _doc_cache_lock:
+            entry = _doc_cache.get(key)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                _doc_cache.move_to_end(key)
+                _doc_cache_stats['hits'] += 1
+                return entry[2]
+            _doc_cache_stats['misses'] += 1
+
+        data = codec.read_file(filepath)
+        _cache_put(key, st.st_mtime_ns, st.st_size, data)
+        return data
+
+    def stamp(self, filename: str) -> Optional[tuple]:
+        """
+        Change token for the document load_json(filename) would return
+        Differs whenever the file, its SQLite table or its journaled events
+        change. None while a transaction has the file staged (not settled yet),
+        so derived indexes must re-check the contents.
+        """
+        filepath = self._resolve_path(filename)
+
+        txn = _active_transaction.get()
+        if txn is not None and (txn.get(os.path.abspath(filepath))[0] or txn.events_for(filepath.name)):
+            return None
+
+        if self._store_table(filepath):
+            base = self.store.version()
+        else:
+            try:
+                st = os.stat(filepath)
+                base = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                base = None
+
+        if filepath.parent != self.world_state_dir:
+            return (base, None)
+        inode, _ = self.events.version()
+        return (base, inode, self.events.pending_count(filepath.name))
+
+    def version(self, filenames: Iterable[str] = ()) -> Optional[int]:
+        """
+        Monotonic world-state version of this campaign
+        Every write through a JsonOperations in this process bumps it; files in
+        filenames are also stamp-checked, so writes by other processes bump it
+        too. None inside a transaction (staged writes aren't settled), so
+        results computed there must not be cached.
+        """
+        if _active_transaction.get() is not None:
+            return None
+        stamps = {filename: self.stamp(filename) for filename in filenames}
+        key = os.path.abspath(self.world_state_dir)
+        with _world_versions_lock:
+            entry = _world_versions.setdefault(key, [0, {}])
+            seen = entry[1]
+            if any(seen.get(filename, stamp) != stamp for filename, stamp in stamps.items()):
+                entry[0] += 1
+            seen.update(stamps)
+            return entry[0]
+
+    def _bump_version(self):
+        """Mark the world state changed (see version())"""
+        key = os.path.abspath(self.world_state_dir)
+        with _world_versions_lock:
+            _world_versions.setdefault(key, [0, {}])[0] += 1
+
+    @_locked
     def save_json(self, filename: str, data: Any, indent: int = 2) -> bool:
         """
         Save data to JSON file with atomic write
         Returns True on success, False on failure
+        Inside a transaction() the write is staged until commit
         """
         filepath = self._resolve_path(filename)
+        table = self._store_table(filepath)
 
-        try:
-            # Write to temp file first for atomic operation
-            temp_path = filepath.with_suffix('.tmp')
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=False)
+        txn = _active_transaction.get()
+        if txn is not None:
+            store_ref = (str(self.store.db_path), table) if table else None
+            txn.stage(os.path.abspath(filepath), data, indent, store_ref)
+            return True
 
-            # Atomic rename
-            temp_path.replace(filepath)
+        if table:
+            if not self._store_call(filename, self.store.save_document, table, data):
+                return False
+            self._discard_events(filepath)
+            return True
+
+        try:
+            _write_file(filepath, data, indent)
+            self._discard_events(filepath)
             return True
         except Exception as e:
             print(f"[ERROR] Failed to save {filename}: {e}")
-            # Clean up temp file if it exists
-            temp_path = filepath.with_suffix('.tmp')
-            if temp_path.exists():
-                temp_path.unlink()
             return False
 
+    @_locked
     def update_json(self, filename: str, updates: Dict, path: List[str] = None) -> bool:
         """
         Update JSON file with partial data
         If path is provided, updates nested structure at that path
         """
-        data = self.load_json(filename)
-
-        if path:
-            # Navigate to nested path
-            current = data
-            for key in path[:-1]:
-                if key not in current:
-                    current[key] = {}
-                current = current[key]
-
-            # Update at the target path
-            if isinstance(updates, dict) and isinstance(current.get(path[-1]), dict):
-                current[path[-1]].update(updates)
-            else:
-                current[path[-1]] = updates
-        else:
-            # Update root level
-            if isinstance(data, dict) and isinstance(updates, dict):
-                data.update(updates)
-            else:
-                data = updates
+        table = self._row_table(filename)
+        if table:
+            if path:
+                return self._update_row(table, path[0], lambda doc: _apply_update(doc, updates, path))
+            if isinstance(updates, dict):
+                return self._store_call(filename, self.store.put_rows, table, updates)
 
+        data = self.load_json(filename)
+        data = _apply_update(data, updates, path)
         return self.save_json(filename, data)
 
+    @_locked
     def append_to_list(self, filename: str, item: Any, path: List[str] = None) -> bool:
         """
         Append item to a list in JSON file
         If path is provided, appends to list at that path
         """
-        data = self.load_json(filename)
-
-        if path:
-            # Navigate to nested path
-            current = data
-            for key in path[:-1]:
-                if key not in current:
-                    current[key] = {}
-                current = current[key]
-
-            # Ensure target is a list
-            if path[-1] not in current:
-                current[path[-1]] = []
-            if not isinstance(current[path[-1]], list):
-                print(f"[ERROR] Target at {'.'.join(path)} is not a list")
-                return False
-
-            current[path[-1]].append(item)
-        else:
-            # Root must be a list
-            if not isinstance(data, list):
-                print(f"[ERROR] Root of {filename} is not a list")
-                return False
-            data.append(item)
+        table = self._row_table(filename)
+        if table and path:
+            return self._update_row(table, path[0], lambda doc: _apply_append(doc, item, path, filename))
 
+        data = self.load_json(filename)
+        if not _apply_append(data, item, path, filename):
+            return False
         return self.save_json(filename, data)
 
     def check_exists(self, filename: str, key: str, path: List[str] = None) -> bool:
@@ -130,7 +649,13 @@ class JsonOperations:
         Check if a key exists in JSON file
         If path is provided, checks at that nested path
         """
-        data = self.load_json(filename)
+        table = self._row_table(filename)
+        if table:
+            if not path:
+                return self._store_call(filename, self.store.has_row, table, key)
+            data = self._row_document(table, path[0], merge_events=filename)
+        else:
+            data = self.load_json(filename, readonly=True)
 
         if path:
             # Navigate to nested path
@@ -150,7 +675,11 @@ class JsonOperations:
         If path is provided, gets value at that nested path
         If key is provided, gets that specific key
         """
-        data = self.load_json(filename)
+        table = self._row_table(filename)
+        if table and (path or key):
+            data = self._row_document(table, path[0] if path else key, merge_events=filename)
+        else:
+            data = self.load_json(filename, readonly=True)
 
         if path:
             # Navigate to nested path
@@ -163,37 +692,150 @@ class JsonOperations:
 
         if key:
             if isinstance(data, dict):
-                return data.get(key)
+                return clone_json(data.get(key))
             return None
 
-        return data
+        return clone_json(data)
 
+    @_locked
     def delete_key(self, filename: str, key: str, path: List[str] = None) -> bool:
         """
         Delete a key from JSON file
         If path is provided, deletes from that nested path
         """
+        table = self._row_table(filename)
+        if table:
+            if not path:
+                return self._store_call(filename, self.store.delete_row, table, key)
+            return self._update_row(table, path[0], lambda doc: _apply_delete(doc, key, path))
+
         data = self.load_json(filename)
+        if not _apply_delete(data, key, path):
+            return False
+        return self.save_json(filename, data)
 
-        if path:
-            # Navigate to nested path
-            current = data
-            for p in path[:-1]:
-                if not isinstance(current, dict) or p not in current:
-                    return False
-                current = current[p]
+    # ==================== Event journal ====================
 
-            if isinstance(current.get(path[-1]), dict) and key in current[path[-1]]:
-                del current[path[-1]][key]
-            else:
-                return False
-        else:
-            if isinstance(data, dict) and key in data:
-                del data[key]
-            else:
-                return False
+    @_locked
+    def append_event(self, filename: str, entity: str, event: Dict[str, Any]) -> bool:
+        """
+        Append an event to an entity's 'events' list
+        The event is written as one line to the campaign's event journal instead
+        of rewriting filename; loads see it merged in. Inside a transaction the
+        line is staged and appended at commit.
+        """
+        filepath = self._resolve_path(filename)
+        if filepath.parent != self.world_state_dir:
+            return self.append_to_list(filename, event, [entity, 'events'])
+
+        txn = _active_transaction.get()
+        if txn is not None:
+            if txn.get(os.path.abspath(filepath))[0]:
+                # The whole document is already staged; the event goes into it
+                return self.append_to_list(filename, event, [entity, 'events'])
+            txn.stage_event(filepath.name, entity, event)
+            return True
 
-        return self.save_json(filename, data)
+        try:
+            pending = self.events.append(filepath.name, entity, event)
+        except OSError as e:
+            print(f"[ERROR] Failed to append event for {entity}: {e}")
+            return False
+
+        if pending >= COMPACT_THRESHOLD:
+            self.compact_events()
+        return True
+
+    @_locked
+    def compact_events(self, filename: str = None) -> int:
+        """
+        Fold journaled events back into the snapshot files
+        Returns the number of files rewritten
+        """
+        names = [filename] if filename else self.events.pending_files()
+        compacted = 0
+        for name in names:
+            if not self.events.pending_count(name):
+                continue
+            # load_json merges the journal; save_json then drops it
+            if self.save_json(name, self.load_json(name, readonly=True)):
+                compacted += 1
+        return compacted
+
+    def _merge_events(self, filepath: Path, data: Any, cache: bool = True) -> Any:
+        """Overlay journaled (and transaction-staged) events for files in this campaign directory"""
+        if filepath.parent != self.world_state_dir:
+            return data
+        data = self.events.merge(filepath.name, data, cache=cache)
+        txn = _active_transaction.get()
+        if txn is not None and isinstance(data, dict):
+            staged = txn.events_for(filepath.name)
+            if staged:
+                data = overlay_events(data, staged)
+        return data
+
+    def _discard_events(self, filepath: Path):
+        """A full snapshot write of filepath supersedes its journaled events"""
+        if filepath.parent != self.world_state_dir:
+            return
+        try:
+            self.events.discard(filepath.name)
+        except OSError as e:
+            print(f"[WARNING] Failed to trim event journal for {filepath.name}: {e}")
+
+    # ==================== SQLite row access ====================
+
+    def _store_table(self, filepath: Path) -> Optional[str]:
+        """SQLite table backing filepath, or None if it is a plain JSON file"""
+        if self.store is None or filepath.parent != self.world_state_dir:
+            return None
+        return SqliteStore.table_for(filepath.name)
+
+    def _row_table(self, filename: str) -> Optional[str]:
+        """
+        SQLite table for row-level access to filename
+        None if the file isn't store-backed or a transaction is open (transactions
+        stage whole documents so their writes stay atomic)
+        """
+        if self.store is None or _active_transaction.get() is not None:
+            return None
+        return self._store_table(self._resolve_path(filename))
+
+    def _row_document(self, table: str, key: str, merge_events: str = None) -> Dict[str, Any]:
+        """
+        One row wrapped as a single-key document ({} if missing)
+        Pass the filename as merge_events to overlay journaled events (reads only;
+        row writes keep the journal separate)
+        """
+        try:
+            value = self.store.get_row(table, key)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to read {table}/{key}: {e}")
+            return {}
+        if value is None:
+            return {}
+        doc = {key: value}
+        if merge_events:
+            doc = self._merge_events(self._resolve_path(merge_events), doc, cache=False)
+        return doc
+
+    def _update_row(self, table: str, key: str, apply) -> bool:
+        """Read-modify-write a single row via apply(doc) on its single-key document"""
+        doc = self._row_document(table, key)
+        result = apply(doc)
+        if result is False:
+            return False
+        if isinstance(result, dict):
+            doc = result
+        return self._store_call(table, self.store.put_row, table, key, doc[key])
+
+    def _store_call(self, name: str, func, *args) -> Any:
+        """Run a store operation, reporting SQLite errors like file errors"""
+        try:
+            return func(*args)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Failed to access {name} in {DB_FILE}: {e}")
+            return False
 
     def _resolve_path(self, filename: str) -> Path:
         """Resolve file path relative to world state directory"""
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Location graph for travel queries
+Adjacency index over locations.json connections ({to, path} entries and
+imported connected_to name lists) with constant-time edge checks, routes
+(fewest hops, or shortest by a connection's numeric 'distance'), k-hop
+neighbourhoods and the connected components of a dungeon's rooms. The graph
+is rebuilt only when locations.json changes.
+"""
+
+import heapq
+import os
+import re
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import codec
+
+
+LOCATIONS_FILE = "locations.json"
+
+# Rooms are named "<Dungeon> - <Room>" when they carry no 'dungeon' field
+ROOM_SEPARATOR = " - "
+
+# Cost of a connection without a numeric 'distance'
+DEFAULT_DISTANCE = 1.0
+
+_PARENTHETICAL_RE = re.compile(r"\s*\(([^)]*)\)\s*$")
+
+_graphs: Dict[str, "LocationGraph"] = {}
+_graphs_lock = threading.Lock()
+
+
+def _connections(entity: Dict[str, Any]) -> List[Tuple[str, Optional[str], Any]]:
+    """(target, path, distance) for each connection an entity lists"""
+    found = []
+    for conn in entity.get("connections") or []:
+        if isinstance(conn, dict) and isinstance(conn.get("to"), str):
+            found.append((conn["to"], conn.get("path"), conn.get("distance")))
+        elif isinstance(conn, str):
+            found.append((conn, None, None))
+    for target in entity.get("connected_to") or []:
+        if isinstance(target, str):
+            found.append((target, None, None))
+    return found
+
+
+class LocationGraph:
+    """Per-campaign location adjacency. Use LocationGraph.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._stamp: Optional[tuple] = None
+        self._built = False
+        # Locations in file order
+        self._nodes: List[str] = []
+        # name -> {target: path} exactly as each location lists its connections
+        self._out: Dict[str, Dict[str, Optional[str]]] = {}
+        # name -> {neighbour: (path, distance)} in both directions, for travel
+        self._adj: Dict[str, Dict[str, Tuple[Optional[str], float]]] = {}
+        # name -> dungeon it is a room of
+        self._dungeon: Dict[str, str] = {}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "LocationGraph":
+        """Get the shared location graph for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _graphs_lock:
+            graph = _graphs.get(key)
+            if graph is None:
+                graph = cls(Path(key))
+                _graphs[key] = graph
+            return graph
+
+    # ==================== Maintenance ====================
+
+    def refresh(self, json_ops) -> bool:
+        """
+        Bring the graph up to date with locations.json
+        Returns True if it was rebuilt
+        """
+        with self._lock:
+            stamp = json_ops.stamp(LOCATIONS_FILE)
+            if self._built and stamp is not None and stamp == self._stamp:
+                return False
+            data = json_ops.load_json(LOCATIONS_FILE, readonly=True)
+            self._build(data if isinstance(data, dict) else {})
+            self._stamp = stamp
+            self._built = True
+            return True
+
+    def _build(self, data: Dict[str, Any]):
+        locations = {name: entity for name, entity in data.items() if isinstance(entity, dict)}
+        self._nodes = list(locations)
+        self._out = {name: {} for name in locations}
+        self._adj = {name: {} for name in locations}
+        self._dungeon = {}
+
+        for name, entity in locations.items():
+            dungeon = entity.get("dungeon")
+            if not isinstance(dungeon, str) or not dungeon:
+                prefix = name.split(ROOM_SEPARATOR, 1)[0] if ROOM_SEPARATOR in name else None
+                dungeon = prefix if prefix in locations else None
+            if dungeon:
+                self._dungeon[name] = dungeon
+
+        for name, entity in locations.items():
+            for target, path, distance in _connections(entity):
+                self._out[name].setdefault(target, path)
+                # "Kennel (via chimney)" names the Kennel; the note is the path
+                if target not in locations:
+                    match = _PARENTHETICAL_RE.search(target)
+                    if match and target[:match.start()] in locations:
+                        target, path = target[:match.start()], path or match.group(1)
+                if target == name:
+                    continue
+                cost = float(distance) if isinstance(distance, (int, float)) and distance > 0 else DEFAULT_DISTANCE
+                for a, b in ((name, target), (target, name)):
+                    edges = self._adj.setdefault(a, {})
+                    previous = edges.get(b)
+                    if previous is None or cost < previous[1] or (cost == previous[1] and not previous[0]):
+                        edges[b] = (path, cost)
+
+    # ==================== Queries ====================
+
+    def has_location(self, json_ops, name: str) -> bool:
+        """Whether name is a node (a location or a connection target)"""
+        with self._lock:
+            self.refresh(json_ops)
+            return name in self._adj
+
+    def has_connection(self, json_ops, from_loc: str, to_loc: str) -> bool:
+        """Whether from_loc lists a connection to to_loc (as stored, one direction)"""
+        with self._lock:
+            self.refresh(json_ops)
+            return to_loc in self._out.get(from_loc, {})
+
+    def neighbours(self, json_ops, name: str) -> List[Dict[str, Any]]:
+        """Locations one step away in either direction, as [{'to', 'path'}]"""
+        with self._lock:
+            self.refresh(json_ops)
+            return [{'to': target, 'path': path} for target, (path, _) in self._adj.get(name, {}).items()]
+
+    def route(self, json_ops, start: str, goal: str, weighted: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Route between two locations, or None if they aren't connected
+        Fewest hops by default (BFS); weighted=True minimizes total 'distance'
+        (Dijkstra). Returns {'path': [names], 'legs': [{'from', 'to', 'path'}],
+        'hops', 'distance'}.
+        """
+        with self._lock:
+            self.refresh(json_ops)
+            if start not in self._adj or goal not in self._adj:
+                return None
+            previous = self._dijkstra(start, goal) if weighted else self._bfs(start, goal)
+            if previous is None:
+                return None
+
+            names = [goal]
+            while names[-1] != start:
+                names.append(previous[names[-1]])
+            names.reverse()
+
+            legs = []
+            distance = 0.0
+            for a, b in zip(names, names[1:]):
+                path, cost = self._adj[a][b]
+                legs.append({'from': a, 'to': b, 'path': path})
+                distance += cost
+            return {'path': names, 'legs': legs, 'hops': len(legs), 'distance': distance}
+
+    def _bfs(self, start: str, goal: str) -> Optional[Dict[str, str]]:
+        previous = {start: start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                return previous
+            for neighbour in self._adj[node]:
+                if neighbour not in previous:
+                    previous[neighbour] = node
+                    queue.append(neighbour)
+        return None
+
+    def _dijkstra(self, start: str, goal: str) -> Optional[Dict[str, str]]:
+        previous = {start: start}
+        best = {start: 0.0}
+        heap = [(0.0, start)]
+        done = set()
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            if node == goal:
+                return previous
+            done.add(node)
+            for neighbour, (_, step) in self._adj[node].items():
+                candidate = cost + step
+                if candidate < best.get(neighbour, float('inf')):
+                    best[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(heap, (candidate, neighbour))
+        return None
+
+    def within(self, json_ops, name: str, hops: int = 1) -> Dict[str, int]:
+        """Locations reachable in at most hops steps -> their hop count (name excluded)"""
+        with self._lock:
+            self.refresh(json_ops)
+            if name not in self._adj:
+                return {}
+            depth = {name: 0}
+            frontier = [name]
+            for step in range(1, max(hops, 0) + 1):
+                next_frontier = []
+                for node in frontier:
+                    for neighbour in self._adj[node]:
+                        if neighbour not in depth:
+                            depth[neighbour] = step
+                            next_frontier.append(neighbour)
+                frontier = next_frontier
+            del depth[name]
+            return depth
+
+    def dungeon_of(self, json_ops, name: str) -> Optional[str]:
+        """Dungeon a location is a room of (its 'dungeon' field or "<Dungeon> - " prefix)"""
+        with self._lock:
+            self.refresh(json_ops)
+            return self._dungeon.get(name)
+
+    def components(self, json_ops, dungeon: Optional[str] = None) -> List[List[str]]:
+        """
+        Connected groups of locations, largest first
+        With dungeon, only that dungeon's rooms (and its entrance location) and
+        the connections between them, so rooms cut off from the rest show up as
+        separate groups
+        """
+        with self._lock:
+            self.refresh(json_ops)
+            if dungeon is None:
+                members = set(self._adj)
+            else:
+                members = {name for name, owner in self._dungeon.items() if owner == dungeon}
+                if dungeon in self._adj:
+                    members.add(dungeon)
+
+            order = {name: i for i, name in enumerate(self._nodes)}
+            groups = []
+            seen = set()
+            for name in sorted(members, key=lambda n: (order.get(n, len(order)), n)):
+                if name in seen:
+                    continue
+                group = []
+                queue = deque([name])
+                seen.add(name)
+                while queue:
+                    node = queue.popleft()
+                    group.append(node)
+                    for neighbour in self._adj[node]:
+                        if neighbour in members and neighbour not in seen:
+                            seen.add(neighbour)
+                            queue.append(neighbour)
+                groups.append(group)
+            groups.sort(key=len, reverse=True)
+            return groups
+
+    def dungeons(self, json_ops) -> Dict[str, List[str]]:
+        """Dungeon -> its rooms, in file order"""
+        with self._lock:
+            self.refresh(json_ops)
+            rooms: Dict[str, List[str]] = {}
+            for name in self._nodes:
+                if name in self._dungeon:
+                    rooms.setdefault(self._dungeon[name], []).append(name)
+            return rooms
+
+    def stats(self) -> Dict[str, int]:
+        """Graph size: locations, connections (undirected) and dungeons"""
+        with self._lock:
+            edges = sum(len(neighbours) for neighbours in self._adj.values()) // 2
+            return {'locations': len(self._nodes), 'connections': edges, 'dungeons': len(set(self._dungeon.values()))}
+
+
+def main():
+    """CLI interface: routes, neighbourhoods and dungeon components"""
+    import argparse
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='Location graph')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    route_parser = subparsers.add_parser('route', help='Route between two locations')
+    route_parser.add_argument('start', help='From location')
+    route_parser.add_argument('goal', help='To location')
+    route_parser.add_argument('--weighted', action='store_true', help="Minimize 'distance' instead of hops")
+
+    near_parser = subparsers.add_parser('near', help='Locations within some hops')
+    near_parser.add_argument('name', help='Location name')
+    near_parser.add_argument('--hops', type=int, default=1, help='Maximum hops (default: 1)')
+
+    components_parser = subparsers.add_parser('components', help='Connected groups of locations')
+    components_parser.add_argument('--dungeon', help='Only the rooms of this dungeon')
+
+    args = parser.parse_args()
+
+    if not args.action:
+        parser.print_help()
+        sys.exit(1)
+
+    json_ops = JsonOperations(args.campaign_dir)
+    graph = LocationGraph.for_dir(Path(args.campaign_dir))
+
+    if args.action == 'route':
+        route = graph.route(json_ops, args.start, args.goal, args.weighted)
+        if route is None:
+            print(f"[ERROR] No route from '{args.start}' to '{args.goal}'")
+            sys.exit(1)
+        print(codec.dumps(route, pretty=True))
+
+    elif args.action == 'near':
+        nearby = graph.within(json_ops, args.name, args.hops)
+        if not nearby:
+            print(f"[ERROR] Nothing within {args.hops} hops of '{args.name}'")
+            sys.exit(1)
+        for name, hops in sorted(nearby.items(), key=lambda item: (item[1], item[0])):
+            print(f"  {hops}  {name}")
+
+    elif args.action == 'components':
+        for group in graph.components(json_ops, args.dungeon):
+            print(f"[{len(group)}] {', '.join(group)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,17 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 
 from app.game.entity_manager import EntityManager
+from app.game.location_graph import LocationGraph
 
 
 class LocationManager(EntityManager):
     """Manage location operations. Inherits from EntityManager for common functionality."""
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
         self.locations_file = "locations.json"
+        # Adjacency index for edge checks and travel queries
+        self.graph = LocationGraph.for_dir(self.json_ops.world_state_dir)
 
     def add_location(self, name: str, position: str) -> bool:
         """
@@ -71,8 +74,7 @@ class LocationManager(EntityManager):
             return False
 
         # Check if connection already exists
-        existing_connections = [c['to'] for c in locations[from_loc].get('connections', [])]
-        if to_loc in existing_connections:
+        if self.graph.has_connection(self.json_ops, from_loc, to_loc):
             print(f"[ERROR] Connection already exists between '{from_loc}' and '{to_loc}'")
             return False
 
@@ -126,13 +128,20 @@ class LocationManager(EntityManager):
             print(f"[ERROR] {error}")
             return None
 
-        location = self._get_entity(self.locations_file, name)
+        actual_name = self._find_entity_name(self.locations_file, name)
+        location = self._get_entity(self.locations_file, actual_name) if actual_name else None
         if not location:
-            print(f"[ERROR] Location '{name}' not found")
+            self._report_missing("Location", self.locations_file, name)
             return None
 
         return location
 
+    def suggest_names(self, name: str, limit: int = 5) -> List[str]:
+        """
+        Location names closest to a name that failed to resolve
+        """
+        return self._suggest_names(self.locations_file, name, limit)
+
     def list_locations(self) -> List[str]:
         """
         List all location names
@@ -149,6 +158,67 @@ class LocationManager(EntityManager):
             return location.get('connections', [])
         return []
 
+    # ==================== Travel ====================
+
+    def resolve_place(self, name: str) -> Optional[str]:
+        """Location key for name (fuzzy), or a connection target that has no entry of its own"""
+        actual_name = self._find_entity_name(self.locations_file, name)
+        if actual_name:
+            return actual_name
+        if self.graph.has_location(self.json_ops, name):
+            return name
+        self._report_missing("Location", self.locations_file, name)
+        return None
+
+    def find_route(self, from_loc: str, to_loc: str, weighted: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Route between two locations ({'path', 'legs', 'hops', 'distance'})
+        Fewest hops by default; weighted=True minimizes connection 'distance'
+        """
+        start = self.resolve_place(from_loc)
+        goal = self.resolve_place(to_loc)
+        if not start or not goal:
+            return None
+
+        route = self.graph.route(self.json_ops, start, goal, weighted)
+        if route is None:
+            print(f"[ERROR] No known route from '{start}' to '{goal}'")
+        return route
+
+    def get_nearby(self, name: str, hops: int = 1) -> Optional[Dict[str, Any]]:
+        """
+        Locations within hops steps of a location
+        Returns {'location', 'dungeon', 'nearby': [{'name', 'hops', 'path'}]};
+        path is given for direct neighbours
+        """
+        actual_name = self.resolve_place(name)
+        if not actual_name:
+            return None
+
+        paths = {conn['to']: conn['path'] for conn in self.graph.neighbours(self.json_ops, actual_name)}
+        within = self.graph.within(self.json_ops, actual_name, hops)
+        nearby = []
+        for place, distance in sorted(within.items(), key=lambda item: item[1]):
+            entry = {'name': place, 'hops': distance}
+            if distance == 1 and paths.get(place):
+                entry['path'] = paths[place]
+            nearby.append(entry)
+        return {
+            'location': actual_name,
+            'dungeon': self.graph.dungeon_of(self.json_ops, actual_name),
+            'nearby': nearby,
+        }
+
+    def get_dungeon_sections(self, dungeon: str) -> Optional[List[List[str]]]:
+        """
+        A dungeon's rooms grouped by connectivity, largest group first
+        More than one group means some rooms aren't reachable from the others
+        """
+        actual_name = self.resolve_place(dungeon)
+        if not actual_name:
+            return None
+        return self.graph.components(self.json_ops, actual_name)
+
     def create_batch(self, locations_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Create multiple locations in batch
@@ -260,6 +330,17 @@ def main():
     connections_parser = subparsers.add_parser('connections', help='Get location connections')
     connections_parser.add_argument('name', help='Location name')
 
+    # Route between locations
+    route_parser = subparsers.add_parser('route', help='Find a route between two locations')
+    route_parser.add_argument('from_loc', help='From location')
+    route_parser.add_argument('to_loc', help='To location')
+    route_parser.add_argument('--weighted', action='store_true', help="Minimize connection 'distance' instead of hops")
+
+    # Nearby locations
+    nearby_parser = subparsers.add_parser('nearby', help='Locations within a few steps')
+    nearby_parser.add_argument('name', help='Location name')
+    nearby_parser.add_argument('--hops', type=int, default=1, help='Maximum steps (default: 1)')
+
     args = parser.parse_args()
 
     if not args.action:
@@ -302,6 +383,20 @@ def main():
         else:
             print("No connections found")
 
+    elif args.action == 'route':
+        route = manager.find_route(args.from_loc, args.to_loc, args.weighted)
+        if not route:
+            sys.exit(1)
+        print(" -> ".join(route['path']))
+        for leg in route['legs']:
+            print(f"  {leg['from']} -> {leg['to']}" + (f" ({leg['path']})" if leg['path'] else ""))
+
+    elif args.action == 'nearby':
+        result = manager.get_nearby(args.name, args.hops)
+        if not result:
+            sys.exit(1)
+        print(json.dumps(result, indent=2))
+
 
 if __name__ == "__main__":
     main()
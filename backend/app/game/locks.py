@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Per-campaign locking for world-state read-modify-write
+One CampaignLock per campaign directory serializes writers across threads
+(re-entrant), coroutines (asyncio guard) and processes (flock on a lock file)
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+
+LOCK_FILE = ".campaign.lock"
+
+_locks: Dict[str, "CampaignLock"] = {}
+_locks_lock = threading.Lock()
+
+
+class CampaignLock:
+    """Re-entrant lock for one campaign directory. Use get_campaign_lock() to share it."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.lock_path = self.directory / LOCK_FILE
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        # Keyed weakly so a closed event loop's lock goes away with it
+        self._async_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self._async_locks_guard = threading.Lock()
+
+    @contextmanager
+    def hold(self):
+        """
+        Hold the campaign lock for the duration of the block
+        Re-entrant within a thread; the file lock is taken once at the outermost level
+        """
+        with self._rlock:
+            self._depth += 1
+            try:
+                if self._depth == 1:
+                    self._lock_file()
+                yield self
+            finally:
+                if self._depth == 1:
+                    self._unlock_file()
+                self._depth -= 1
+
+    def _lock_file(self):
+        if fcntl is None:
+            return
+        try:
+            self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            # Read-only or missing directory: fall back to in-process locking
+            print(f"[WARNING] Cannot open campaign lock file {self.lock_path}: {e}")
+            self._fd = None
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _unlock_file(self):
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def async_guard(self) -> asyncio.Lock:
+        """
+        asyncio.Lock for this campaign on the running event loop
+        Serializes tool rounds between sessions of the same campaign without
+        blocking the loop; hold() still guards the actual file access.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_locks_guard:
+            lock = self._async_locks.get(loop)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._async_locks[loop] = lock
+            return lock
+
+
+def get_campaign_lock(directory: Path) -> CampaignLock:
+    """Get the shared lock for a campaign directory"""
+    key = os.path.abspath(directory)
+    with _locks_lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = CampaignLock(Path(key))
+            _locks[key] = lock
+        return lock
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant entity name lookup
+Resolves names against the keys of a world-state file (npcs.json,
+locations.json, ...) by exact key, case/punctuation-insensitive match, alias,
+and finally trigram similarity, and ranks "did you mean" suggestions.
+One index per campaign, shared by every manager; each file's names are
+re-read only when the file changes.
+"""
+
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+
+# Fuzzy matches at or above this similarity resolve automatically, provided
+# no other entity comes within AUTO_RESOLVE_MARGIN of it
+AUTO_RESOLVE_SIMILARITY = 0.65
+AUTO_RESOLVE_MARGIN = 0.1
+
+# Weakest similarity still offered as a suggestion
+SUGGEST_MIN_SIMILARITY = 0.3
+
+_WORD_RE = re.compile(r"[^\W_]+")
+_PARENTHETICAL_RE = re.compile(r"\s*\([^)]*\)")
+
+_indexes: Dict[str, "NameIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def normalize(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_WORD_RE.findall(name.lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded so word starts count"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _aliases(name: str, entity: Any) -> List[str]:
+    """Explicit aliases plus the name without any parenthetical"""
+    aliases = []
+    if isinstance(entity, dict):
+        explicit = entity.get("aliases", [])
+        if isinstance(explicit, str):
+            explicit = [explicit]
+        if isinstance(explicit, list):
+            aliases.extend(a for a in explicit if isinstance(a, str))
+    stripped = _PARENTHETICAL_RE.sub("", name)
+    if stripped != name:
+        aliases.append(stripped)
+    return aliases
+
+
+class _FileNames:
+    """Name lookup tables for one file"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.keys = [key for key, value in data.items() if isinstance(value, dict)]
+        # normalized name or alias -> keys
+        self.exact: Dict[str, List[str]] = {}
+        # Every searchable form: (normalized text, trigram set, key)
+        self.forms: List[Tuple[str, Set[str], str]] = []
+        # trigram -> indexes into forms
+        self.postings: Dict[str, List[int]] = {}
+
+        for key in self.keys:
+            self._add(normalize(key), key)
+            for alias in _aliases(key, data[key]):
+                self._add(normalize(alias), key)
+
+        # A unique first or last word is an implicit alias ("Sildar", "Castle")
+        word_owners: Dict[str, Set[str]] = {}
+        for key in self.keys:
+            words = normalize(_PARENTHETICAL_RE.sub("", key)).split()
+            if len(words) < 2:
+                continue
+            for word in {words[0], words[-1]}:
+                if len(word) >= 3:
+                    word_owners.setdefault(word, set()).add(key)
+        for word, owners in word_owners.items():
+            if len(owners) == 1 and word not in self.exact:
+                self._add(word, next(iter(owners)))
+
+    def _add(self, text: str, key: str):
+        if not text:
+            return
+        owners = self.exact.setdefault(text, [])
+        if key not in owners:
+            owners.append(key)
+        grams = trigrams(text)
+        index = len(self.forms)
+        self.forms.append((text, grams, key))
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(index)
+
+    def similar(self, name: str) -> List[Tuple[str, float]]:
+        """Keys ranked by best Dice similarity of any of their forms"""
+        query = trigrams(normalize(name))
+        shared: Dict[int, int] = {}
+        for gram in query:
+            for index in self.postings.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+
+        best: Dict[str, float] = {}
+        for index, count in shared.items():
+            _, grams, key = self.forms[index]
+            score = 2 * count / (len(query) + len(grams))
+            if score > best.get(key, 0.0):
+                best[key] = score
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+
+class NameIndex:
+    """Per-campaign name resolver. Use NameIndex.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        # filename -> (JsonOperations.stamp(), tables)
+        self._files: Dict[str, Tuple[Optional[tuple], _FileNames]] = {}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "NameIndex":
+        """Get the shared name index for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = cls(Path(key))
+                _indexes[key] = index
+            return index
+
+    def _names(self, json_ops, filename: str) -> _FileNames:
+        stamp = json_ops.stamp(filename)
+        entry = self._files.get(filename)
+        if entry is not None and stamp is not None and entry[0] == stamp:
+            return entry[1]
+        data = json_ops.load_json(filename, readonly=True)
+        names = _FileNames(data if isinstance(data, dict) else {})
+        self._files[filename] = (stamp, names)
+        return names
+
+    def resolve(self, json_ops, filename: str, name: str, fuzzy: bool = True) -> Optional[str]:
+        """
+        Actual key for name in filename, or None
+        Tries the exact key, then a case/punctuation-insensitive name or alias
+        (only if it is unambiguous), then with fuzzy=True a clear-winner
+        trigram match
+        """
+        with self._lock:
+            names = self._names(json_ops, filename)
+            if name in names.keys:
+                return name
+
+            owners = names.exact.get(normalize(name), [])
+            if len(owners) == 1:
+                return owners[0]
+            if owners or not fuzzy:
+                return None
+
+            ranked = names.similar(name)
+            if not ranked or ranked[0][1] < AUTO_RESOLVE_SIMILARITY:
+                return None
+            if len(ranked) > 1 and ranked[1][1] > ranked[0][1] - AUTO_RESOLVE_MARGIN:
+                return None
+            return ranked[0][0]
+
+    def suggest(self, json_ops, filename: str, name: str, limit: int = 5) -> List[str]:
+        """Closest names in filename, best first"""
+        with self._lock:
+            names = self._names(json_ops, filename)
+            owners = names.exact.get(normalize(name), [])
+            ranked = [key for key, score in names.similar(name) if score >= SUGGEST_MIN_SIMILARITY]
+            ordered = owners + [key for key in ranked if key not in owners]
+            return ordered[:limit]
+
+    def names(self, json_ops, filename: str) -> List[str]:
+        """All keys of filename, in file order"""
+        with self._lock:
+            return list(self._names(json_ops, filename).keys)
+
+
+def main():
+    """CLI interface: resolve a name or list suggestions"""
+    import argparse
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='Fuzzy entity name lookup')
+    parser.add_argument('name', help='Name to look up')
+    parser.add_argument('--file', default='npcs.json', help='World-state file (default: npcs.json)')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+    parser.add_argument('--limit', type=int, default=5, help='Maximum suggestions')
+
+    args = parser.parse_args()
+
+    json_ops = JsonOperations(args.campaign_dir)
+    index = NameIndex.for_dir(Path(args.campaign_dir))
+    resolved = index.resolve(json_ops, args.file, args.name)
+    if resolved:
+        print(f"[SUCCESS] {args.name} -> {resolved}")
+        return
+
+    suggestions = index.suggest(json_ops, args.file, args.name, args.limit)
+    print(f"[ERROR] No match for '{args.name}' in {args.file}")
+    if suggestions:
+        print(f"Did you mean: {', '.join(suggestions)}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,12 @@ Handles NPC creation, updates, and tagging operations
 """
 
 import sys
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 from app.game.entity_manager import EntityManager
+from app.game.json_ops import clone_json
+from app.game.query import run_query
 
 
 # Default character sheet for new party members
@@ -33,8 +35,8 @@ PARTY_MEMBER_DEFAULTS = {
 class NPCManager(EntityManager):
     """Manage NPC operations. Inherits from EntityManager for common functionality."""
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
         self.npcs_file = "npcs.json"
 
     def create_npc(self, name: str, description: str, attitude: str) -> bool:
@@ -86,10 +88,12 @@ class NPCManager(EntityManager):
             print(f"[ERROR] {error}")
             return False
 
-        # Check if NPC exists
-        if not self._entity_exists(self.npcs_file, name):
-            print(f"[ERROR] NPC {name} not found")
+        # Check if NPC exists (case and aliases only: a typo must not write to another NPC)
+        actual_name = self._find_entity_name(self.npcs_file, name, fuzzy=False)
+        if not actual_name:
+            self._report_missing("NPC", self.npcs_file, name)
             return False
+        name = actual_name
 
         # Add event
         event_data = {
@@ -97,7 +101,8 @@ class NPCManager(EntityManager):
             'timestamp': self.get_timestamp()
         }
 
-        if self.json_ops.append_to_list(self.npcs_file, event_data, [name, 'events']):
+        # One journal line instead of rewriting npcs.json
+        if self.json_ops.append_event(self.npcs_file, name, event_data):
             print(f"[SUCCESS] Updated {name}: {event}")
             return True
         return False
@@ -112,13 +117,20 @@ class NPCManager(EntityManager):
             print(f"[ERROR] {error}")
             return None
 
-        npc = self._get_entity(self.npcs_file, name)
+        actual_name = self._find_entity_name(self.npcs_file, name)
+        npc = self._get_entity(self.npcs_file, actual_name) if actual_name else None
         if not npc:
-            print(f"[ERROR] NPC {name} not found")
+            self._report_missing("NPC", self.npcs_file, name)
             return None
 
         return npc
 
+    def suggest_names(self, name: str, limit: int = 5) -> List[str]:
+        """
+        NPC names closest to a name that failed to resolve
+        """
+        return self._suggest_names(self.npcs_file, name, limit)
+
     def format_npc_status(self, name: str) -> Optional[str]:
         """
         Format NPC status for display, with enhanced output for party members.
@@ -387,8 +399,8 @@ class NPCManager(EntityManager):
         """
         Get all NPCs who are party members.
         """
-        npcs = self._load_entities(self.npcs_file)
-        return {name: data for name, data in npcs.items()
+        npcs = self._view_entities(self.npcs_file)
+        return {name: clone_json(data) for name, data in npcs.items()
                 if data.get('is_party_member')}
 
     def update_npc_hp(self, name: str, amount: int) -> bool:
@@ -634,23 +646,33 @@ class NPCManager(EntityManager):
         """
         List all NPCs with optional filtering
         """
-        npcs = self._load_entities(self.npcs_file)
-        filtered = {}
-
-        for name, data in npcs.items():
-            # Apply filters
-            if filter_attitude and data.get('attitude') != filter_attitude.lower():
-                continue
-
-            tags = data.get('tags', {})
-            if filter_location and filter_location not in tags.get('locations', []):
-                continue
-            if filter_quest and filter_quest not in tags.get('quests', []):
-                continue
-
-            filtered[name] = data
-
-        return filtered
+        npcs = self._view_entities(self.npcs_file)
+
+        # Attitude and tag filters come from the secondary index
+        where = {}
+        if filter_attitude:
+            where['attitude'] = filter_attitude
+        if filter_location:
+            where['tags.locations'] = filter_location
+        if filter_quest:
+            where['tags.quests'] = filter_quest
+        names = self.indexes.narrow(self.json_ops, self.npcs_file, where)
+        if names is None:
+            names = [name for name, data in npcs.items() if isinstance(data, dict)]
+
+        return {name: clone_json(npcs[name]) for name in names if name in npcs}
+
+    def query_npcs(self, where: Optional[Dict[str, Any]] = None, fields: Any = None,
+                   sort: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+                   max_chars: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Filtered, projected and paginated NPC listing (see query.run_query)
+        """
+        npcs = self._view_entities(self.npcs_file)
+        names = self.indexes.narrow(self.json_ops, self.npcs_file, where)
+        if names is not None:
+            npcs = {name: npcs[name] for name in names if name in npcs}
+        return run_query(npcs, where, fields, sort, limit, offset, max_chars)
 
     def create_batch(self, npcs_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -9,6 +9,7 @@ import json
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from app.game import codec
 from app.game.entity_manager import EntityManager
 
 
@@ -39,8 +40,8 @@ class PlayerManager(EntityManager):
         355000,  # Level 20
     ]
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
 
         # Additional paths specific to player management
         self.world_state_dir = self.campaign_dir  # Alias for compatibility
@@ -76,13 +77,9 @@ class PlayerManager(EntityManager):
         In single-character mode, name is optional/ignored
         """
         # New format: single character.json
+        # Loads go through json_ops so writes staged in an open transaction are visible
         if self._is_using_single_character():
-            try:
-                with open(self.character_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"[ERROR] Failed to load character: {e}")
-                return None
+            return self.json_ops.load_json("character.json") or None
 
         # Legacy format: need name to find file
         if not name:
@@ -95,12 +92,7 @@ class PlayerManager(EntityManager):
         char_path = self._get_character_path(name)
         if not char_path.exists():
             return None
-        try:
-            with open(char_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"[ERROR] Failed to load character: {e}")
-            return None
+        return self.json_ops.load_json(str(char_path)) or None
 
     def _save_character(self, name: str, data: Dict) -> bool:
         """Save character data to file using atomic writes via json_ops"""
@@ -188,14 +180,13 @@ class PlayerManager(EntityManager):
         if self.characters_dir.exists():
             for char_file in self.characters_dir.glob("*.json"):
                 try:
-                    with open(char_file, 'r', encoding='utf-8') as f:
-                        char = json.load(f)
+                    char = codec.read_file(char_file)
                     hp = char.get('hp', {})
                     gold = char.get('gold', 0)
                     summaries.append(
                         f"{char.get('name', char_file.stem)} - {char.get('race', '?')} {char.get('class', '?')} Level {char.get('level', 1)} (HP: {hp.get('current', 0)}/{hp.get('max', 0)}, Gold: {gold})"
                     )
-                except (json.JSONDecodeError, IOError):
+                except (codec.JSONDecodeError, IOError):
                     continue
         return summaries
 
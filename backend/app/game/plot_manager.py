@@ -5,43 +5,42 @@ Handles plot listing, searching, and status updates
 """
 
 import sys
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
 from app.game.entity_manager import EntityManager
+from app.game.json_ops import clone_json
+from app.game.query import run_query
+from app.game.result_cache import ResultCache
 
 
 class PlotManager(EntityManager):
     """Manage plot operations. Inherits from EntityManager for common functionality."""
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
         self.plots_file = "plots.json"
+        # Repeat searches, invalidated by any world-state write
+        self.results = ResultCache.for_dir(self.json_ops.world_state_dir)
 
     def list_plots(self, plot_type: Optional[str] = None,
                    status: Optional[str] = None) -> Dict[str, Dict]:
         """
         List all plots with optional filtering by type and status
         """
-        plots = self._load_entities(self.plots_file)
-        filtered = {}
-
-        for name, data in plots.items():
-            if not isinstance(data, dict):
-                continue
+        plots = self._view_entities(self.plots_file)
 
-            # Apply type filter
-            if plot_type and data.get('type', '').lower() != plot_type.lower():
-                continue
-
-            # Apply status filter (default to 'active' if not set)
-            plot_status = data.get('status', 'active').lower()
-            if status and plot_status != status.lower():
-                continue
+        # Type and status (default 'active') filters come from the secondary index
+        where = {}
+        if plot_type:
+            where['type'] = plot_type
+        if status:
+            where['status'] = status
+        names = self.indexes.narrow(self.json_ops, self.plots_file, where)
+        if names is None:
+            names = [name for name, data in plots.items() if isinstance(data, dict)]
 
-            filtered[name] = data
-
-        return filtered
+        return {name: clone_json(plots[name]) for name in names if name in plots}
 
     def get_plot(self, name: str) -> Optional[Dict[str, Any]]:
         """
@@ -52,11 +51,22 @@ class PlotManager(EntityManager):
             return None
         return self._get_entity(self.plots_file, actual_name)
 
+    def suggest_names(self, name: str, limit: int = 5) -> List[str]:
+        """
+        Plot names closest to a name that failed to resolve
+        """
+        return self._suggest_names(self.plots_file, name, limit)
+
     def search_plots(self, query: str) -> Dict[str, Dict]:
         """
         Search plots by name, description, NPCs, locations, or objectives
         """
-        plots = self._load_entities(self.plots_file)
+        # Matching is substring-based, so only case is normalized
+        version = self.json_ops.version([self.plots_file])
+        return self.results.fetch(('search_plots', query.lower()), version, lambda: self._search_plots(query))
+
+    def _search_plots(self, query: str) -> Dict[str, Dict]:
+        plots = self._view_entities(self.plots_file)
         results = {}
         query_lower = query.lower()
 
@@ -66,66 +76,78 @@ class PlotManager(EntityManager):
 
             # Search in name
             if query_lower in name.lower():
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
             # Search in description
             if query_lower in data.get('description', '').lower():
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
             # Search in NPCs list
             npcs = data.get('npcs', [])
             if any(query_lower in npc.lower() for npc in npcs):
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
             # Search in locations list
             locations = data.get('locations', [])
             if any(query_lower in loc.lower() for loc in locations):
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
             # Search in objectives
             objectives = data.get('objectives', [])
             if any(query_lower in obj.lower() for obj in objectives):
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
             # Search in consequences
             if query_lower in data.get('consequences', '').lower():
-                results[name] = data
+                results[name] = clone_json(data)
                 continue
 
         return results
 
+    def query_plots(self, query: Optional[str] = None, where: Optional[Dict[str, Any]] = None,
+                    fields: Any = None, sort: Optional[str] = None, limit: Optional[int] = None,
+                    offset: int = 0, max_chars: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        """
+        Filtered, projected and paginated plot listing (see query.run_query)
+        With query, only plots matching search_plots(query) are considered;
+        plots without a status count as 'active'
+        """
+        if query:
+            plots = self.search_plots(query)
+        else:
+            plots = self._view_entities(self.plots_file)
+            names = self.indexes.narrow(self.json_ops, self.plots_file, where)
+            if names is not None:
+                plots = {name: plots[name] for name in names if name in plots}
+        return run_query(plots, where, fields, sort, limit, offset, max_chars, defaults={'status': 'active'})
+
     def update_plot(self, name: str, event: str) -> bool:
         """
         Add a progress event to a plot's history
         """
-        actual_name = self._find_entity_name(self.plots_file, name)
+        actual_name = self._find_entity_name(self.plots_file, name, fuzzy=False)
         if not actual_name:
-            print(f"[ERROR] Plot '{name}' not found")
+            self._report_missing("Plot", self.plots_file, name)
             return False
 
-        plots = self._load_entities(self.plots_file)
+        # Ensure status is set (the only case that still touches plots.json)
+        plot = self._view_entities(self.plots_file).get(actual_name, {})
+        if 'status' not in plot:
+            if not self._update_entity(self.plots_file, actual_name, {'status': 'active'}):
+                return False
 
-        # Ensure events list exists
-        if 'events' not in plots[actual_name]:
-            plots[actual_name]['events'] = []
-
-        # Add event with timestamp
+        # Add event with timestamp (one journal line instead of rewriting plots.json)
         event_data = {
             'event': event,
             'timestamp': self.get_timestamp()
         }
-        plots[actual_name]['events'].append(event_data)
-
-        # Ensure status is set
-        if 'status' not in plots[actual_name]:
-            plots[actual_name]['status'] = 'active'
 
-        if self._save_entities(self.plots_file, plots):
+        if self.json_ops.append_event(self.plots_file, actual_name, event_data):
             print(f"[SUCCESS] Updated plot '{actual_name}': {event}")
             return True
         return False
@@ -134,9 +156,9 @@ class PlotManager(EntityManager):
         """
         Mark a plot as completed
         """
-        actual_name = self._find_entity_name(self.plots_file, name)
+        actual_name = self._find_entity_name(self.plots_file, name, fuzzy=False)
         if not actual_name:
-            print(f"[ERROR] Plot '{name}' not found")
+            self._report_missing("Plot", self.plots_file, name)
             return False
 
         plots = self._load_entities(self.plots_file)
@@ -165,9 +187,9 @@ class PlotManager(EntityManager):
         """
         Mark a plot as failed
         """
-        actual_name = self._find_entity_name(self.plots_file, name)
+        actual_name = self._find_entity_name(self.plots_file, name, fuzzy=False)
         if not actual_name:
-            print(f"[ERROR] Plot '{name}' not found")
+            self._report_missing("Plot", self.plots_file, name)
             return False
 
         plots = self._load_entities(self.plots_file)
@@ -196,8 +218,6 @@ class PlotManager(EntityManager):
         """
         Get counts of plots by type and status
         """
-        plots = self._load_entities(self.plots_file)
-
         counts = {
             'total': 0,
             'active': 0,
@@ -210,21 +230,13 @@ class PlotManager(EntityManager):
             'threat': 0
         }
 
-        for name, data in plots.items():
-            if not isinstance(data, dict):
-                continue
+        counts['total'] = self.indexes.total(self.json_ops, self.plots_file)
 
-            counts['total'] += 1
-
-            # Count by status (default to 'active')
-            status = data.get('status', 'active').lower()
-            if status in counts:
-                counts[status] += 1
-
-            # Count by type
-            plot_type = data.get('type', '').lower()
-            if plot_type in counts:
-                counts[plot_type] += 1
+        # Status (default 'active') and type tallies from the secondary index
+        for field in ('status', 'type'):
+            for value, count in self.indexes.counts(self.json_ops, self.plots_file, field).items():
+                if value in counts and value != 'total':
+                    counts[value] += count
 
         return counts
 
@@ -343,13 +355,13 @@ class PlotManager(EntityManager):
         """
         from datetime import datetime, timezone
 
-        plots = self._load_entities(self.plots_file)
+        plots = self._view_entities(self.plots_file)
         threads = {'main': [], 'side': [], 'mystery': [], 'threat': [], 'other': []}
 
         # Try to get session count for staleness
         try:
-            from session_manager import SessionManager
-            sm = SessionManager()
+            from app.game.session_manager import SessionManager
+            sm = SessionManager(self._base_dir, campaign_dir=str(self.campaign_dir))
             current_session = sm._get_session_number()
         except Exception:
             current_session = None
@@ -387,8 +399,8 @@ class PlotManager(EntityManager):
                 'name': name,
                 'last_event': last_event,
                 'stale_sessions': stale_sessions,
-                'npcs': data.get('npcs', []),
-                'locations': data.get('locations', []),
+                'npcs': list(data.get('npcs', [])),
+                'locations': list(data.get('locations', [])),
                 'description': data.get('description', ''),
             }
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Structured queries over world-state entity maps
+Field filters, projections ("status", "tags.locations", "events[-3:]",
+"description[:200]"), sorting, limit/offset and a result-size cap, so tool
+calls hand the model only the fields it asked for.
+"""
+
+import re
+import sys
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import codec
+from app.game.json_ops import clone_json
+
+
+# Projection spec: dotted field path with an optional [start:end] slice
+_FIELD_RE = re.compile(r"^\s*([\w.]+|\*)\s*(?:\[\s*(-?\d*)\s*:\s*(-?\d*)\s*\])?\s*$")
+
+# Field name that projects or sorts on the entity's key
+NAME_FIELD = "name"
+
+
+def parse_fields(fields: Any) -> List[Tuple[str, Optional[slice]]]:
+    """
+    Parse projection specs ("a, b.c, events[-3:]" or a list of them)
+    Raises ValueError on malformed specs
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    parsed = []
+    for spec in fields or []:
+        if not spec or not spec.strip():
+            continue
+        match = _FIELD_RE.match(spec)
+        if not match:
+            raise ValueError(f"Invalid field spec '{spec}' (use name, a.b or field[start:end])")
+        path, start, end = match.groups()
+        window = None
+        if start is not None:
+            window = slice(int(start) if start else None, int(end) if end else None)
+        parsed.append((path, window))
+    return parsed
+
+
+def _get_path(entity: Dict[str, Any], path: str) -> Tuple[bool, Any]:
+    value: Any = entity
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return False, None
+        value = value[part]
+    return True, value
+
+
+def _set_path(target: Dict[str, Any], path: str, value: Any):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def _matches(value: Any, wanted: Any) -> bool:
+    """Case-insensitive equality; list values match on membership; a list of wanted values matches any"""
+    if isinstance(wanted, list):
+        return any(_matches(value, w) for w in wanted)
+    if isinstance(value, list):
+        return any(_matches(v, wanted) for v in value)
+    if isinstance(value, str) and isinstance(wanted, str):
+        return value.lower() == wanted.lower()
+    return value == wanted
+
+
+def project(name: str, entity: Dict[str, Any], fields: List[Tuple[str, Optional[slice]]]) -> Dict[str, Any]:
+    """
+    Copy of the requested fields of one entity
+    "*" keeps every field (later specs override it, e.g. "*, events[-5:]")
+    """
+    projected: Dict[str, Any] = {}
+    for path, window in fields:
+        if path == "*":
+            projected.update(clone_json(entity))
+            continue
+        if path == NAME_FIELD and NAME_FIELD not in entity:
+            found, value = True, name
+        else:
+            found, value = _get_path(entity, path)
+        if not found:
+            continue
+        if window is not None and isinstance(value, (list, str)):
+            value = value[window]
+        _set_path(projected, path, clone_json(value))
+    return projected
+
+
+def _sort_key(name: str, entity: Dict[str, Any], path: str) -> Tuple[int, Any]:
+    found, value = (True, name) if path == NAME_FIELD and NAME_FIELD not in entity else _get_path(entity, path)
+    if not found or value is None or isinstance(value, (dict, list)):
+        return (1, "")  # missing values sort last
+    if isinstance(value, str):
+        return (0, (True, value.lower()))
+    return (0, (False, value))  # numbers and booleans order before strings
+
+
+def run_query(entities: Dict[str, Any],
+              where: Optional[Dict[str, Any]] = None,
+              fields: Any = None,
+              sort: Optional[str] = None,
+              limit: Optional[int] = None,
+              offset: int = 0,
+              max_chars: Optional[int] = None,
+              defaults: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Filter, sort, paginate and project an entity map ({name: entity})
+
+    Args:
+        entities: Entity map (read-only; results are copies)
+        where: {field path: value}; strings compare case-insensitively, list
+            fields match on membership, a list value matches any of its items
+        fields: Projection specs (see parse_fields); None returns whole entities
+        sort: Field path to sort by, prefixed with '-' for descending;
+            'name' sorts by key. Default keeps file order.
+        limit: Maximum entities returned
+        offset: Entities to skip (after filtering and sorting)
+        max_chars: Stop adding entities once the compact JSON reaches this size
+        defaults: Values assumed for missing fields when filtering/sorting
+
+    Returns:
+        (page, stats). page is {'results': {name: entity}, 'total': matches,
+        'returned': n} plus 'next_offset' when more remain. stats is
+        {'bytes', 'full_bytes', 'bytes_saved'}: the page size against the
+        size of every match returned whole.
+    """
+    parsed = parse_fields(fields) if fields else None
+    defaults = defaults or {}
+
+    matched = []
+    for name, entity in entities.items():
+        if not isinstance(entity, dict):
+            continue
+        view = {**defaults, **entity} if defaults else entity
+        if where and not all(
+            _matches(name if path == NAME_FIELD and NAME_FIELD not in view else _get_path(view, path)[1], wanted)
+            for path, wanted in where.items()
+        ):
+            continue
+        matched.append((name, entity, view))
+
+    if sort:
+        path = sort.lstrip("-")
+        keyed = [(_sort_key(m[0], m[2], path), m) for m in matched]
+        present = [(key[1], m) for key, m in keyed if key[0] == 0]
+        present.sort(key=lambda item: item[0], reverse=sort.startswith("-"))
+        matched = [m for _, m in present] + [m for key, m in keyed if key[0] == 1]
+
+    offset = max(offset or 0, 0)
+    window = matched[offset:offset + limit] if limit is not None else matched[offset:]
+
+    results: Dict[str, Any] = {}
+    size = 2
+    truncated = False
+    for name, entity, _ in window:
+        value = project(name, entity, parsed) if parsed else clone_json(entity)
+        cost = len(codec.dumps_bytes({name: value}, pretty=False))
+        if max_chars is not None and results and size + cost > max_chars:
+            truncated = True
+            break
+        results[name] = value
+        size += cost
+
+    page: Dict[str, Any] = {'results': results, 'total': len(matched), 'returned': len(results)}
+    consumed = offset + len(results)
+    if truncated or consumed < len(matched):
+        page['next_offset'] = consumed
+
+    page_bytes = len(codec.dumps_bytes(page, pretty=False))
+    full_bytes = len(codec.dumps_bytes({name: entity for name, entity, _ in matched}, pretty=False))
+    stats = {'bytes': page_bytes, 'full_bytes': full_bytes, 'bytes_saved': max(full_bytes - page_bytes, 0)}
+    return page, stats
+
+
+def main():
+    """CLI interface: query an entity file"""
+    import argparse
+    from pathlib import Path
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='Structured world-state query')
+    parser.add_argument('file', help='Entity file (e.g. npcs.json, plots.json)')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=VALUE', help='Filter (repeatable)')
+    parser.add_argument('--fields', help='Projection, e.g. "name,status,events[-3:]"')
+    parser.add_argument('--sort', help="Sort field ('-field' for descending)")
+    parser.add_argument('--limit', type=int, help='Maximum results')
+    parser.add_argument('--offset', type=int, default=0, help='Results to skip')
+    parser.add_argument('--max-chars', type=int, help='Result size cap')
+
+    args = parser.parse_args()
+
+    where = {}
+    for clause in args.where:
+        if '=' not in clause:
+            print(f"[ERROR] Invalid filter '{clause}' (use FIELD=VALUE)")
+            sys.exit(1)
+        field, value = clause.split('=', 1)
+        where[field] = value
+
+    json_ops = JsonOperations(args.campaign_dir)
+    try:
+        page, stats = run_query(json_ops.load_json(args.file, readonly=True), where, args.fields,
+                                args.sort, args.limit, args.offset, args.max_chars)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    print(codec.dumps(page, pretty=True))
+    print(f"[INFO] {stats['bytes']} bytes ({stats['bytes_saved']} saved of {stats['full_bytes']})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
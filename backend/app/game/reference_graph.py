@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Cross-reference graph between campaign entities
+Links NPCs, locations, plots and items that mention each other (a plot's npcs
+and locations lists, an NPC's location and quests, an item's location) so
+"what is connected to X" is a dictionary lookup instead of a rescan of every
+plot. References are resolved by whole-word name matching.
+
+The graph is maintained per entity: when a source file changes, its entities'
+reference texts are diffed against the last sync and only entities whose
+references changed are re-linked. Adding or removing an entity also re-links
+the entities whose texts mention its name (found through a word index).
+Event appends, which carry no references, don't touch the graph at all.
+"""
+
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from app.game import codec
+
+
+# World-state file -> entity kind
+SOURCES = {
+    "npcs.json": "npcs",
+    "locations.json": "locations",
+    "plots.json": "plots",
+    "items.json": "items",
+}
+
+# (source kind, field) -> kinds its text may name
+REFERENCE_FIELDS = {
+    ("plots", "npcs"): ("npcs",),
+    ("plots", "quest_giver"): ("npcs",),
+    ("plots", "locations"): ("locations",),
+    ("npcs", "location"): ("locations",),
+    ("npcs", "quests"): ("plots",),
+    ("npcs", "tags.locations"): ("locations",),
+    ("npcs", "tags.quests"): ("plots",),
+    ("items", "location"): ("locations", "npcs"),
+}
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# (kind, name) of an entity
+Node = Tuple[str, str]
+
+_graphs: Dict[str, "ReferenceGraph"] = {}
+_graphs_lock = threading.Lock()
+
+
+def _words(text: str) -> Tuple[str, ...]:
+    return tuple(_WORD_RE.findall(text.lower()))
+
+
+def _field_strings(entity: Dict[str, Any], field: str) -> List[str]:
+    """Strings under a (dotted) field of an entity"""
+    value: Any = entity
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return []
+        value = value.get(part)
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str)]
+    return []
+
+
+class ReferenceGraph:
+    """Bidirectional entity reference index. Use ReferenceGraph.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        # kind -> {entity name -> [(field, reference text), ...]}
+        self._refs: Dict[str, Dict[str, List[Tuple[str, str]]]] = {kind: {} for kind in SOURCES.values()}
+        # Links made by a node's own references, and the reverse direction
+        self._out: Dict[Node, Set[Node]] = {}
+        self._in: Dict[Node, Set[Node]] = {}
+        # lowercased name -> [(kind, name), ...]
+        self._names: Dict[str, List[Node]] = {}
+        # kind -> first word of a name -> [(name words, name), ...]
+        self._by_first_word: Dict[str, Dict[str, List[Tuple[Tuple[str, ...], str]]]] = {}
+        # target kind -> word -> nodes whose reference texts for that kind contain it
+        self._mentions: Dict[str, Dict[str, Set[Node]]] = {}
+        self._mentioned: Dict[Node, Set[Tuple[str, str]]] = {}
+        # filename -> JsonOperations.stamp() at the last sync
+        self._stamps: Dict[str, tuple] = {}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "ReferenceGraph":
+        """Get the shared graph for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _graphs_lock:
+            graph = _graphs.get(key)
+            if graph is None:
+                graph = cls(Path(key))
+                _graphs[key] = graph
+            return graph
+
+    # ==================== Maintenance ====================
+
+    def refresh(self, json_ops) -> bool:
+        """
+        Bring the graph up to date with a campaign's JsonOperations
+        Returns True if any entity was re-linked
+        """
+        with self._lock:
+            changed = False
+            for filename, kind in SOURCES.items():
+                stamp = json_ops.stamp(filename)
+                last = self._stamps.get(filename)
+                if stamp is not None and last is not None:
+                    # stamp[0] covers the snapshot; the rest only tracks
+                    # journaled events, which hold no references
+                    if stamp == last or (stamp[0] is not None and stamp[0] == last[0]):
+                        self._stamps[filename] = stamp
+                        continue
+                data = json_ops.load_json(filename, readonly=True)
+                refs = self._extract(kind, data if isinstance(data, dict) else {})
+                changed = self._apply(kind, refs) or changed
+                if stamp is None:
+                    self._stamps.pop(filename, None)
+                else:
+                    self._stamps[filename] = stamp
+            return changed
+
+    @staticmethod
+    def _extract(kind: str, data: Dict[str, Any]) -> Dict[str, List[Tuple[str, str]]]:
+        """Reference texts per entity for one kind"""
+        fields = [field for (source, field) in REFERENCE_FIELDS if source == kind]
+        refs = {}
+        for name, entity in data.items():
+            if not isinstance(entity, dict):
+                continue
+            refs[name] = [(field, text) for field in fields for text in _field_strings(entity, field)]
+        return refs
+
+    def _apply(self, kind: str, refs: Dict[str, List[Tuple[str, str]]]) -> bool:
+        """Re-link the entities of one kind whose references or existence changed"""
+        old = self._refs[kind]
+        added = [name for name in refs if name not in old]
+        removed = [name for name in old if name not in refs]
+        edited = [name for name in refs if name in old and refs[name] != old[name]]
+        if not (added or removed or edited):
+            return False
+
+        self._refs[kind] = refs
+        for name in removed:
+            self._remove((kind, name))
+        relink = {(kind, name) for name in added + edited}
+        for name in added:
+            self._add_name(kind, name)
+            # Texts elsewhere that may name the newcomer
+            words = _words(name)
+            if words:
+                relink.update(self._mentions.get(kind, {}).get(words[0], ()))
+        for node in relink:
+            self._relink(node)
+        return True
+
+    def _add_name(self, kind: str, name: str):
+        self._names.setdefault(name.lower(), []).append((kind, name))
+        words = _words(name)
+        if words:
+            self._by_first_word.setdefault(kind, {}).setdefault(words[0], []).append((words, name))
+
+    def _remove(self, node: Node):
+        """Drop an entity: its name, its links (both directions) and its mentions"""
+        kind, name = node
+        owners = self._names.get(name.lower(), [])
+        if node in owners:
+            owners.remove(node)
+            if not owners:
+                del self._names[name.lower()]
+        words = _words(name)
+        if words:
+            candidates = self._by_first_word.get(kind, {}).get(words[0], [])
+            candidates[:] = [entry for entry in candidates if entry[1] != name]
+        self._unlink(node)
+        for source in self._in.pop(node, set()):
+            self._out[source].discard(node)
+
+    def _unlink(self, node: Node):
+        """Drop the links and word mentions made by node's own references"""
+        for target in self._out.pop(node, set()):
+            self._in[target].discard(node)
+        for target_kind, word in self._mentioned.pop(node, set()):
+            self._mentions[target_kind][word].discard(node)
+
+    def _relink(self, node: Node):
+        """Resolve one entity's reference texts against the current names"""
+        self._unlink(node)
+        kind, name = node
+        out: Set[Node] = set()
+        mentioned: Set[Tuple[str, str]] = set()
+        for field, text in self._refs[kind].get(name, ()):
+            words = _words(text)
+            for target_kind in REFERENCE_FIELDS[(kind, field)]:
+                candidates = self._by_first_word.get(target_kind, {})
+                for i, word in enumerate(words):
+                    mentioned.add((target_kind, word))
+                    for name_words, target in candidates.get(word, ()):
+                        if words[i:i + len(name_words)] == name_words and (target_kind, target) != node:
+                            out.add((target_kind, target))
+        self._out[node] = out
+        for target in out:
+            self._in.setdefault(target, set()).add(node)
+        self._mentioned[node] = mentioned
+        for target_kind, word in mentioned:
+            self._mentions.setdefault(target_kind, {}).setdefault(word, set()).add(node)
+
+    def _neighbours(self, node: Node) -> Set[Node]:
+        return self._out.get(node, set()) | self._in.get(node, set())
+
+    # ==================== Queries ====================
+
+    def resolve(self, json_ops, name: str, kind: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Entities called name (case-insensitive), as (kind, name) pairs"""
+        with self._lock:
+            self.refresh(json_ops)
+            matches = [m for m in self._names.get(name.lower(), []) if kind is None or m[0] == kind]
+            exact = [m for m in matches if m[1] == name]
+            return exact or matches
+
+    def related(self, json_ops, kind: str, name: str) -> Dict[str, List[str]]:
+        """Entities connected to one entity, grouped by kind ({} if unknown)"""
+        with self._lock:
+            self.refresh(json_ops)
+            related: Dict[str, List[str]] = {}
+            for target_kind, target in self._neighbours((kind, name)):
+                related.setdefault(target_kind, []).append(target)
+            return {target_kind: sorted(names) for target_kind, names in related.items()}
+
+    def related_many(self, json_ops, nodes: Iterable[Tuple[str, str]], target_kind: str) -> List[str]:
+        """Entities of target_kind connected to any of nodes, in first-seen order"""
+        with self._lock:
+            self.refresh(json_ops)
+            seen = {}
+            for node in nodes:
+                targets = (name for kind, name in self._neighbours(node) if kind == target_kind)
+                for target in sorted(targets):
+                    seen.setdefault(target, None)
+            return list(seen)
+
+    def stats(self) -> Dict[str, int]:
+        """Graph size: entities and (undirected) links"""
+        with self._lock:
+            links = {frozenset((source, target)) for source, targets in self._out.items() for target in targets}
+            return {"entities": sum(len(entities) for entities in self._refs.values()), "links": len(links)}
+
+
+def main():
+    """CLI interface: show what an entity is connected to"""
+    import argparse
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='Entity cross-references')
+    parser.add_argument('name', help='NPC, location, plot or item name')
+    parser.add_argument('--kind', choices=sorted(SOURCES.values()), help='Entity kind (default: any)')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+
+    args = parser.parse_args()
+
+    json_ops = JsonOperations(args.campaign_dir)
+    graph = ReferenceGraph.for_dir(Path(args.campaign_dir))
+    matches = graph.resolve(json_ops, args.name, args.kind)
+    if not matches:
+        print(f"[ERROR] No entity named '{args.name}'")
+        sys.exit(1)
+
+    for kind, name in matches:
+        print(f"{name} ({kind}):")
+        print(codec.dumps(graph.related(json_ops, kind, name), pretty=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Search result cache keyed by world-state version
+Repeated searches (the DM often re-asks the same thing within and across
+turns) are answered from a bounded LRU. Entries are stored with the campaign's
+world version (JsonOperations.version()), which every write bumps, so a hit
+is never older than the last mutation.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from app.game.json_ops import clone_json
+from app.game.search_index import analyze
+
+
+# Results kept per campaign
+RESULT_CACHE_SIZE = 256
+
+_caches: Dict[str, "ResultCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Queries that analyze to the same terms rank identically and share entries"""
+    return " ".join(analyze(query)) or query.strip().lower()
+
+
+class ResultCache:
+    """LRU of search results for one campaign. Use ResultCache.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path, max_entries: int = RESULT_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (world version, result)
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "ResultCache":
+        """Get the shared result cache for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = cls(Path(key))
+                _caches[key] = cache
+            return cache
+
+    def fetch(self, key: Hashable, version: Optional[int], compute: Callable[[], Any]) -> Any:
+        """
+        Result for key at world version, from the cache or compute()
+        Callers get a private copy. With version None (inside a transaction)
+        the result is computed and not cached.
+        """
+        if version is None:
+            return compute()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return clone_json(entry[1])
+            self._stats['stale' if entry is not None else 'misses'] += 1
+
+        # Compute outside the lock; version was read first, so a write that
+        # lands meanwhile leaves this entry behind the current version
+        result = compute()
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return clone_json(result)
+
+    def clear(self):
+        """Drop every cached result (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters: hits, misses, stale (entry outdated by a write), evictions, entries, hit_rate"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['stale']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
@@ -8,63 +8,93 @@ import sys
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
-from app.game.json_ops import JsonOperations
+from app.game.json_ops import JsonOperations, clone_json
 from app.game.campaign_manager import CampaignManager
+from app.game.entity_manager import EntityManager
+from app.game.search_index import SearchIndex, DEFAULT_LIMIT, SOURCES as INDEX_SOURCES
+from app.game.reference_graph import ReferenceGraph, SOURCES as GRAPH_SOURCES
+from app.game.name_index import NameIndex
+from app.game.secondary_index import SecondaryIndex, INDEXED_FIELDS
+from app.game.hybrid_search import HybridRetriever, DEFAULT_TOKEN_BUDGET, SOURCE_EXCERPT_CHARS, estimate_tokens, semantic_key
+from app.game.result_cache import ResultCache, normalize_query
+
+
+# Files whose contents search results depend on
+SEARCHED_FILES = tuple(sorted(set(INDEX_SOURCES) | set(GRAPH_SOURCES)))
 
 
 class WorldSearcher:
     """Search across world state files"""
 
-    def __init__(self, world_state_dir: str = None):
-        # Use campaign manager to resolve the correct directory
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
         base_dir = world_state_dir or "world-state"
-        campaign_mgr = CampaignManager(base_dir)
-
-        # Get the active campaign directory (falls back to legacy root)
-        active_dir = campaign_mgr.get_active_campaign_dir()
+        if campaign_dir is not None:
+            # Explicit campaign: skip the global active-campaign lookup
+            active_dir = EntityManager._resolve_campaign_dir(base_dir, campaign_dir)
+        else:
+            # Use campaign manager to resolve the active campaign directory
+            campaign_mgr = CampaignManager(base_dir)
+            active_dir = campaign_mgr.get_active_campaign_dir()
+        self.campaign_dir = active_dir
         self.json_ops = JsonOperations(str(active_dir))
-
-    def search_facts(self, query: str) -> Dict[str, List[Dict]]:
-        """Search facts by category or content"""
-        facts = self.json_ops.load_json('facts.json')
-        results = {}
-        query_lower = query.lower()
-
-        for category, fact_list in facts.items():
-            if not isinstance(fact_list, list):
-                continue
-            # Check category name
-            if query_lower in category.lower():
-                results[category] = fact_list
-            else:
-                # Check fact content
-                matching_facts = [
-                    fact for fact in fact_list
-                    if isinstance(fact, dict) and query_lower in fact.get('fact', '').lower()
-                ]
-                if matching_facts:
-                    results[category] = matching_facts
-
+        # Ranked full-text index, shared by every searcher of this campaign
+        self.index = SearchIndex.for_dir(self.json_ops.world_state_dir)
+        # Entity cross-references (plots <-> NPCs/locations, items -> locations)
+        self.graph = ReferenceGraph.for_dir(self.json_ops.world_state_dir)
+        # Typo-tolerant name lookup, shared with the entity managers
+        self.names = NameIndex.for_dir(self.json_ops.world_state_dir)
+        # Field indexes (NPC tags, plot status/type, location dungeon)
+        self.indexes = SecondaryIndex.for_dir(self.json_ops.world_state_dir)
+        # BM25 + vector fusion over world state and imported source chunks
+        self.retriever = HybridRetriever(self.json_ops.world_state_dir, self.index)
+        # Repeat searches, invalidated by any world-state write
+        self.results = ResultCache.for_dir(self.json_ops.world_state_dir)
+
+    def _view(self, filename: str) -> Any:
+        """Shared read-only view of a world state file (copy before returning)"""
+        return self.json_ops.load_json(filename, readonly=True)
+
+    def _ranked(self, query: str, kinds: Optional[List[str]], limit: Optional[int]) -> Dict[str, Any]:
+        """Run a ranked index query and gather the hits, best first, per kind"""
+        results = {'facts': {}, 'npcs': {}, 'locations': {}, 'consequences': [], 'plots': {}}
+        views = {}
+        for kind, key, position, _ in self.index.search(self.json_ops, query, kinds, limit):
+            value = self._hit_value(views, kind, key, position)
+            if value is not None:
+                self._place(results, kind, key, value)
         return results
 
-    def search_npcs(self, query: str) -> Dict[str, Dict]:
-        """Search NPCs by name or description"""
-        npcs = self.json_ops.load_json('npcs.json')
-        results = {}
-        query_lower = query.lower()
+    def _hit_value(self, views: Dict[str, Any], kind: str, key: str, position: int) -> Optional[Any]:
+        """Copy of the entity (or list entry) an index hit points at, None if it has gone"""
+        if kind not in views:
+            views[kind] = self._view(f"{kind}.json")
+        value = views[kind].get(key)
+        if kind in ('facts', 'consequences'):
+            if isinstance(value, list) and position < len(value):
+                return clone_json(value[position])
+            return None
+        return clone_json(value) if isinstance(value, dict) else None
+
+    @staticmethod
+    def _place(results: Dict[str, Any], kind: str, key: str, value: Any):
+        if kind == 'facts':
+            results['facts'].setdefault(key, []).append(value)
+        elif kind == 'consequences':
+            results['consequences'].append(value)
+        else:
+            results[kind][key] = value
 
-        for name, npc_data in npcs.items():
-            if not isinstance(npc_data, dict):
-                continue
-            if (query_lower in name.lower() or
-                query_lower in npc_data.get('description', '').lower()):
-                results[name] = npc_data
+    def search_facts(self, query: str, limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Search facts by category or content"""
+        return self._ranked(query, ['facts'], limit)['facts']
 
-        return results
+    def search_npcs(self, query: str, limit: Optional[int] = None) -> Dict[str, Dict]:
+        """Search NPCs by name, description, tags or events"""
+        return self._ranked(query, ['npcs'], limit)['npcs']
 
     def search_npcs_by_tag(self, tag_type: str, tag_value: str) -> Dict[str, Dict]:
         """Search NPCs by location or quest tag"""
-        npcs = self.json_ops.load_json('npcs.json')
+        npcs = self._view('npcs.json')
         results = {}
         tag_lower = tag_value.lower()
 
@@ -76,6 +106,12 @@ class WorldSearcher:
         else:
             tag_key = tag_type
 
+        field = f"tags.{tag_key}"
+        if field in INDEXED_FIELDS['npcs.json']:
+            names = self.indexes.lookup_substring(self.json_ops, 'npcs.json', field, tag_value)
+            return {name: clone_json(npcs[name]) for name in names if name in npcs}
+
+        # Unindexed tag types fall back to a scan
         for name, npc_data in npcs.items():
             if not isinstance(npc_data, dict):
                 continue
@@ -84,166 +120,145 @@ class WorldSearcher:
                 tag_list = tags.get(tag_key, [])
                 if isinstance(tag_list, list):
                     if any(tag_lower in t.lower() for t in tag_list):
-                        results[name] = npc_data
+                        results[name] = clone_json(npc_data)
 
         return results
 
-    def search_locations(self, query: str) -> Dict[str, Dict]:
-        """Search locations by name, description, or position"""
-        locations = self.json_ops.load_json('locations.json')
-        results = {}
-        query_lower = query.lower()
-
-        for name, loc_data in locations.items():
-            if not isinstance(loc_data, dict):
-                continue
-            if (query_lower in name.lower() or
-                query_lower in loc_data.get('description', '').lower() or
-                query_lower in loc_data.get('position', '').lower()):
-                results[name] = loc_data
-
-        return results
+    def search_locations(self, query: str, limit: Optional[int] = None) -> Dict[str, Dict]:
+        """Search locations by name, description, position or connections"""
+        return self._ranked(query, ['locations'], limit)['locations']
 
-    def search_consequences(self, query: str) -> List[Dict]:
+    def search_consequences(self, query: str, limit: Optional[int] = None) -> List[Dict]:
         """Search active consequences"""
-        consequences = self.json_ops.load_json('consequences.json')
-        results = []
-        query_lower = query.lower()
+        return self._ranked(query, ['consequences'], limit)['consequences']
 
-        for consequence in consequences.get('active', []):
-            if isinstance(consequence, dict):
-                if query_lower in consequence.get('consequence', '').lower():
-                    results.append(consequence)
-
-        return results
-
-    def search_plots(self, query: str) -> Dict[str, Dict]:
+    def search_plots(self, query: str, limit: Optional[int] = None) -> Dict[str, Dict]:
         """Search plots by name, description, NPCs, locations, or objectives"""
-        plots = self.json_ops.load_json('plots.json')
-        results = {}
-        query_lower = query.lower()
+        return self._ranked(query, ['plots'], limit)['plots']
 
-        for name, data in plots.items():
-            if not isinstance(data, dict):
-                continue
-
-            # Search in name
-            if query_lower in name.lower():
-                results[name] = data
-                continue
+    def find_related_plots(self, entity_name: str, entity_type: str = 'any') -> Dict[str, Dict]:
+        """
+        Find plots that reference a specific NPC or location.
+        Used for cross-referencing when searching NPCs/locations.
+        """
+        kinds = {'npc': ['npcs'], 'location': ['locations']}.get(entity_type, ['npcs', 'locations'])
+        nodes = [(kind, entity_name) for kind in kinds]
+        return self._plots_by_name(self.graph.related_many(self.json_ops, nodes, 'plots'))
 
-            # Search in description
-            if query_lower in data.get('description', '').lower():
-                results[name] = data
-                continue
+    def get_related(self, name: str, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Everything connected to an entity (NPCs, locations, plots, items)
+        kind narrows the lookup when a name is shared between kinds
+        """
+        matches = self.graph.resolve(self.json_ops, name, kind)
+        if not matches:
+            return {}
+        return {
+            found: {'kind': found_kind, 'related': self.graph.related(self.json_ops, found_kind, found)}
+            for found_kind, found in matches
+        }
 
-            # Search in NPCs list
-            npcs = data.get('npcs', [])
-            if any(query_lower in npc.lower() for npc in npcs):
-                results[name] = data
-                continue
+    def _plots_by_name(self, names: List[str]) -> Dict[str, Dict]:
+        plots = self._view('plots.json')
+        return {name: clone_json(plots[name]) for name in names if isinstance(plots.get(name), dict)}
 
-            # Search in locations list
-            locations = data.get('locations', [])
-            if any(query_lower in loc.lower() for loc in locations):
-                results[name] = data
-                continue
+    def search_all(self, query: str, limit: Optional[int] = DEFAULT_LIMIT) -> Dict[str, Any]:
+        """
+        Search across all world state
+        Returns the top `limit` matches overall (all if None), each category
+        ordered best match first
+        """
+        version = self.json_ops.version(SEARCHED_FILES)
+        return self.results.fetch(('search_all', normalize_query(query), limit), version,
+                                  lambda: self._search_all(query, limit))
 
-            # Search in objectives
-            objectives = data.get('objectives', [])
-            if any(query_lower in obj.lower() for obj in objectives):
-                results[name] = data
-                continue
+    def _search_all(self, query: str, limit: Optional[int]) -> Dict[str, Any]:
+        results = self._ranked(query, None, limit)
 
-            # Search in consequences
-            if query_lower in data.get('consequences', '').lower():
-                results[name] = data
-                continue
+        # Cross-reference: plots linked to matched NPCs and locations
+        nodes = [('npcs', name) for name in results['npcs']] + [('locations', name) for name in results['locations']]
+        linked = self.graph.related_many(self.json_ops, nodes, 'plots')
+        related_plots = self._plots_by_name([name for name in linked if name not in results['plots']])
 
+        results['related_plots'] = related_plots
         return results
 
-    def find_related_plots(self, entity_name: str, entity_type: str = 'any') -> Dict[str, Dict]:
+    def search_hybrid(self, query: str, limit: int = DEFAULT_LIMIT,
+                      token_budget: int = DEFAULT_TOKEN_BUDGET) -> Dict[str, Any]:
         """
-        Find plots that reference a specific NPC or location.
-        Used for cross-referencing when searching NPCs/locations.
+        Search world state and imported source material in one call
+        BM25 entity hits and vector-matched source chunks are fused by rank and
+        added best first while they fit in token_budget; related plots fill any
+        budget left. Without vector search this is search_all() under a budget.
         """
-        plots = self.json_ops.load_json('plots.json')
-        related = {}
-        name_lower = entity_name.lower()
-
-        for plot_name, data in plots.items():
-            if not isinstance(data, dict):
+        version = self.json_ops.version(SEARCHED_FILES)
+        # Vector hits only change on re-import, tracked by the vectors stamp. The
+        # key is the raw query, since embeddings tell apart queries BM25 treats alike
+        key = ('search_hybrid', semantic_key(query), limit, token_budget, self.retriever.vectors_stamp())
+        return self.results.fetch(key, version, lambda: self._search_hybrid(query, limit, token_budget))
+
+    def _search_hybrid(self, query: str, limit: int, token_budget: int) -> Dict[str, Any]:
+        results = {'facts': {}, 'npcs': {}, 'locations': {}, 'consequences': [], 'plots': {},
+                   'source_material': []}
+        views = {}
+        used = 0
+
+        def fits(value: Any) -> bool:
+            nonlocal used
+            cost = estimate_tokens(value)
+            if used and used + cost > token_budget:
+                return False
+            used += cost
+            return True
+
+        for source, payload, _ in self.retriever.search(self.json_ops, query, limit):
+            if source == 'source':
+                text = payload['text'] or ''
+                excerpt = {'id': payload['id'], 'text': text[:SOURCE_EXCERPT_CHARS]}
+                if len(text) > SOURCE_EXCERPT_CHARS:
+                    excerpt['text'] += '...'
+                if payload['metadata'].get('document'):
+                    excerpt['document'] = payload['metadata']['document']
+                if fits(excerpt):
+                    results['source_material'].append(excerpt)
                 continue
+            kind, key, position = payload
+            value = self._hit_value(views, kind, key, position)
+            if value is not None and fits(value):
+                self._place(results, kind, key, value)
 
-            # Check NPCs list
-            if entity_type in ('any', 'npc'):
-                npcs = data.get('npcs', [])
-                if any(name_lower in npc.lower() for npc in npcs):
-                    related[plot_name] = data
-                    continue
-
-            # Check locations list
-            if entity_type in ('any', 'location'):
-                locations = data.get('locations', [])
-                if any(name_lower in loc.lower() for loc in locations):
-                    related[plot_name] = data
-                    continue
-
-        return related
-
-    def search_all(self, query: str) -> Dict[str, Any]:
-        """Search across all world state"""
-        results = {
-            'facts': self.search_facts(query),
-            'npcs': self.search_npcs(query),
-            'locations': self.search_locations(query),
-            'consequences': self.search_consequences(query),
-            'plots': self.search_plots(query)
-        }
-
-        # Cross-reference: find plots related to matched NPCs and locations
+        nodes = [('npcs', name) for name in results['npcs']] + [('locations', name) for name in results['locations']]
+        linked = self.graph.related_many(self.json_ops, nodes, 'plots')
         related_plots = {}
-
-        # Check if any NPCs matched and find their related plots
-        for npc_name in results['npcs'].keys():
-            npc_plots = self.find_related_plots(npc_name, 'npc')
-            for plot_name, plot_data in npc_plots.items():
-                if plot_name not in results['plots'] and plot_name not in related_plots:
-                    related_plots[plot_name] = plot_data
-
-        # Check if any locations matched and find their related plots
-        for loc_name in results['locations'].keys():
-            loc_plots = self.find_related_plots(loc_name, 'location')
-            for plot_name, plot_data in loc_plots.items():
-                if plot_name not in results['plots'] and plot_name not in related_plots:
-                    related_plots[plot_name] = plot_data
-
+        for name, plot in self._plots_by_name([n for n in linked if n not in results['plots']]).items():
+            if fits(plot):
+                related_plots[name] = plot
         results['related_plots'] = related_plots
         return results
 
     def get_npc(self, name: str) -> Optional[Dict]:
         """Get specific NPC by exact name"""
-        npcs = self.json_ops.load_json('npcs.json')
-        return npcs.get(name)
+        npcs = self._view('npcs.json')
+        return clone_json(npcs.get(name))
 
     def get_location(self, name: str) -> Optional[Dict]:
         """Get specific location by exact name"""
-        locations = self.json_ops.load_json('locations.json')
-        return locations.get(name)
+        locations = self._view('locations.json')
+        return clone_json(locations.get(name))
 
     def get_pending_consequences(self, trigger: Optional[str] = None) -> List[Dict]:
         """Get pending consequences, optionally filtered by trigger"""
-        consequences = self.json_ops.load_json('consequences.json')
+        consequences = self._view('consequences.json')
         active = consequences.get('active', [])
 
         if trigger:
-            return [c for c in active if trigger.lower() in c.get('trigger', '').lower()]
-        return active
+            return clone_json([c for c in active if trigger.lower() in c.get('trigger', '').lower()])
+        return clone_json(active)
 
     def get_facts_by_category(self, category: str) -> List[Dict]:
         """Get all facts in a specific category"""
-        facts = self.json_ops.load_json('facts.json')
-        return facts.get(category, [])
+        facts = self._view('facts.json')
+        return clone_json(facts.get(category, []))
 
     def print_results(self, results: Dict[str, Any], query: str = ""):
         """Print formatted search results"""
@@ -321,15 +336,22 @@ class WorldSearcher:
                 if link_str:
                     print(f"    → {link_str}")
 
+        if results.get('source_material'):
+            print("\nSOURCE MATERIAL:")
+            found_anything = True
+            for chunk in results['source_material']:
+                excerpt = ' '.join(chunk.get('text', '').split())[:160]
+                print(f"  [{chunk.get('id', '?')}] {excerpt}")
+
         if not found_anything:
             print(f"\nNo results found for \"{query}\"")
-            self._print_suggestions()
+            self._print_suggestions(query)
 
     def print_npc_results(self, npcs: Dict[str, Dict], tag_type: str = "", tag_value: str = ""):
         """Print formatted NPC results with tag details"""
         if not npcs:
             print(f"\nNo NPCs found with {tag_type} tag \"{tag_value}\"")
-            self._print_suggestions()
+            self._print_suggestions(tag_value)
             return
 
         print("\nNPCs:")
@@ -343,12 +365,18 @@ class WorldSearcher:
             if npc.get('events'):
                 print(f"    Last event: {npc['events'][-1].get('event', '')}")
 
-    def _print_suggestions(self):
-        """Print available NPCs and dungeons to help with typos"""
+    def _print_suggestions(self, query: str = ""):
+        """Print the closest names to query, then available NPCs and dungeons to help with typos"""
         print("\n--- Did you mean? ---")
 
+        if query:
+            for label, filename in (("NPCs", "npcs.json"), ("Locations", "locations.json"), ("Plots", "plots.json")):
+                close = self.names.suggest(self.json_ops, filename, query)
+                if close:
+                    print(f"\nClosest {label}: {', '.join(close)}")
+
         # List available NPCs
-        npcs = self.json_ops.load_json('npcs.json')
+        npcs = self._view('npcs.json')
         if npcs:
             npc_names = sorted([name for name in npcs.keys() if isinstance(npcs[name], dict)])
             if npc_names:
@@ -359,23 +387,18 @@ class WorldSearcher:
                     print(f"  ... and {len(npc_names) - 10} more")
 
         # List available dungeons and locations
-        locations = self.json_ops.load_json('locations.json')
+        locations = self._view('locations.json')
         if locations:
-            dungeons = set()
-            other_locations = []
-            for name, loc_data in locations.items():
-                if isinstance(loc_data, dict) and loc_data.get('dungeon'):
-                    dungeons.add(loc_data['dungeon'])
-                elif isinstance(loc_data, dict):
-                    other_locations.append(name)
+            # dungeon -> rooms, from the secondary index
+            dungeons = self.indexes.groups(self.json_ops, 'locations.json', 'dungeon')
+            rooms = {room for names in dungeons.values() for room in names}
+            other_locations = [name for name, loc_data in locations.items()
+                               if isinstance(loc_data, dict) and name not in rooms]
 
             if dungeons:
                 print(f"\nKnown Dungeons ({len(dungeons)}):")
                 for dungeon in sorted(dungeons):
-                    # Count rooms
-                    room_count = sum(1 for loc in locations.values()
-                                   if isinstance(loc, dict) and loc.get('dungeon') == dungeon)
-                    print(f"  - {dungeon} ({room_count} rooms)")
+                    print(f"  - {dungeon} ({len(dungeons[dungeon])} rooms)")
 
             if other_locations:
                 print(f"\nKnown Locations ({len(other_locations)}):")
@@ -393,6 +416,8 @@ def main():
     parser.add_argument('query', nargs='*', help='Search query')
     parser.add_argument('--tag-location', help='Search NPCs by location tag')
     parser.add_argument('--tag-quest', help='Search NPCs by quest tag')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='Maximum results (0 for all)')
+    parser.add_argument('--hybrid', action='store_true', help='Include imported source material (vector search)')
 
     args = parser.parse_args()
 
@@ -408,7 +433,10 @@ def main():
     elif args.query:
         # Regular search
         query = ' '.join(args.query)
-        results = searcher.search_all(query)
+        if args.hybrid:
+            results = searcher.search_hybrid(query, args.limit or DEFAULT_LIMIT)
+        else:
+            results = searcher.search_all(query, args.limit or None)
         searcher.print_results(results, query)
     else:
         parser.print_help()
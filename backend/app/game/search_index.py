@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Inverted full-text index over campaign world state
+Facts, NPCs, locations, plots and active consequences are tokenized, lightly
+stemmed and ranked with BM25 (per-field boosts, so a name match outranks a
+description match). Only entities whose contents changed are re-indexed, and
+the index is persisted per campaign so a restart doesn't re-tokenize the world.
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from app.game import codec
+
+
+INDEX_FILE = ".search-index.json"
+INDEX_VERSION = 1
+
+# World-state file -> document kind
+SOURCES = {
+    "facts.json": "facts",
+    "npcs.json": "npcs",
+    "locations.json": "locations",
+    "plots.json": "plots",
+    "consequences.json": "consequences",
+}
+
+# Field weights for BM25F: names dominate, cross-references next, long text last
+FIELD_BOOSTS = {"name": 3.0, "refs": 1.5, "description": 1.0, "text": 0.5}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Query terms of at least this length also match longer indexed terms they
+# prefix ("cragm" -> "cragmaw"), at a reduced weight
+MIN_PREFIX_LENGTH = 3
+PREFIX_WEIGHT = 0.5
+PREFIX_MAX_TERMS = 20
+
+DEFAULT_LIMIT = 20
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have he her his in into is it its
+of on or she that the their them they this to was were which who will with
+""".split())
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+_indexes: Dict[str, "SearchIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+# ==================== Analysis ====================
+
+def stem(token: str) -> str:
+    """
+    Light suffix stripper: plurals, -ing/-ed and a trailing 'e', so that
+    goblins/goblin, captured/capture and mining/mine share a stem
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+
+    base = token
+    if base.endswith("ies") and len(base) > 4:
+        base = base[:-3] + "y"
+    elif base.endswith(("sses", "xes", "zes", "ches", "shes")):
+        base = base[:-2]
+    elif base.endswith("s") and not base.endswith(("ss", "us", "is")):
+        base = base[:-1]
+
+    for suffix in ("ing", "ed"):
+        if base.endswith(suffix) and len(base) - len(suffix) >= 3:
+            base = base[:-len(suffix)]
+            # running -> run, but keep pass/fall/buzz
+            if len(base) > 3 and base[-1] == base[-2] and base[-1] not in "lsz":
+                base = base[:-1]
+            break
+
+    if base.endswith("e") and len(base) > 3:
+        base = base[:-1]
+    return base
+
+
+def analyze(text: str) -> List[str]:
+    """Lowercase, split on non-word characters, drop stopwords and stem"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS or (len(token) < 2 and not token.isdigit()):
+            continue
+        tokens.append(stem(token))
+    return tokens
+
+
+def _strings(value: Any) -> Iterable[str]:
+    """Every string inside a (possibly nested) JSON value"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+
+
+def _join(*values: Any) -> str:
+    return " ".join(s for value in values for s in _strings(value))
+
+
+def _unit_documents(kind: str, key: str, value: Any) -> List[Tuple[int, Dict[str, str]]]:
+    """
+    Searchable documents for one top-level key of a world-state file
+    Returns [(position, {field: text})]; position indexes into list-valued
+    units (facts per category, active consequences) and is 0 otherwise
+    """
+    if kind == "facts":
+        if not isinstance(value, list):
+            return []
+        return [
+            (i, {"name": key, "description": fact.get("fact", "")})
+            for i, fact in enumerate(value) if isinstance(fact, dict)
+        ]
+
+    if kind == "consequences":
+        if key != "active" or not isinstance(value, list):
+            return []
+        return [
+            (i, {"description": _join(c.get("consequence", "")), "refs": _join(c.get("trigger", ""))})
+            for i, c in enumerate(value) if isinstance(c, dict)
+        ]
+
+    if not isinstance(value, dict):
+        return []
+
+    if kind == "npcs":
+        events = [e.get("event", "") if isinstance(e, dict) else e for e in value.get("events", []) or []]
+        fields = {
+            "name": key,
+            "description": _join(value.get("description", "")),
+            "refs": _join(value.get("location", ""), value.get("quests", []), value.get("tags", {})),
+            "text": _join(value.get("attitude", ""), events),
+        }
+    elif kind == "locations":
+        connections = [c.get("to", "") for c in value.get("connections", []) or [] if isinstance(c, dict)]
+        fields = {
+            "name": key,
+            "description": _join(value.get("description", "")),
+            "refs": _join(value.get("position", ""), value.get("dungeon", ""), connections),
+        }
+    else:  # plots
+        fields = {
+            "name": key,
+            "description": _join(value.get("description", "")),
+            "refs": _join(value.get("npcs", []), value.get("locations", []), value.get("quest_giver", "")),
+            "text": _join(value.get("objectives", []), value.get("consequences", ""), value.get("rewards", "")),
+        }
+    return [(0, fields)]
+
+
+def _unit_hash(value: Any) -> str:
+    """Content hash of one top-level value (stable across processes)"""
+    return hashlib.blake2b(codec.dumps_bytes(value, pretty=False), digest_size=8).hexdigest()
+
+
+# ==================== Index ====================
+
+class SearchIndex:
+    """Per-campaign BM25 index. Use SearchIndex.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / INDEX_FILE
+        self._lock = threading.RLock()
+        # doc id -> (kind, key, position, {field: {term: tf}}, {field: length})
+        self._docs: Dict[int, Tuple[str, str, int, Dict[str, Dict[str, int]], Dict[str, int]]] = {}
+        # term -> doc id -> {field: tf}
+        self._postings: Dict[str, Dict[int, Dict[str, int]]] = {}
+        # (kind, key) -> (content hash, [doc id, ...])
+        self._units: Dict[Tuple[str, str], Tuple[str, List[int]]] = {}
+        self._field_lengths: Dict[str, int] = {field: 0 for field in FIELD_BOOSTS}
+        self._next_id = 0
+        self._vocab: Optional[List[str]] = None
+        # filename -> JsonOperations.stamp() at the last sync
+        self._stamps: Dict[str, tuple] = {}
+        self._load()
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "SearchIndex":
+        """Get the shared index for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = cls(Path(key))
+                _indexes[key] = index
+            return index
+
+    # ==================== Maintenance ====================
+
+    def _add_unit(self, kind: str, key: str, digest: str, documents: List[Tuple[int, Dict[str, Dict[str, int]]]]):
+        doc_ids = []
+        for position, terms in documents:
+            doc_id = self._next_id
+            self._next_id += 1
+            lengths = {field: sum(tfs.values()) for field, tfs in terms.items()}
+            self._docs[doc_id] = (kind, key, position, terms, lengths)
+            for field, tfs in terms.items():
+                self._field_lengths[field] += lengths[field]
+                for term, tf in tfs.items():
+                    self._postings.setdefault(term, {}).setdefault(doc_id, {})[field] = tf
+            doc_ids.append(doc_id)
+        self._units[(kind, key)] = (digest, doc_ids)
+        self._vocab = None
+
+    def _remove_unit(self, unit: Tuple[str, str]):
+        entry = self._units.pop(unit, None)
+        if entry is None:
+            return
+        for doc_id in entry[1]:
+            _, _, _, terms, lengths = self._docs.pop(doc_id)
+            for field, tfs in terms.items():
+                self._field_lengths[field] -= lengths[field]
+                for term in tfs:
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        continue
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+        self._vocab = None
+
+    @staticmethod
+    def _analyze_unit(kind: str, key: str, value: Any) -> List[Tuple[int, Dict[str, Dict[str, int]]]]:
+        documents = []
+        for position, fields in _unit_documents(kind, key, value):
+            terms = {}
+            for field, text in fields.items():
+                tfs: Dict[str, int] = {}
+                for term in analyze(text):
+                    tfs[term] = tfs.get(term, 0) + 1
+                if tfs:
+                    terms[field] = tfs
+            if terms:
+                documents.append((position, terms))
+        return documents
+
+    def _sync_kind(self, kind: str, data: Dict[str, Any]) -> int:
+        """Re-index the units of one kind whose contents changed. Returns units touched."""
+        changed = 0
+        seen = set()
+        for key, value in data.items():
+            unit = (kind, key)
+            seen.add(unit)
+            digest = _unit_hash(value)
+            entry = self._units.get(unit)
+            if entry is not None and entry[0] == digest:
+                continue
+            self._remove_unit(unit)
+            self._add_unit(kind, key, digest, self._analyze_unit(kind, key, value))
+            changed += 1
+
+        stale = [unit for unit in self._units if unit[0] == kind and unit not in seen]
+        for unit in stale:
+            self._remove_unit(unit)
+        return changed + len(stale)
+
+    def refresh(self, json_ops) -> int:
+        """
+        Bring the index up to date with a campaign's JsonOperations
+        Files whose stamp is unchanged are skipped; otherwise each entity is
+        hashed and only changed ones are re-tokenized. Returns entities re-indexed.
+        """
+        with self._lock:
+            changed = 0
+            for filename, kind in SOURCES.items():
+                stamp = json_ops.stamp(filename)
+                if stamp is not None and self._stamps.get(filename) == stamp:
+                    continue
+                data = json_ops.load_json(filename, readonly=True)
+                changed += self._sync_kind(kind, data if isinstance(data, dict) else {})
+                if stamp is None:
+                    self._stamps.pop(filename, None)
+                else:
+                    self._stamps[filename] = stamp
+            if changed:
+                self._save()
+            return changed
+
+    # ==================== Persistence ====================
+
+    def _load(self):
+        """Load the persisted index (stamps are not persisted; refresh() re-validates by hash)"""
+        try:
+            saved = codec.read_file(self.path)
+        except FileNotFoundError:
+            return
+        except (codec.JSONDecodeError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable search index {self.path.name}: {e}")
+            return
+        if not isinstance(saved, dict) or saved.get("version") != INDEX_VERSION:
+            return
+        try:
+            for kind, key, digest, documents in saved.get("units", []):
+                self._add_unit(kind, key, digest, [(position, terms) for position, terms in documents])
+        except (TypeError, ValueError, KeyError) as e:
+            print(f"[WARNING] Rebuilding corrupt search index {self.path.name}: {e}")
+            self.clear()
+
+    def _save(self):
+        units = [
+            [kind, key, digest, [[self._docs[d][2], self._docs[d][3]] for d in doc_ids]]
+            for (kind, key), (digest, doc_ids) in self._units.items()
+        ]
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f"{INDEX_FILE}.", suffix=".tmp")
+            temp_path = Path(temp_name)
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(codec.dumps_bytes({"version": INDEX_VERSION, "units": units}, pretty=False))
+            temp_path.replace(self.path)
+        except OSError as e:
+            # The index is derived data; searching still works from memory
+            print(f"[WARNING] Failed to persist search index: {e}")
+
+    def clear(self):
+        """Drop everything (the next refresh() rebuilds from scratch)"""
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._units.clear()
+            self._field_lengths = {field: 0 for field in FIELD_BOOSTS}
+            self._stamps.clear()
+            self._vocab = None
+
+    # ==================== Query ====================
+
+    def _query_terms(self, query: str) -> Dict[str, float]:
+        """Query term -> weight, with prefix expansion against the vocabulary"""
+        weights: Dict[str, float] = {}
+        for term in analyze(query):
+            if term in self._postings:
+                weights[term] = 1.0
+            if len(term) < MIN_PREFIX_LENGTH:
+                continue
+            if self._vocab is None:
+                self._vocab = sorted(self._postings)
+            start = bisect_left(self._vocab, term)
+            expanded = 0
+            for candidate in self._vocab[start:]:
+                if not candidate.startswith(term) or expanded >= PREFIX_MAX_TERMS:
+                    break
+                if candidate != term:
+                    weights[candidate] = max(weights.get(candidate, 0.0), PREFIX_WEIGHT)
+                    expanded += 1
+        return weights
+
+    def search(self, json_ops, query: str, kinds: Optional[Iterable[str]] = None,
+               limit: Optional[int] = DEFAULT_LIMIT) -> List[Tuple[str, str, int, float]]:
+        """
+        Rank documents for a free-text query (any term may match; more and
+        rarer matches in heavier fields score higher)
+        Returns up to limit (all if None) hits as (kind, key, position, score),
+        best first
+        """
+        with self._lock:
+            self.refresh(json_ops)
+            weights = self._query_terms(query)
+            if not weights or not self._docs:
+                return []
+
+            kinds = set(kinds) if kinds is not None else None
+            total = len(self._docs)
+            avg_lengths = {field: max(length / total, 1e-9) for field, length in self._field_lengths.items()}
+
+            scores: Dict[int, float] = {}
+            for term, weight in weights.items():
+                postings = self._postings[term]
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, field_tfs in postings.items():
+                    doc = self._docs[doc_id]
+                    if kinds is not None and doc[0] not in kinds:
+                        continue
+                    lengths = doc[4]
+                    tf = sum(
+                        FIELD_BOOSTS[field] * count / (1 - B + B * lengths[field] / avg_lengths[field])
+                        for field, count in field_tfs.items()
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf * (K1 + 1) / (K1 + tf)
+
+            # Ties keep index order (doc ids grow with insertion)
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0])) if limit is None else \
+                heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(self._docs[d][0], self._docs[d][1], self._docs[d][2], score) for d, score in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        """Index size: entities, documents and distinct terms"""
+        with self._lock:
+            return {"entities": len(self._units), "documents": len(self._docs), "terms": len(self._postings)}
+
+
+def main():
+    """CLI interface: query or rebuild a campaign's search index"""
+    import argparse
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+
+    parser = argparse.ArgumentParser(description='World-state search index')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    query_parser = subparsers.add_parser('query', help='Run a ranked query')
+    query_parser.add_argument('query', nargs='+', help='Search query')
+    query_parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+    query_parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='Maximum hits')
+
+    rebuild_parser = subparsers.add_parser('rebuild', help='Rebuild the index from scratch')
+    rebuild_parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+
+    args = parser.parse_args()
+
+    if not args.action:
+        parser.print_help()
+        sys.exit(1)
+
+    json_ops = JsonOperations(args.campaign_dir)
+    index = SearchIndex.for_dir(Path(args.campaign_dir))
+
+    if args.action == 'rebuild':
+        index.clear()
+        start = time.perf_counter()
+        index.refresh(json_ops)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"[SUCCESS] Indexed {index.stats()} in {elapsed:.1f} ms")
+    else:
+        index.refresh(json_ops)
+        query = ' '.join(args.query)
+        start = time.perf_counter()
+        hits = index.search(json_ops, query, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for kind, key, position, score in hits:
+            suffix = f"[{position}]" if kind in ('facts', 'consequences') else ""
+            print(f"  {score:6.2f}  {kind:<13}{key}{suffix}")
+        print(f"{len(hits)} hits in {elapsed:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Secondary indexes on frequently filtered entity fields
+NPC attitude and tags, plot status and type, and location dungeon are mapped
+value -> entity names so listings, tag searches, counts and dungeon room
+summaries don't full-scan their files. Each file's indexes are rebuilt when
+the file (or its SQLite table) changes, which includes a fresh import.
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+
+# file -> fields indexed (dotted paths; list values index every item)
+INDEXED_FIELDS = {
+    "npcs.json": ("attitude", "tags.locations", "tags.quests"),
+    "plots.json": ("status", "type"),
+    "locations.json": ("dungeon",),
+}
+
+# Values assumed for missing fields, matching the managers' own defaults
+FIELD_DEFAULTS = {
+    "plots.json": {"status": "active"},
+}
+
+_indexes: Dict[str, "SecondaryIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def _field_values(entity: Dict[str, Any], path: str, default: Any = None) -> List[str]:
+    value: Any = entity
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            value = default
+            break
+        value = value[part]
+    if isinstance(value, str):
+        return [value] if value else []
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str) and v]
+    return []
+
+
+class _FileIndex:
+    """Indexes for one file: field -> normalized value -> (display value, [names in file order])"""
+
+    def __init__(self, filename: str, data: Dict[str, Any]):
+        defaults = FIELD_DEFAULTS.get(filename, {})
+        self.names = [name for name, entity in data.items() if isinstance(entity, dict)]
+        self.fields: Dict[str, Dict[str, Tuple[str, List[str]]]] = {}
+        for field in INDEXED_FIELDS.get(filename, ()):
+            postings: Dict[str, Tuple[str, List[str]]] = {}
+            for name in self.names:
+                seen = set()
+                for value in _field_values(data[name], field, defaults.get(field)):
+                    key = value.strip().lower()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    postings.setdefault(key, (value.strip(), []))[1].append(name)
+            self.fields[field] = postings
+
+
+class SecondaryIndex:
+    """Per-campaign field indexes. Use SecondaryIndex.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        # filename -> (JsonOperations.stamp(), index)
+        self._files: Dict[str, Tuple[Optional[tuple], _FileIndex]] = {}
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "SecondaryIndex":
+        """Get the shared secondary index for a campaign directory"""
+        key = os.path.abspath(directory)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = cls(Path(key))
+                _indexes[key] = index
+            return index
+
+    def _index(self, json_ops, filename: str) -> _FileIndex:
+        stamp = json_ops.stamp(filename)
+        entry = self._files.get(filename)
+        if entry is not None and stamp is not None and entry[0] == stamp:
+            return entry[1]
+        data = json_ops.load_json(filename, readonly=True)
+        index = _FileIndex(filename, data if isinstance(data, dict) else {})
+        self._files[filename] = (stamp, index)
+        return index
+
+    def rebuild(self):
+        """Drop every cached index (the next lookup re-reads its file)"""
+        with self._lock:
+            self._files.clear()
+
+    # ==================== Lookups ====================
+
+    def lookup(self, json_ops, filename: str, field: str, value: str) -> List[str]:
+        """Names whose field equals value (case-insensitive), in file order"""
+        with self._lock:
+            postings = self._index(json_ops, filename).fields.get(field)
+            if postings is None:
+                raise KeyError(f"{filename} has no index on '{field}'")
+            entry = postings.get(value.strip().lower())
+            return list(entry[1]) if entry else []
+
+    def lookup_substring(self, json_ops, filename: str, field: str, text: str) -> List[str]:
+        """Names with any field value containing text (case-insensitive), in file order"""
+        with self._lock:
+            index = self._index(json_ops, filename)
+            postings = index.fields.get(field)
+            if postings is None:
+                raise KeyError(f"{filename} has no index on '{field}'")
+            needle = text.strip().lower()
+            matched = set()
+            for key, (_, names) in postings.items():
+                if needle in key:
+                    matched.update(names)
+            return [name for name in index.names if name in matched]
+
+    def narrow(self, json_ops, filename: str, where: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Candidate names for an equality filter using whichever fields are indexed
+        Returns None if no filter field is indexed (caller must scan everything)
+        """
+        with self._lock:
+            index = self._index(json_ops, filename)
+            candidates: Optional[set] = None
+            for field, wanted in (where or {}).items():
+                postings = index.fields.get(field)
+                if postings is None:
+                    continue
+                values = wanted if isinstance(wanted, list) else [wanted]
+                if not all(isinstance(v, str) for v in values):
+                    continue
+                names = set()
+                for value in values:
+                    entry = postings.get(value.strip().lower())
+                    if entry:
+                        names.update(entry[1])
+                candidates = names if candidates is None else candidates & names
+            if candidates is None:
+                return None
+            return [name for name in index.names if name in candidates]
+
+    def counts(self, json_ops, filename: str, field: str) -> Dict[str, int]:
+        """Number of entities per field value (normalized to lowercase)"""
+        with self._lock:
+            postings = self._index(json_ops, filename).fields.get(field)
+            if postings is None:
+                raise KeyError(f"{filename} has no index on '{field}'")
+            return {key: len(names) for key, (_, names) in postings.items()}
+
+    def groups(self, json_ops, filename: str, field: str) -> Dict[str, List[str]]:
+        """Field value (as first written) -> names, e.g. dungeon -> rooms"""
+        with self._lock:
+            postings = self._index(json_ops, filename).fields.get(field)
+            if postings is None:
+                raise KeyError(f"{filename} has no index on '{field}'")
+            return {display: list(names) for display, names in postings.values()}
+
+    def total(self, json_ops, filename: str) -> int:
+        """Number of entities in an indexed file"""
+        with self._lock:
+            return len(self._index(json_ops, filename).names)
+
+
+def main():
+    """CLI interface: show value counts for an indexed field"""
+    import argparse
+    from app.game.json_ops import JsonOperations
+
+    default_campaign = str(Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver')
+    choices = [f"{filename}:{field}" for filename, fields in INDEXED_FIELDS.items() for field in fields]
+
+    parser = argparse.ArgumentParser(description='Secondary entity indexes')
+    parser.add_argument('index', choices=choices, help='Index to show (file:field)')
+    parser.add_argument('value', nargs='?', help='Show entities with this value')
+    parser.add_argument('--campaign-dir', default=default_campaign, help='Campaign directory')
+
+    args = parser.parse_args()
+
+    filename, field = args.index.split(':', 1)
+    json_ops = JsonOperations(args.campaign_dir)
+    index = SecondaryIndex.for_dir(Path(args.campaign_dir))
+
+    if args.value:
+        names = index.lookup(json_ops, filename, field, args.value)
+        if not names:
+            print(f"[ERROR] No entities with {field} = '{args.value}'")
+            sys.exit(1)
+        for name in names:
+            print(f"  - {name}")
+    else:
+        for value, names in sorted(index.groups(json_ops, filename, field).items()):
+            print(f"  {value}: {len(names)}")
+
+
+if __name__ == "__main__":
+    main()
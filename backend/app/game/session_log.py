@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Indexed access to session-log.md
+A sidecar index (.session-log-index.json) records the byte offset of every
+"Session Started:" / "Session Ended:" line and the session counts, and is
+extended on append, so session numbers and history never re-read the whole
+log. The tail is read by seeking back from the end of the file. The log is
+append-only; a truncation, or a rewrite that changes the bytes just before
+the indexed end, is detected and triggers a rescan.
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from app.game import codec
+
+
+INDEX_FILE = ".session-log-index.json"
+INDEX_VERSION = 1
+
+STARTED_MARKER = b"Session Started:"
+ENDED_MARKER = b"Session Ended:"
+
+# Bytes before the indexed end that must be unchanged for an append to be
+# indexed incrementally
+CHECK_BYTES = 256
+
+# Block size when reading the log backwards
+TAIL_BLOCK = 8192
+
+_logs: Dict[str, "SessionLog"] = {}
+_logs_lock = threading.Lock()
+
+
+class SessionLog:
+    """Session log with a persisted offset index. Use SessionLog.for_path() to get the shared instance."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.parent / INDEX_FILE
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def for_path(cls, path: Path) -> "SessionLog":
+        """Get the shared session log for a session-log.md path"""
+        key = os.path.abspath(path)
+        with _logs_lock:
+            log = _logs.get(key)
+            if log is None:
+                log = cls(Path(key))
+                _logs[key] = log
+            return log
+
+    # ==================== Index maintenance ====================
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        # end: bytes indexed (always at a line boundary); check: digest of the
+        # CHECK_BYTES before end; entries: offsets of marker lines
+        return {"version": INDEX_VERSION, "end": 0, "check": "", "started": 0, "ended": 0, "entries": []}
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            saved = codec.read_file(self.index_path)
+        except FileNotFoundError:
+            return self._empty()
+        except (codec.JSONDecodeError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable session log index: {e}")
+            return self._empty()
+        if not isinstance(saved, dict) or saved.get("version") != INDEX_VERSION:
+            return self._empty()
+        return saved
+
+    def _save_index(self):
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f"{INDEX_FILE}.", suffix=".tmp")
+            temp_path = Path(temp_name)
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(codec.dumps_bytes(self._index, pretty=False))
+            temp_path.replace(self.index_path)
+        except OSError as e:
+            # The index is derived data; it is rebuilt from the log if missing
+            print(f"[WARNING] Failed to persist session log index: {e}")
+
+    @staticmethod
+    def _check_digest(f, end: int) -> str:
+        start = max(end - CHECK_BYTES, 0)
+        f.seek(start)
+        return hashlib.blake2b(f.read(end - start), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _scan(f, start: int, index: Dict[str, Any]) -> int:
+        """Index complete lines from start; returns the offset after the last one"""
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # partial last line: left for the next append
+            started, ended = line.count(STARTED_MARKER), line.count(ENDED_MARKER)
+            if started or ended:
+                index["started"] += started
+                index["ended"] += ended
+                index["entries"].append(offset)
+            offset += len(line)
+        return offset
+
+    def _sync(self, f, size: int) -> Dict[str, Any]:
+        """Index up to date with the open log (f) of the given size"""
+        if self._index is None:
+            self._index = self._load_index()
+        index = self._index
+        end = index["end"]
+
+        if end > size or (end and self._check_digest(f, end) != index["check"]):
+            # Truncated or rewritten: start over
+            index = self._index = self._empty()
+            end = 0
+
+        if end < size:
+            new_end = self._scan(f, end, index)
+            if new_end != end:
+                index["end"] = new_end
+                index["check"] = self._check_digest(f, new_end)
+                self._save_index()
+        return index
+
+    def _with_log(self, action, default: Any):
+        """Run action(f, index, size) on the open log under the lock"""
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    index = self._sync(f, size)
+                    return action(f, index, size)
+            except FileNotFoundError:
+                return default
+
+    @staticmethod
+    def _pending(f, index: Dict[str, Any], size: int) -> bytes:
+        """Unterminated last line (not indexed yet)"""
+        f.seek(index["end"])
+        return f.read(size - index["end"])
+
+    # ==================== Writing ====================
+
+    def append(self, text: str):
+        """Append text to the log (creating it) and extend the index"""
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+            self._with_log(lambda f, index, size: None, None)
+
+    # ==================== Reading ====================
+
+    def exists(self) -> bool:
+        """Whether the log file exists"""
+        return self.path.exists()
+
+    def session_count(self) -> int:
+        """Number of "Session Started:" markers (the current session number)"""
+        def count(f, index, size):
+            return index["started"] + self._pending(f, index, size).count(STARTED_MARKER)
+        return self._with_log(count, 0)
+
+    def ended_count(self) -> int:
+        """Number of "Session Ended:" markers"""
+        def count(f, index, size):
+            return index["ended"] + self._pending(f, index, size).count(ENDED_MARKER)
+        return self._with_log(count, 0)
+
+    def entries(self, count: int = 10) -> List[str]:
+        """The last count session start/end lines (stripped), oldest first"""
+        def read(f, index, size):
+            lines = []
+            for offset in index["entries"][-count:] if count > 0 else []:
+                f.seek(offset)
+                lines.append(f.readline().decode("utf-8", errors="replace").strip())
+            pending = self._pending(f, index, size)
+            if STARTED_MARKER in pending or ENDED_MARKER in pending:
+                lines.append(pending.decode("utf-8", errors="replace").strip())
+            return lines[-count:] if count > 0 else []
+        return self._with_log(read, [])
+
+    def tail(self, count: int = 20) -> List[str]:
+        """
+        Last count lines of the stripped log, read backwards from the end
+        (same as text.strip().split("\\n")[-count:])
+        """
+        def read(f, index, size):
+            if count <= 0:
+                return []
+            buffer = b""
+            position = size
+            while position > 0:
+                step = min(TAIL_BLOCK, position)
+                position -= step
+                f.seek(position)
+                buffer = f.read(step) + buffer
+                # One extra newline so the first kept line is complete
+                if buffer.rstrip().count(b"\n") > count:
+                    break
+            text = buffer.decode("utf-8", errors="replace")
+            if position > 0:
+                lines = text.rstrip().split("\n")[1:]
+            else:
+                lines = text.strip().split("\n")
+            return lines[-count:]
+        return self._with_log(read, [])
+
+    def fingerprint(self) -> str:
+        """
+        Cheap identity of the log's contents: size plus a digest of the
+        indexed prefix's last bytes and any pending line. Changes on every
+        append or rewrite.
+        """
+        def digest(f, index, size):
+            return f"{size}:{index['check']}:{hashlib.blake2b(self._pending(f, index, size), digest_size=8).hexdigest()}"
+        return self._with_log(digest, "")
+
+    def stats(self) -> Dict[str, int]:
+        """Index summary: indexed bytes, sessions started and ended, marker lines"""
+        def summary(f, index, size):
+            return {"bytes": size, "indexed": index["end"], "started": index["started"],
+                    "ended": index["ended"], "entries": len(index["entries"])}
+        return self._with_log(summary, {})
+
+
+def main():
+    """CLI interface: session count, history and tail of a campaign's log"""
+    import argparse
+
+    default_campaign = Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver'
+
+    parser = argparse.ArgumentParser(description='Session log index')
+    parser.add_argument('--campaign-dir', default=str(default_campaign), help='Campaign directory')
+    parser.add_argument('--tail', type=int, default=0, help='Also print the last N lines')
+
+    args = parser.parse_args()
+
+    log = SessionLog.for_path(Path(args.campaign_dir) / "session-log.md")
+    if not log.exists():
+        print("[ERROR] No session log")
+        sys.exit(1)
+
+    print(f"Sessions: {log.session_count()} started, {log.ended_count()} ended")
+    for entry in log.entries():
+        print(f"  {entry}")
+    if args.tail:
+        print("\n".join(log.tail(args.tail)))
+
+
+if __name__ == "__main__":
+    main()
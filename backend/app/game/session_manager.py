@@ -10,14 +10,17 @@ from typing import Dict, List, Optional, Any
 from pathlib import Path
 from datetime import datetime, timezone
 
+from app.game import codec
 from app.game.entity_manager import EntityManager
+from app.game.location_graph import LocationGraph
+from app.game.session_log import SessionLog
 
 
 class SessionManager(EntityManager):
     """Manage D&D session operations. Inherits from EntityManager for common functionality."""
 
-    def __init__(self, world_state_dir: str = None):
-        super().__init__(world_state_dir)
+    def __init__(self, world_state_dir: str = None, campaign_dir: str = None):
+        super().__init__(world_state_dir, campaign_dir)
 
         # Additional paths specific to session management
         self.world_state_dir = self.campaign_dir  # Alias for compatibility
@@ -27,6 +30,8 @@ class SessionManager(EntityManager):
         # Core files
         self.campaign_file = "campaign-overview.json"
         self.session_log = self.campaign_dir / "session-log.md"
+        # Offset index over the log (session counts, history, tail)
+        self.log = SessionLog.for_path(self.session_log)
 
         # Character file (single character per campaign)
         self.character_file = self.campaign_dir / "character.json"
@@ -34,6 +39,9 @@ class SessionManager(EntityManager):
         # Legacy characters dir (for backwards compatibility)
         self.characters_dir = self.campaign_dir / "characters"
 
+        # Location adjacency, shared with LocationManager
+        self.graph = LocationGraph.for_dir(self.json_ops.world_state_dir)
+
     def get_timestamp(self) -> str:
         """Get formatted timestamp"""
         return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -63,8 +71,7 @@ class SessionManager(EntityManager):
         }
 
         # Log session start
-        with open(self.session_log, 'a') as f:
-            f.write(f"## Session Started: {summary['timestamp']}\n\n")
+        self.log.append(f"## Session Started: {summary['timestamp']}\n\n")
 
         print(f"[SUCCESS] Session started at {summary['timestamp']}")
         return summary
@@ -79,10 +86,7 @@ class SessionManager(EntityManager):
         session_num = self._get_session_number()
 
         # Log session end
-        with open(self.session_log, 'a') as f:
-            f.write(f"### Session Ended: {timestamp}\n")
-            f.write(f"{summary}\n\n")
-            f.write("---\n\n")
+        self.log.append(f"### Session Ended: {timestamp}\n{summary}\n\n---\n\n")
 
         print(f"[SUCCESS] Session {session_num} ended and logged")
         return True
@@ -122,19 +126,14 @@ class SessionManager(EntityManager):
             changed = True
 
         # Add bidirectional connection if old location is valid and known
-        if old_location and old_location != "Unknown" and old_location in locations:
-            # Check if connection from old -> new exists
-            old_connections = locations[old_location].get("connections", [])
-            if not any(c.get("to") == new_location for c in old_connections):
-                old_connections.append({"to": new_location, "path": "traveled"})
-                locations[old_location]["connections"] = old_connections
-                changed = True
-
-            # Check if connection from new -> old exists
-            new_connections = locations[new_location].get("connections", [])
-            if not any(c.get("to") == old_location for c in new_connections):
-                new_connections.append({"to": old_location, "path": "traveled"})
-                locations[new_location]["connections"] = new_connections
+        # (edge checks go through the location graph, built from the same file)
+        if old_location and old_location not in ("Unknown", new_location) and old_location in locations:
+            for from_loc, to_loc in ((old_location, new_location), (new_location, old_location)):
+                if self.graph.has_connection(self.json_ops, from_loc, to_loc):
+                    continue
+                connections = locations[from_loc].get("connections", [])
+                connections.append({"to": to_loc, "path": "traveled"})
+                locations[from_loc]["connections"] = connections
                 changed = True
 
         if changed:
@@ -145,38 +144,40 @@ class SessionManager(EntityManager):
         Move party to new location
         Returns dict with previous and current location
         """
-        campaign = self.json_ops.load_json(self.campaign_file)
+        # Locations, overview and character are committed together
+        with self.transaction():
+            campaign = self.json_ops.load_json(self.campaign_file)
 
-        if 'player_position' not in campaign:
-            campaign['player_position'] = {}
+            if 'player_position' not in campaign:
+                campaign['player_position'] = {}
 
-        old_location = campaign['player_position'].get('current_location', 'Unknown')
+            old_location = campaign['player_position'].get('current_location', 'Unknown')
 
-        # Auto-create location and connections
-        self._ensure_location_and_connection(old_location, location)
+            # Auto-create location and connections
+            self._ensure_location_and_connection(old_location, location)
 
-        campaign['player_position']['previous_location'] = old_location
-        campaign['player_position']['current_location'] = location
-        campaign['player_position']['arrival_time'] = self.get_timestamp()
+            campaign['player_position']['previous_location'] = old_location
+            campaign['player_position']['current_location'] = location
+            campaign['player_position']['arrival_time'] = self.get_timestamp()
 
-        self.json_ops.save_json(self.campaign_file, campaign)
+            self.json_ops.save_json(self.campaign_file, campaign)
 
-        # Update character's location if exists
-        # Try new single character.json first, fall back to legacy characters/ dir
-        if self.character_file.exists():
-            char_data = self.json_ops.load_json("character.json")
-            char_data['current_location'] = location
-            self.json_ops.save_json("character.json", char_data)
-        else:
-            # Legacy: check characters/ directory
-            active_char = campaign.get('current_character', '')
-            if active_char:
-                char_id = active_char.lower().replace(' ', '-')
-                char_file = self.characters_dir / f"{char_id}.json"
-                if char_file.exists():
-                    char_data = self.json_ops.load_json(str(char_file))
-                    char_data['current_location'] = location
-                    self.json_ops.save_json(str(char_file), char_data)
+            # Update character's location if exists
+            # Try new single character.json first, fall back to legacy characters/ dir
+            if self.character_file.exists():
+                char_data = self.json_ops.load_json("character.json")
+                char_data['current_location'] = location
+                self.json_ops.save_json("character.json", char_data)
+            else:
+                # Legacy: check characters/ directory
+                active_char = campaign.get('current_character', '')
+                if active_char:
+                    char_id = active_char.lower().replace(' ', '-')
+                    char_file = self.characters_dir / f"{char_id}.json"
+                    if char_file.exists():
+                        char_data = self.json_ops.load_json(str(char_file))
+                        char_data['current_location'] = location
+                        self.json_ops.save_json(str(char_file), char_data)
 
         result = {
             "previous_location": old_location,
@@ -200,11 +201,11 @@ class SessionManager(EntityManager):
 
         # Gather all world state
         snapshot = {
-            "campaign_overview": self.json_ops.load_json(self.campaign_file),
-            "npcs": self.json_ops.load_json("npcs.json"),
-            "locations": self.json_ops.load_json("locations.json"),
-            "facts": self.json_ops.load_json("facts.json"),
-            "consequences": self.json_ops.load_json("consequences.json"),
+            "campaign_overview": self.json_ops.load_json(self.campaign_file, readonly=True),
+            "npcs": self.json_ops.load_json("npcs.json", readonly=True),
+            "locations": self.json_ops.load_json("locations.json", readonly=True),
+            "facts": self.json_ops.load_json("facts.json", readonly=True),
+            "consequences": self.json_ops.load_json("consequences.json", readonly=True),
             "characters": self._load_all_characters()
         }
 
@@ -217,9 +218,7 @@ class SessionManager(EntityManager):
 
         # Save to file (use absolute path directly, bypassing json_ops path resolution)
         save_path = self.saves_dir / filename
-        import json
-        with open(save_path, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        codec.write_file(save_path, save_data)
 
         print(f"[SUCCESS] Save created: {filename}")
         return filename
@@ -229,8 +228,6 @@ class SessionManager(EntityManager):
         Restore from a save point
         Name can be full filename or partial match
         """
-        import json
-
         # Find the save file
         save_file = self._find_save(name)
         if not save_file:
@@ -239,29 +236,30 @@ class SessionManager(EntityManager):
 
         # Load save data directly from absolute path
         try:
-            with open(save_file, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            save_data = codec.read_file(save_file)
+        except (codec.JSONDecodeError, IOError) as e:
             print(f"[ERROR] Failed to load save: {e}")
             return False
 
         snapshot = save_data.get('snapshot', {})
 
-        # Restore each file
-        if 'campaign_overview' in snapshot:
-            self.json_ops.save_json(self.campaign_file, snapshot['campaign_overview'])
-        if 'npcs' in snapshot:
-            self.json_ops.save_json("npcs.json", snapshot['npcs'])
-        if 'locations' in snapshot:
-            self.json_ops.save_json("locations.json", snapshot['locations'])
-        if 'facts' in snapshot:
-            self.json_ops.save_json("facts.json", snapshot['facts'])
-        if 'consequences' in snapshot:
-            self.json_ops.save_json("consequences.json", snapshot['consequences'])
-
-        # Restore characters
-        if 'characters' in snapshot:
-            self._restore_characters(snapshot['characters'])
+        # Restore each file in one transaction so a crash can't leave a
+        # mix of restored and current state
+        with self.transaction():
+            if 'campaign_overview' in snapshot:
+                self.json_ops.save_json(self.campaign_file, snapshot['campaign_overview'])
+            if 'npcs' in snapshot:
+                self.json_ops.save_json("npcs.json", snapshot['npcs'])
+            if 'locations' in snapshot:
+                self.json_ops.save_json("locations.json", snapshot['locations'])
+            if 'facts' in snapshot:
+                self.json_ops.save_json("facts.json", snapshot['facts'])
+            if 'consequences' in snapshot:
+                self.json_ops.save_json("consequences.json", snapshot['consequences'])
+
+            # Restore characters
+            if 'characters' in snapshot:
+                self._restore_characters(snapshot['characters'])
 
         print(f"[SUCCESS] Restored from save: {save_file.name}")
         return True
@@ -270,19 +268,17 @@ class SessionManager(EntityManager):
         """
         List all save points
         """
-        import json
         saves = []
         for save_file in sorted(self.saves_dir.glob("*.json"), reverse=True):
             try:
-                with open(save_file, 'r', encoding='utf-8') as f:
-                    save_data = json.load(f)
+                save_data = codec.read_file(save_file)
                 saves.append({
                     "filename": save_file.name,
                     "name": save_data.get("name", "Unknown"),
                     "created": save_data.get("created", "Unknown"),
                     "session_number": save_data.get("session_number", "?")
                 })
-            except (json.JSONDecodeError, IOError):
+            except (codec.JSONDecodeError, IOError):
                 continue
         return saves
 
@@ -303,19 +299,8 @@ class SessionManager(EntityManager):
         """
         Get session history from session log
         """
-        if not self.session_log.exists():
-            return []
-
-        content = self.session_log.read_text()
-        lines = content.split('\n')
-
-        # Extract session entries
-        sessions = []
-        for line in lines:
-            if 'Session Started:' in line or 'Session Ended:' in line:
-                sessions.append(line.strip())
-
-        return sessions[-10:]  # Return last 10 entries
+        # Last 10 start/end lines, read at their indexed offsets
+        return self.log.entries(10)
 
     # ==================== Full Session Context ====================
 
@@ -327,7 +312,7 @@ class SessionManager(EntityManager):
         lines = []
 
         # --- Campaign header ---
-        campaign = self.json_ops.load_json(self.campaign_file) or {}
+        campaign = self.json_ops.load_json(self.campaign_file, readonly=True) or {}
         campaign_name = campaign.get('name', campaign.get('campaign_name', 'Unknown Campaign'))
         session_num = self._get_session_number()
         location = campaign.get('player_position', {}).get('current_location', 'Unknown')
@@ -344,10 +329,8 @@ class SessionManager(EntityManager):
         lines.append("--- CHARACTER ---")
         char = None
         if self.character_file.exists():
-            import json as _json
             try:
-                with open(self.character_file, 'r', encoding='utf-8') as f:
-                    char = _json.load(f)
+                char = codec.read_file(self.character_file)
             except (ValueError, IOError):
                 pass
 
@@ -376,7 +359,7 @@ class SessionManager(EntityManager):
         # --- Party Members ---
         lines.append("")
         lines.append("--- PARTY MEMBERS ---")
-        npcs = self.json_ops.load_json("npcs.json") or {}
+        npcs = self.json_ops.load_json("npcs.json", readonly=True) or {}
         party = {n: d for n, d in npcs.items() if isinstance(d, dict) and d.get('is_party_member')}
 
         if party:
@@ -413,7 +396,7 @@ class SessionManager(EntityManager):
 
         # --- Pending Consequences ---
         lines.append("--- PENDING CONSEQUENCES ---")
-        consequences = self.json_ops.load_json("consequences.json") or {}
+        consequences = self.json_ops.load_json("consequences.json", readonly=True) or {}
         pending = []
         if isinstance(consequences, dict):
             for cid, cdata in consequences.items():
@@ -455,7 +438,7 @@ class SessionManager(EntityManager):
 
     def _count_items(self, filename: str) -> int:
         """Count items in a JSON file"""
-        data = self.json_ops.load_json(filename)
+        data = self.json_ops.load_json(filename, readonly=True)
         if isinstance(data, dict):
             # For facts.json, sum all category counts
             if filename == "facts.json":
@@ -467,20 +450,17 @@ class SessionManager(EntityManager):
 
     def _get_current_location(self) -> Optional[str]:
         """Get current party location"""
-        campaign = self.json_ops.load_json(self.campaign_file)
+        campaign = self.json_ops.load_json(self.campaign_file, readonly=True)
         return campaign.get('player_position', {}).get('current_location')
 
     def _get_active_character(self) -> Optional[str]:
         """Get active character name"""
-        campaign = self.json_ops.load_json(self.campaign_file)
+        campaign = self.json_ops.load_json(self.campaign_file, readonly=True)
         return campaign.get('current_character')
 
     def _get_session_number(self) -> int:
         """Get current session number from log"""
-        if not self.session_log.exists():
-            return 0
-        content = self.session_log.read_text()
-        return content.count('Session Started:')
+        return self.log.session_count()
 
     def _get_recent_sessions(self, count: int) -> List[str]:
         """Get recent session entries"""
@@ -507,13 +487,10 @@ class SessionManager(EntityManager):
 
     def _restore_characters(self, characters: Dict[str, Any]) -> None:
         """Restore character data from snapshot"""
-        import json
-
         # Check if this is new format (single 'character' key) or legacy
         if 'character' in characters and len(characters) == 1:
             # New format: restore to character.json
-            with open(self.character_file, 'w', encoding='utf-8') as f:
-                json.dump(characters['character'], f, indent=2)
+            self.json_ops.save_json("character.json", characters['character'])
         else:
             # Legacy format: restore to characters/ directory
             self.characters_dir.mkdir(parents=True, exist_ok=True)
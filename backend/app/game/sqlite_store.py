@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+SQLite storage backend for campaign world state
+Stores the entity files (npcs, locations, plots, items, facts, consequences)
+as one row per top-level key, so single-entity writes don't rewrite the file
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.game import codec
+
+
+DB_FILE = "campaign.db"
+
+# JSON file name -> table name. Each table holds one row per top-level key
+# of the document (entity name for npcs/locations/plots/items, category for
+# facts, bucket for consequences).
+TABLES = {
+    "npcs.json": "npcs",
+    "locations.json": "locations",
+    "plots.json": "plots",
+    "items.json": "items",
+    "facts.json": "facts",
+    "consequences.json": "consequences",
+}
+
+# Suffix given to JSON files once their contents live in the database
+IMPORTED_SUFFIX = ".imported"
+
+_stores: Dict[str, "SqliteStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def _encode(value: Any) -> str:
+    """Serialize a row value compactly"""
+    return codec.dumps(value, pretty=False)
+
+
+class SqliteStore:
+    """One SQLite database (WAL mode) per campaign directory"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writes = 0
+        self._doc_cache: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
+        self._cache_lock = threading.Lock()
+        self._init_schema()
+
+    @classmethod
+    def for_campaign(cls, campaign_dir: Path) -> Optional["SqliteStore"]:
+        """
+        Get the shared store for a campaign directory
+        Returns None if the campaign has not been imported into SQLite
+        """
+        db_path = Path(campaign_dir) / DB_FILE
+        if not db_path.exists():
+            return None
+        return cls.open(db_path)
+
+    @classmethod
+    def open(cls, db_path: Path) -> "SqliteStore":
+        """Get (or create) the shared store for a database path"""
+        key = os.path.abspath(db_path)
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = cls(Path(key))
+                _stores[key] = store
+            return store
+
+    # ==================== Connection ====================
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not shareable across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        for table in TABLES.values():
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def version(self) -> tuple:
+        """
+        Change token for the database
+        Covers writes from this process (counter) and other processes (db/WAL stat)
+        """
+        parts = [self._writes]
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + "-wal")):
+            try:
+                st = os.stat(path)
+                parts.extend((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                parts.extend((0, 0))
+        return tuple(parts)
+
+    def _bump(self):
+        with self._cache_lock:
+            self._writes += 1
+            self._doc_cache.clear()
+
+    # ==================== Document API ====================
+
+    @staticmethod
+    def table_for(filename: str) -> Optional[str]:
+        """Table name for a JSON file name, or None if not stored in SQLite"""
+        return TABLES.get(Path(filename).name)
+
+    def load_document(self, table: str) -> Dict[str, Any]:
+        """
+        Assemble the full document for a table (same shape as the JSON file)
+        The result is shared and cached until the next write; do not modify it
+        """
+        token = self.version()
+        with self._cache_lock:
+            cached = self._doc_cache.get(table)
+            if cached is not None and cached[0] == token:
+                return cached[1]
+
+        rows = self._conn().execute(f"SELECT key, data FROM {table} ORDER BY position").fetchall()
+        doc = {key: codec.loads(data) for key, data in rows}
+        with self._cache_lock:
+            self._doc_cache[table] = (token, doc)
+        return doc
+
+    def save_document(self, table: str, data: Dict[str, Any]) -> bool:
+        """
+        Replace a table's contents with a full document
+        Only rows whose value or position changed are written
+        """
+        return self.save_documents({table: data})
+
+    def save_documents(self, documents: Dict[str, Dict[str, Any]]) -> bool:
+        """Save several table documents in a single SQL transaction"""
+        for table, data in documents.items():
+            if not isinstance(data, dict):
+                print(f"[ERROR] Cannot store non-object document in table '{table}'")
+                return False
+
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table, data in documents.items():
+                    self._write_document(conn, table, data)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._bump()
+        return True
+
+    @staticmethod
+    def _write_document(conn: sqlite3.Connection, table: str, data: Dict[str, Any]):
+        """Diff a document against the stored rows and write the changes"""
+        existing = {
+            key: (position, stored)
+            for key, position, stored in conn.execute(f"SELECT key, position, data FROM {table}")
+        }
+        for position, (key, value) in enumerate(data.items()):
+            encoded = _encode(value)
+            if existing.get(key) != (position, encoded):
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {table} (key, position, data) VALUES (?, ?, ?)",
+                    (key, position, encoded)
+                )
+        removed = [(key,) for key in existing if key not in data]
+        if removed:
+            conn.executemany(f"DELETE FROM {table} WHERE key = ?", removed)
+
+    # ==================== Row API ====================
+
+    def has_row(self, table: str, key: str) -> bool:
+        """Check whether a top-level key exists"""
+        row = self._conn().execute(f"SELECT 1 FROM {table} WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def get_row(self, table: str, key: str) -> Optional[Any]:
+        """Get the value stored under a top-level key (a private copy), or None"""
+        row = self._conn().execute(f"SELECT data FROM {table} WHERE key = ?", (key,)).fetchone()
+        return codec.loads(row[0]) if row else None
+
+    def put_row(self, table: str, key: str, value: Any) -> bool:
+        """Insert or replace the value under a top-level key (new keys go last)"""
+        return self.put_rows(table, {key: value})
+
+    def put_rows(self, table: str, rows: Dict[str, Any]) -> bool:
+        """Insert or replace several top-level keys in one SQL transaction"""
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, value in rows.items():
+                    conn.execute(
+                        f"INSERT INTO {table} (key, position, data) VALUES "
+                        f"(?, (SELECT COALESCE(MAX(position), -1) + 1 FROM {table}), ?) "
+                        "ON CONFLICT(key) DO UPDATE SET data = excluded.data",
+                        (key, _encode(value))
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._bump()
+        return True
+
+    def delete_row(self, table: str, key: str) -> bool:
+        """Delete a top-level key. Returns False if it did not exist."""
+        conn = self._conn()
+        with self._write_lock:
+            cursor = conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        self._bump()
+        return cursor.rowcount > 0
+
+    def count(self, table: str) -> int:
+        """Number of top-level keys in a table"""
+        return self._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ==================== Import / Export ====================
+
+def import_campaign(campaign_dir: str, keep_json: bool = False) -> Dict[str, int]:
+    """
+    Load a campaign's JSON entity files into a new campaign.db
+    The JSON files are renamed with an '.imported' suffix unless keep_json is set
+    Returns row counts per table
+    """
+    campaign_dir = Path(campaign_dir)
+    db_path = campaign_dir / DB_FILE
+    if db_path.exists():
+        raise FileExistsError(f"{db_path} already exists; export it first to re-import")
+
+    store = SqliteStore.open(db_path)
+    documents = {}
+    for filename, table in TABLES.items():
+        filepath = campaign_dir / filename
+        if not filepath.exists():
+            continue
+        data = codec.read_file(filepath)
+        if not isinstance(data, dict):
+            raise ValueError(f"{filename} is not a JSON object; cannot import")
+        documents[table] = data
+
+    store.save_documents(documents)
+
+    if not keep_json:
+        for filename, table in TABLES.items():
+            filepath = campaign_dir / filename
+            if table in documents and filepath.exists():
+                filepath.replace(filepath.with_name(filename + IMPORTED_SUFFIX))
+
+    return {table: store.count(table) for table in TABLES.values()}
+
+
+def export_campaign(campaign_dir: str, remove_db: bool = False) -> List[str]:
+    """
+    Write every table back out as the original JSON files
+    If remove_db is set, the database is deleted afterwards (JSON becomes authoritative again)
+    Returns the list of files written
+    """
+    campaign_dir = Path(campaign_dir)
+    store = SqliteStore.for_campaign(campaign_dir)
+    if store is None:
+        raise FileNotFoundError(f"No {DB_FILE} in {campaign_dir}")
+
+    written = []
+    for filename, table in TABLES.items():
+        data = store.load_document(table)
+        filepath = campaign_dir / filename
+        fd, temp_name = tempfile.mkstemp(dir=campaign_dir, prefix=f".{filename}.", suffix='.tmp')
+        os.close(fd)
+        os.chmod(temp_name, 0o644)
+        codec.write_file(temp_name, data)
+        Path(temp_name).replace(filepath)
+        written.append(filename)
+
+    if remove_db:
+        store.close()
+        with _stores_lock:
+            _stores.pop(os.path.abspath(store.db_path), None)
+        for suffix in ("", "-wal", "-shm"):
+            Path(str(store.db_path) + suffix).unlink(missing_ok=True)
+        for filename in TABLES:
+            Path(campaign_dir / (filename + IMPORTED_SUFFIX)).unlink(missing_ok=True)
+
+    return written
+
+
+def main():
+    """CLI interface for the SQLite campaign store"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='SQLite campaign storage')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    import_parser = subparsers.add_parser('import', help='Import JSON entity files into campaign.db')
+    import_parser.add_argument('campaign_dir', help='Campaign directory')
+    import_parser.add_argument('--keep-json', action='store_true', help='Leave the JSON files in place')
+
+    export_parser = subparsers.add_parser('export', help='Export campaign.db back to JSON files')
+    export_parser.add_argument('campaign_dir', help='Campaign directory')
+    export_parser.add_argument('--remove-db', action='store_true', help='Delete campaign.db after exporting')
+
+    args = parser.parse_args()
+
+    if not args.action:
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        if args.action == 'import':
+            counts = import_campaign(args.campaign_dir, keep_json=args.keep_json)
+            print(f"[SUCCESS] Imported into {Path(args.campaign_dir) / DB_FILE}")
+            print(json.dumps(counts, indent=2))
+        elif args.action == 'export':
+            written = export_campaign(args.campaign_dir, remove_db=args.remove_db)
+            print(f"[SUCCESS] Exported {', '.join(written)}")
+    except (FileExistsError, FileNotFoundError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
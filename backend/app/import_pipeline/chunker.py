@@ -3,9 +3,14 @@
 Semantic Chunker for RAG-based Extraction
 
 Pre-computes query embeddings and scores chunks against categories
-via cosine similarity with threshold-based assignment.
+via cosine similarity with threshold-based assignment. Category centroids and
+queries are kept as row-normalized matrices, so a whole batch of chunks is
+scored with one matrix multiply.
 """
 
+import sys
+import time
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import numpy as np
 
@@ -23,6 +28,13 @@ def get_all_types() -> list[str]:
     return list(EXTRACTION_QUERIES.keys())
 
 
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Rows scaled to unit length (zero rows stay zero, so they score 0)"""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
 class SemanticChunker:
     """Categorize text chunks using semantic similarity."""
 
@@ -44,6 +56,11 @@ class SemanticChunker:
         self.threshold = threshold or self.DEFAULT_THRESHOLD
         self._query_embeddings: Dict[str, np.ndarray] = {}
         self._category_embeddings: Dict[str, np.ndarray] = {}
+        # Normalized matrices built from the embeddings above
+        self._categories: List[str] = []
+        self._centroid_matrix: Optional[np.ndarray] = None   # categories x dim
+        self._query_matrix: Optional[np.ndarray] = None      # all queries x dim
+        self._query_starts: Optional[np.ndarray] = None      # first query row per category
         self._initialized = False
 
     def _ensure_initialized(self):
@@ -62,9 +79,40 @@ class SemanticChunker:
             # Also compute a centroid (average) embedding for the category
             self._category_embeddings[content_type] = embeddings.mean(axis=0)
 
+        self._build_matrices()
         self._initialized = True
         print(f"  Initialized {len(self._query_embeddings)} categories")
 
+    def _build_matrices(self):
+        """Stack normalized centroids and queries (categories in insertion order)"""
+        self._categories = list(self._category_embeddings)
+        self._centroid_matrix = normalize_rows(
+            np.stack([self._category_embeddings[cat] for cat in self._categories])
+        )
+        self._query_matrix = normalize_rows(
+            np.concatenate([self._query_embeddings[cat] for cat in self._categories])
+        )
+        sizes = [len(self._query_embeddings[cat]) for cat in self._categories]
+        self._query_starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+
+    def score_matrix(self, embeddings: np.ndarray, use_query_max: bool = False) -> np.ndarray:
+        """
+        Cosine similarity of each embedding to each category, in one pass.
+
+        Args:
+            embeddings: Chunk embeddings (n_chunks x embedding_dim, or one vector).
+            use_query_max: Score by the best matching query of each category
+                          instead of the category centroid.
+
+        Returns:
+            Array of scores (n_chunks x n_categories), columns in category order.
+        """
+        self._ensure_initialized()
+        chunks = normalize_rows(embeddings)
+        if not use_query_max:
+            return chunks @ self._centroid_matrix.T
+        return np.maximum.reduceat(chunks @ self._query_matrix.T, self._query_starts, axis=1)
+
     def score_chunk(self, chunk_text: str) -> Dict[str, float]:
         """
         Score a chunk against all content type categories.
@@ -80,13 +128,8 @@ class SemanticChunker:
         # Embed the chunk
         chunk_embedding = self.embedder.embed(chunk_text)
 
-        scores = {}
-        for content_type, category_embedding in self._category_embeddings.items():
-            # Compute similarity to category centroid
-            similarity = self.embedder.similarity(chunk_embedding, category_embedding)
-            scores[content_type] = float(similarity)
-
-        return scores
+        scores = self.score_matrix(chunk_embedding)[0]
+        return dict(zip(self._categories, scores.tolist()))
 
     def score_chunk_detailed(self, chunk_text: str) -> Dict[str, Dict]:
         """
@@ -102,22 +145,25 @@ class SemanticChunker:
 
         chunk_embedding = self.embedder.embed(chunk_text)
 
+        # Similarity to every query at once, then split by category
+        sims = (normalize_rows(chunk_embedding) @ self._query_matrix.T)[0]
+        bounds = list(self._query_starts[1:]) + [len(sims)]
+
         scores = {}
         details = {}
 
-        for content_type, query_embeddings in self._query_embeddings.items():
-            # Compute similarity to each query in the category
-            sims = self.embedder.similarities(chunk_embedding, query_embeddings)
+        for content_type, start, end in zip(self._categories, self._query_starts, bounds):
+            category_sims = sims[start:end]
 
             # Use max similarity as the category score
-            max_sim = float(sims.max())
-            avg_sim = float(sims.mean())
+            max_sim = float(category_sims.max())
+            avg_sim = float(category_sims.mean())
 
             scores[content_type] = max_sim
             details[content_type] = {
                 "max_similarity": max_sim,
                 "avg_similarity": avg_sim,
-                "query_similarities": sims.tolist()
+                "query_similarities": category_sims.tolist()
             }
 
         return {"scores": scores, "details": details}
@@ -160,7 +206,9 @@ class SemanticChunker:
     def categorize_chunks(
         self,
         chunks: List[str],
-        show_progress: bool = False
+        show_progress: bool = False,
+        use_query_max: bool = False,
+        embeddings: Optional[np.ndarray] = None
     ) -> Dict[str, List[Dict]]:
         """
         Categorize multiple chunks into content type buckets.
@@ -168,6 +216,8 @@ class SemanticChunker:
         Args:
             chunks: List of text chunks to categorize.
             show_progress: Whether to show progress.
+            use_query_max: Score by best matching query instead of centroid.
+            embeddings: Precomputed chunk embeddings (embedded here if omitted).
 
         Returns:
             Dict mapping category to list of chunk dicts with:
@@ -178,38 +228,32 @@ class SemanticChunker:
         """
         self._ensure_initialized()
 
-        # Embed all chunks in batch
-        if show_progress:
-            print(f"Embedding {len(chunks)} chunks...")
-        chunk_embeddings = self.embedder.embed_batch(chunks, show_progress=show_progress)
-
         # Initialize result buckets
         categorized = {cat: [] for cat in get_all_types()}
         categorized["general"] = []
+        if not chunks:
+            return categorized
 
-        # Score and categorize each chunk
-        for idx, (chunk_text, chunk_emb) in enumerate(zip(chunks, chunk_embeddings)):
-            # Score against all categories
-            scores = {}
-            for content_type, category_embedding in self._category_embeddings.items():
-                similarity = self.embedder.similarity(chunk_emb, category_embedding)
-                scores[content_type] = float(similarity)
-
-            # Find best category
-            best_cat = max(scores, key=scores.get)
-            confidence = scores[best_cat]
-
-            # Assign to category or general
-            if confidence >= self.threshold:
-                category = best_cat
-            else:
-                category = "general"
-
+        # Embed all chunks in batch
+        if embeddings is None:
+            if show_progress:
+                print(f"Embedding {len(chunks)} chunks...")
+            embeddings = self.embedder.embed_batch(chunks, show_progress=show_progress)
+
+        # Score every chunk against every category, then pick in NumPy
+        scores = self.score_matrix(embeddings, use_query_max)
+        best = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(chunks)), best]
+        assigned = np.where(confidences >= self.threshold, best, -1)
+
+        rows = scores.tolist()
+        for idx, chunk_text in enumerate(chunks):
+            category = self._categories[assigned[idx]] if assigned[idx] >= 0 else "general"
             categorized[category].append({
                 "index": idx,
                 "text": chunk_text,
-                "confidence": confidence,
-                "all_scores": scores
+                "confidence": float(confidences[idx]),
+                "all_scores": dict(zip(self._categories, rows[idx]))
             })
 
         return categorized
@@ -229,10 +273,83 @@ class SemanticChunker:
         }
 
 
-def main():
-    """Test the semantic chunker."""
-    from lib.rag.embedder import LocalEmbedder
-
+def _categorize_loop(chunker: SemanticChunker, chunks: List[str], embeddings: np.ndarray) -> List[Tuple[str, float]]:
+    """Per-pair scoring as categorize_chunks used to do it (benchmark reference)"""
+    assigned = []
+    for chunk_emb in embeddings:
+        scores = {}
+        for content_type, category_embedding in chunker._category_embeddings.items():
+            scores[content_type] = float(chunker.embedder.similarity(chunk_emb, category_embedding))
+        best_cat = max(scores, key=scores.get)
+        confidence = scores[best_cat]
+        assigned.append((best_cat if confidence >= chunker.threshold else "general", confidence))
+    return assigned
+
+
+def load_chunk_files(chunks_dir: Path) -> List[str]:
+    """Text of chunk_*.txt files in order"""
+    return [path.read_text(encoding="utf-8") for path in sorted(chunks_dir.glob("chunk_*.txt"))]
+
+
+def benchmark(chunks: List[str], rounds: int = 20, embed: bool = True) -> Dict[str, float]:
+    """
+    Time category scoring over chunks: the per-pair loop against the matrix path.
+
+    Args:
+        chunks: Chunk texts.
+        rounds: Repetitions per measurement.
+        embed: Embed with the model. If False (or sentence-transformers is
+               missing), random unit vectors of the model's dimension are
+               scored instead; the timing doesn't depend on the values.
+
+    Returns:
+        Dict with 'loop_ms', 'matrix_ms', 'query_max_ms' per round, 'speedup'
+        and 'agree' (whether both paths assign every chunk the same way).
+    """
+    if embed and LocalEmbedder.is_available():
+        chunker = SemanticChunker()
+        chunker._ensure_initialized()
+        embeddings = chunker.embedder.embed_batch(chunks)
+    else:
+        rng = np.random.default_rng(0)
+        dim = 384  # all-MiniLM-L6-v2
+        chunker = SemanticChunker(embedder=LocalEmbedder(use_cache=False))
+        for content_type, queries in EXTRACTION_QUERIES.items():
+            query_embeddings = rng.standard_normal((len(queries), dim)).astype(np.float32)
+            chunker._query_embeddings[content_type] = query_embeddings
+            chunker._category_embeddings[content_type] = query_embeddings.mean(axis=0)
+        chunker._build_matrices()
+        chunker._initialized = True
+        embeddings = rng.standard_normal((len(chunks), dim)).astype(np.float32)
+
+    def timed(action) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            action()
+        return (time.perf_counter() - start) * 1000 / rounds
+
+    loop_ms = timed(lambda: _categorize_loop(chunker, chunks, embeddings))
+    matrix_ms = timed(lambda: chunker.categorize_chunks(chunks, embeddings=embeddings))
+    query_max_ms = timed(lambda: chunker.categorize_chunks(chunks, use_query_max=True, embeddings=embeddings))
+
+    categorized = chunker.categorize_chunks(chunks, embeddings=embeddings)
+    matrix = {item["index"]: (cat, item["confidence"]) for cat, items in categorized.items() for item in items}
+    agree = all(
+        matrix[i][0] == cat and abs(matrix[i][1] - confidence) < 1e-5
+        for i, (cat, confidence) in enumerate(_categorize_loop(chunker, chunks, embeddings))
+    )
+
+    return {
+        "loop_ms": loop_ms,
+        "matrix_ms": matrix_ms,
+        "query_max_ms": query_max_ms,
+        "speedup": loop_ms / matrix_ms if matrix_ms else 0.0,
+        "agree": agree,
+    }
+
+
+def demo():
+    """Categorize a few sample chunks."""
     if not LocalEmbedder.is_available():
         print("sentence-transformers not installed!")
         return
@@ -268,5 +385,44 @@ def main():
                 print(f"  - Chunk {item['index']}: {item['confidence']:.3f}")
 
 
+def main():
+    """CLI interface: demo categorization or benchmark scoring on a campaign's chunks"""
+    import argparse
+
+    default_campaign = Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver'
+
+    parser = argparse.ArgumentParser(description='Semantic chunker')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    subparsers.add_parser('demo', help='Categorize sample chunks')
+
+    bench_parser = subparsers.add_parser('bench', help='Benchmark category scoring on a campaign\'s chunks')
+    bench_parser.add_argument('campaign_dir', nargs='?', default=str(default_campaign),
+                              help='Campaign directory (default: bundled Lost Mine of Phandelver)')
+    bench_parser.add_argument('--rounds', type=int, default=20, help='Rounds per measurement')
+    bench_parser.add_argument('--random', action='store_true',
+                              help='Score random embeddings instead of loading the model')
+
+    args = parser.parse_args()
+
+    if args.action == 'bench':
+        chunks = load_chunk_files(Path(args.campaign_dir) / 'chunks')
+        if not chunks:
+            print(f"[ERROR] No chunk files in {Path(args.campaign_dir) / 'chunks'}")
+            sys.exit(1)
+        embed = not args.random and LocalEmbedder.is_available()
+        if not args.random and not embed:
+            print("[INFO] sentence-transformers not installed; scoring random embeddings")
+        results = benchmark(chunks, args.rounds, embed)
+        print(f"{len(chunks)} chunks, {len(get_all_types())} categories, {args.rounds} rounds")
+        print(f"{'per-pair loop':<20}{results['loop_ms']:>10.3f} ms")
+        print(f"{'matrix (centroid)':<20}{results['matrix_ms']:>10.3f} ms  ({results['speedup']:.1f}x)")
+        print(f"{'matrix (query max)':<20}{results['query_max_ms']:>10.3f} ms")
+        if not results['agree']:
+            print("[WARNING] Matrix and loop assignments differ")
+    else:
+        demo()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Streaming document reading and chunking for the import pipeline
+
+Documents are read a page (PDF), paragraph (DOCX) or block (text) at a time
+and cut into chunks as the text arrives, so memory stays bounded by the
+chunk size and one page no matter how long the document is.
+"""
+
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+
+# Characters read per block from plain-text documents
+TEXT_BLOCK_CHARS = 64 * 1024
+
+# Text without any paragraph break is cut at a line break (or anywhere) once
+# this many chunk sizes are buffered, so the buffer stays bounded
+MAX_PENDING_CHUNKS = 4
+
+# Section boundaries: markdown headers, "ALL CAPS:" labels, chapters and parts
+HEADER_PATTERN = r'^(?:#{1,3}\s+.+|[A-Z][A-Z\s]+:|Chapter \d+|PART [IVX]+)'
+_HEADER_RE = re.compile(HEADER_PATTERN, flags=re.MULTILINE)
+
+
+def iter_document(filepath: Path) -> Iterator[Tuple[str, int, Optional[int]]]:
+    """
+    Yield (text, page, total_pages) pieces of a document in order
+    Pieces concatenate to the document's text; PDF pages are separated by a
+    blank line. page counts pages (PDF), paragraphs (DOCX) or blocks (text);
+    total_pages is None when it isn't known up front.
+    """
+    filepath = Path(filepath)
+    suffix = filepath.suffix.lower()
+    if suffix == ".pdf":
+        yield from _iter_pdf(filepath)
+    elif suffix == ".docx":
+        yield from _iter_docx(filepath)
+    else:
+        yield from _iter_text(filepath)
+
+
+def _iter_pdf(filepath: Path) -> Iterator[Tuple[str, int, Optional[int]]]:
+    try:
+        import pdfplumber
+    except ImportError:
+        pdfplumber = None
+
+    if pdfplumber is not None:
+        with pdfplumber.open(str(filepath)) as pdf:
+            total = len(pdf.pages)
+            for number, page in enumerate(pdf.pages, 1):
+                text = page.extract_text() or ""
+                # Drop the page's parsed layout so only one page is held at a time
+                page.flush_cache()
+                yield text + "\n\n", number, total
+        return
+
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(str(filepath))
+    total = len(reader.pages)
+    for number, page in enumerate(reader.pages, 1):
+        yield (page.extract_text() or "") + "\n\n", number, total
+
+
+def _iter_docx(filepath: Path) -> Iterator[Tuple[str, int, Optional[int]]]:
+    from docx import Document
+
+    paragraphs = Document(str(filepath)).paragraphs
+    for number, paragraph in enumerate(paragraphs, 1):
+        yield paragraph.text + "\n\n", number, len(paragraphs)
+
+
+def _iter_text(filepath: Path) -> Iterator[Tuple[str, int, Optional[int]]]:
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        number = 0
+        while True:
+            block = f.read(TEXT_BLOCK_CHARS)
+            if not block:
+                break
+            number += 1
+            yield block, number, None
+
+
+class IncrementalChunker:
+    """
+    Cuts text into chunks of about chunk_size characters as it is fed
+    Text is split at section headers first; sections larger than chunk_size
+    are split at paragraph breaks. feed() returns the chunks completed so far
+    and finish() the rest.
+    """
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self._pending = ""   # text after the last header seen (may still grow)
+        self._current = ""   # chunk being accumulated
+
+    def feed(self, text: str) -> List[str]:
+        """Add text; returns chunks that can no longer change"""
+        self._pending += text
+        chunks: List[str] = []
+
+        # Every section before the last header is complete
+        starts = [m.start() for m in _HEADER_RE.finditer(self._pending) if m.start() > 0]
+        if starts:
+            self._add_sections(self._pending[:starts[-1]], chunks)
+            self._pending = self._pending[starts[-1]:]
+
+        # A long run without headers is released at its last paragraph break
+        if len(self._pending) > self.chunk_size:
+            cut = self._pending.rfind("\n\n")
+            if cut <= 0 and len(self._pending) > MAX_PENDING_CHUNKS * self.chunk_size:
+                cut = self._pending.rfind("\n")
+                if cut <= 0:
+                    cut = len(self._pending) - self.chunk_size
+            if cut > 0:
+                self._add_sections(self._pending[:cut], chunks)
+                self._pending = self._pending[cut:]
+        return chunks
+
+    def finish(self) -> List[str]:
+        """Flush everything still buffered"""
+        chunks: List[str] = []
+        self._add_sections(self._pending, chunks)
+        self._pending = ""
+        if self._current.strip():
+            chunks.append(self._current.strip())
+        self._current = ""
+        return chunks
+
+    def _add_sections(self, text: str, chunks: List[str]):
+        for section in re.split(f'({HEADER_PATTERN})', text, flags=re.MULTILINE):
+            if section.strip():
+                self._add_section(section, chunks)
+
+    def _add_section(self, section: str, chunks: List[str]):
+        if len(self._current) + len(section) <= self.chunk_size:
+            self._current += section
+            return
+
+        if self._current:
+            chunks.append(self._current.strip())
+
+        # If section itself is too large, split it further
+        if len(section) > self.chunk_size:
+            sub_chunks = split_by_paragraphs(section, self.chunk_size)
+            chunks.extend(sub_chunks[:-1])  # Add all but last
+            self._current = sub_chunks[-1] if sub_chunks else ""
+        else:
+            self._current = section
+
+
+def split_by_paragraphs(text: str, chunk_size: int) -> List[str]:
+    """Split text by paragraphs, respecting chunk size."""
+    chunks = []
+    paragraphs = text.split('\n\n')
+
+    current_chunk = ""
+
+    for para in paragraphs:
+        if len(current_chunk) + len(para) > chunk_size:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+            current_chunk = para
+        else:
+            current_chunk += "\n\n" + para if current_chunk else para
+
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+
+    return chunks
+
+
+def iter_chunks(filepath: Path, chunk_size: int) -> Iterator[Tuple[str, int, Optional[int]]]:
+    """Yield (chunk, page, total_pages) for a document, page being where the chunk was completed"""
+    chunker = IncrementalChunker(chunk_size)
+    page, total = 0, None
+    for text, page, total in iter_document(filepath):
+        for chunk in chunker.feed(text):
+            yield chunk, page, total
+    for chunk in chunker.finish():
+        yield chunk, page, total
@@ -3,15 +3,20 @@
 Local Embedder for RAG-based Document Extraction
 
 Uses sentence-transformers with all-MiniLM-L6-v2 (22MB, fast) for local vectorization.
+Embeddings are cached on disk by content (see embedding_cache), so repeated
+texts are only encoded once per model.
 """
 
 import os
 import sys
 import warnings
 import logging
+from pathlib import Path
 from typing import List, Optional
 import numpy as np
 
+from app.import_pipeline.embedding_cache import EmbeddingCache, normalize_text, text_key
+
 # Suppress HuggingFace and transformers warnings
 os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "1"
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -26,16 +31,21 @@ class LocalEmbedder:
 
     DEFAULT_MODEL = "all-MiniLM-L6-v2"
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, cache_dir: Optional[str] = None, use_cache: bool = True):
         """
         Initialize the local embedder.
 
         Args:
             model_name: The sentence-transformers model to use.
                        Defaults to all-MiniLM-L6-v2 (22MB, fast, good quality).
+            cache_dir: Embedding cache directory (default: ASTRAL_EMBEDDING_CACHE).
+            use_cache: Whether to use the persistent embedding cache.
         """
         self.model_name = model_name or self.DEFAULT_MODEL
         self._model = None
+        self.cache: Optional[EmbeddingCache] = None
+        if use_cache:
+            self.cache = EmbeddingCache.for_model(self.model_name, Path(cache_dir) if cache_dir else None)
 
     @staticmethod
     def is_available() -> bool:
@@ -69,8 +79,10 @@ class LocalEmbedder:
         Returns:
             Embedding vector as numpy array.
         """
-        self._ensure_model()
-        return self._model.encode(text, convert_to_numpy=True)
+        if self.cache is None:
+            self._ensure_model()
+            return self._model.encode(text, convert_to_numpy=True)
+        return self.embed_batch([text])[0]
 
     def embed_batch(self, texts: List[str], batch_size: int = 32, show_progress: bool = False) -> np.ndarray:
         """
@@ -84,13 +96,45 @@ class LocalEmbedder:
         Returns:
             Array of embedding vectors (n_texts x embedding_dim).
         """
-        self._ensure_model()
-        return self._model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True
-        )
+        if self.cache is None or len(texts) == 0:
+            self._ensure_model()
+            return self._model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True
+            )
+
+        normalized = [normalize_text(text) for text in texts]
+        keys = [text_key(text) for text in normalized]
+        try:
+            vectors = self.cache.get_many(keys)
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Embedding cache unavailable, encoding without it: {e}")
+            self.cache = None
+            return self.embed_batch(texts, batch_size, show_progress)
+
+        # Only cache misses go to the model, each distinct text once
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], normalized[i])
+        if missing:
+            self._ensure_model()
+            encoded = self._model.encode(
+                list(missing.values()),
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True
+            )
+            fresh = dict(zip(missing, encoded))
+            try:
+                self.cache.put_many(list(fresh), encoded)
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] Failed to store embeddings in the cache: {e}")
+            vectors = [fresh[keys[i]] if vector is None else vector for i, vector in enumerate(vectors)]
+
+        return np.stack(vectors).astype(np.float32, copy=False)
 
     def similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
@@ -171,6 +215,9 @@ def main():
     sims = embedder.similarities(query, embeddings)
     print(f"Similarities to 'A warrior walks into an inn': {sims}")
 
+    if embedder.cache is not None:
+        print(f"Cache: {embedder.cache.stats()}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed embedding cache
+
+Embeddings are keyed by (model name, SHA-256 of the normalized text) and kept
+in a memory-mapped matrix, one file set per model:
+
+    <model>.vectors   rows x dim matrix (float32, or float16 to halve the size)
+    <model>.keys      rows x 16 bytes: the key digest stored in each row
+    <model>.json      offsets index: digest -> row, least recently used first
+
+The keys file is authoritative (every hit is checked against it), so a stale
+or lost index only costs recency order, never a wrong vector. When the matrix
+reaches max_entries rows the least recently used row is reused.
+
+Configuration:
+    ASTRAL_EMBEDDING_CACHE         cache directory, or 0/off to disable
+                                   (default: $XDG_CACHE_HOME/astral/embeddings)
+    ASTRAL_EMBEDDING_CACHE_DTYPE   float32 (default) or float16
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+
+INDEX_VERSION = 1
+
+# Serializes writers to a cache directory across processes
+LOCK_FILE = ".embedding-cache.lock"
+
+# Rows the cache may hold per model before least recently used rows are reused
+DEFAULT_MAX_ENTRIES = 50000
+
+# Rows allocated when the matrix is created; it doubles up to max_entries
+INITIAL_ROWS = 1024
+
+# Bytes of the SHA-256 digest kept as the key
+KEY_BYTES = 16
+
+# The index is rewritten after this many changes (and at exit)
+INDEX_SAVE_EVERY = 256
+
+DTYPES = ("float32", "float16")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+_caches: Dict[Tuple[str, str], "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+
+
+@contextmanager
+def embedding_cache_lock(directory: Path):
+    """
+    Hold the cross-process lock of an embedding cache directory
+    Threads are serialized by each cache's own lock; this adds an flock on
+    LOCK_FILE (a no-op where fcntl is unavailable)
+    """
+    fd = None
+    if fcntl is not None:
+        try:
+            fd = os.open(Path(directory) / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            # Read-only or missing directory: fall back to in-process locking
+            print(f"[WARNING] Cannot open embedding cache lock file in {directory}: {e}")
+    try:
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        if fd is not None:
+            # Closing the descriptor releases the flock
+            os.close(fd)
+
+
+def default_directory() -> Optional[Path]:
+    """Cache directory from ASTRAL_EMBEDDING_CACHE, or None if caching is disabled"""
+    setting = os.environ.get("ASTRAL_EMBEDDING_CACHE", "").strip()
+    if setting.lower() in ("0", "false", "no", "off"):
+        return None
+    if setting:
+        return Path(setting).expanduser()
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "astral" / "embeddings"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Text as it is keyed and embedded: NFC, whitespace runs collapsed, trimmed
+    The tokenizers split on whitespace, so this doesn't change the embedding
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(normalized: str) -> bytes:
+    """Key digest of normalized text"""
+    return hashlib.sha256(normalized.encode("utf-8")).digest()[:KEY_BYTES]
+
+
+class EmbeddingCache:
+    """Embedding cache for one model. Use EmbeddingCache.for_model() to get the shared instance."""
+
+    def __init__(
+        self,
+        directory: Path,
+        model_name: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        dtype: str = "float32",
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype} (use one of {', '.join(DTYPES)})")
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.max_entries = max(int(max_entries), 1)
+        self.dtype = np.dtype(dtype)
+
+        slug = _SLUG_RE.sub("_", model_name).strip("_")[:64] or "model"
+        name = f"{slug}-{hashlib.sha256(model_name.encode('utf-8')).hexdigest()[:8]}"
+        self.vectors_path = self.directory / f"{name}.vectors"
+        self.keys_path = self.directory / f"{name}.keys"
+        self.index_path = self.directory / f"{name}.json"
+
+        self._lock = threading.RLock()
+        self._opened = False
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        # digest -> row, least recently used first
+        self._slots: "OrderedDict[bytes, int]" = OrderedDict()
+        self._free: List[int] = []
+        self._keys_stamp: Optional[tuple] = None
+        self._unsaved = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def for_model(cls, model_name: str, directory: Optional[Path] = None) -> Optional["EmbeddingCache"]:
+        """Shared cache for a model (None if caching is disabled)"""
+        directory = directory or default_directory()
+        if directory is None:
+            return None
+        dtype = os.environ.get("ASTRAL_EMBEDDING_CACHE_DTYPE", "float32").strip().lower() or "float32"
+        key = (os.path.abspath(directory), model_name)
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = cls(Path(key[0]), model_name, dtype=dtype)
+                _caches[key] = cache
+            return cache
+
+    # ==================== Storage ====================
+
+    def _stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.keys_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _map(self, rows: int):
+        """Map rows of the matrix and keys files (which must be that large)"""
+        self._rows = rows
+        if rows == 0:
+            self._vectors = self._keys = None
+            return
+        self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(rows, self._dim))
+        self._keys = np.memmap(self.keys_path, dtype=np.uint8, mode="r+", shape=(rows, KEY_BYTES))
+
+    def _open(self):
+        """Load the index and map the files (once)"""
+        if self._opened:
+            return
+        self._opened = True
+        self._keys_stamp = self._stamp()
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as e:
+            print(f"[WARNING] Ignoring unreadable embedding cache index: {e}")
+            return
+        if (not isinstance(index, dict) or index.get("version") != INDEX_VERSION
+                or index.get("model") != self.model_name or index.get("dtype") != self.dtype.name
+                or not isinstance(index.get("dim"), int)):
+            return  # different layout: started over on the next write
+        self._dim = index["dim"]
+        self._reload(index.get("order") or [])
+
+    def _reload(self, order: Sequence[Any]):
+        """
+        Rebuild slots from the keys file, keeping the given recency order
+        (hex digest, row pairs or digests) for rows it still holds
+        """
+        try:
+            keys_size = os.path.getsize(self.keys_path)
+            vectors_size = os.path.getsize(self.vectors_path)
+        except OSError:
+            keys_size = vectors_size = 0
+        rows = min(keys_size // KEY_BYTES, vectors_size // (self._dim * self.dtype.itemsize))
+        self._map(rows)
+        self._keys_stamp = self._stamp()
+
+        stored: Dict[bytes, int] = {}
+        if rows:
+            for row in np.flatnonzero(self._keys.any(axis=1)):
+                stored[self._keys[row].tobytes()] = int(row)
+
+        slots: "OrderedDict[bytes, int]" = OrderedDict()
+        recent = []
+        for entry in order:
+            digest = bytes.fromhex(entry[0]) if isinstance(entry, list) else entry
+            if digest in stored and digest not in slots:
+                recent.append(digest)
+        # Rows the index doesn't know (written by another process) count as oldest
+        listed = set(recent)
+        for digest, row in stored.items():
+            if digest not in listed:
+                slots[digest] = row
+        for digest in recent:
+            slots[digest] = stored[digest]
+
+        self._slots = slots
+        used = set(slots.values())
+        self._free = [row for row in range(rows - 1, -1, -1) if row not in used]
+
+    def _sync(self):
+        """Pick up rows another process wrote since the last look"""
+        if self._stamp() == self._keys_stamp:
+            return
+        if self._dim is None:
+            # Created by another process: read its layout
+            self._opened = False
+            self._open()
+        else:
+            self._reload(list(self._slots))
+
+    def _save_index(self):
+        if self._dim is None:
+            return
+        index = {
+            "version": INDEX_VERSION,
+            "model": self.model_name,
+            "dim": self._dim,
+            "dtype": self.dtype.name,
+            "order": [[digest.hex(), row] for digest, row in self._slots.items()],
+        }
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=f"{self.index_path.name}.", suffix=".tmp")
+            temp_path = Path(temp_name)
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            temp_path.replace(self.index_path)
+            self._unsaved = 0
+        except OSError as e:
+            # Recency only; the keys file still maps every row
+            print(f"[WARNING] Failed to persist embedding cache index: {e}")
+
+    def _grow(self, rows: int):
+        """Extend the files to rows and remap"""
+        for path, row_bytes in ((self.vectors_path, self._dim * self.dtype.itemsize), (self.keys_path, KEY_BYTES)):
+            with open(path, "ab") as f:
+                if f.tell() < rows * row_bytes:
+                    f.truncate(rows * row_bytes)
+        old_rows = self._rows
+        self._map(rows)
+        self._free.extend(range(rows - 1, old_rows - 1, -1))
+
+    def _reset(self, dim: int):
+        """Start an empty matrix for vectors of dim"""
+        self._map(0)
+        for path in (self.vectors_path, self.keys_path):
+            path.unlink(missing_ok=True)
+        self._dim = dim
+        self._slots.clear()
+        self._free = []
+        # Record the layout right away; the keys file is useless without it
+        self._save_index()
+
+    def _take_row(self) -> int:
+        if not self._free and self._rows < self.max_entries:
+            self._grow(min(max(self._rows * 2, INITIAL_ROWS), self.max_entries))
+        if self._free:
+            return self._free.pop()
+        _, row = self._slots.popitem(last=False)
+        self._stats["evictions"] += 1
+        return row
+
+    # ==================== Lookups ====================
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached vectors (float32 copies) for key digests; None for misses"""
+        with self._lock:
+            self._open()
+            self._sync()
+            found: List[Optional[np.ndarray]] = []
+            for digest in keys:
+                row = self._slots.get(digest)
+                vector = None
+                if row is not None:
+                    vector = np.array(self._vectors[row], dtype=np.float32)
+                    # Another process may have reused the row since the last sync
+                    if self._keys[row].tobytes() != digest:
+                        del self._slots[digest]
+                        vector = None
+                if vector is None:
+                    self._stats["misses"] += 1
+                else:
+                    self._slots.move_to_end(digest)
+                    self._stats["hits"] += 1
+                found.append(vector)
+            return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray):
+        """Store vectors (one row per key digest)"""
+        vectors = np.asarray(vectors)
+        if not len(keys):
+            return
+        dim = int(vectors.shape[-1])
+        with self._lock:
+            self._open()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with embedding_cache_lock(self.directory):
+                self._sync()
+                if self._dim != dim:
+                    self._reset(dim)
+                rows = []
+                reused = []
+                for digest in keys:
+                    row = self._slots.get(digest)
+                    if row is None:
+                        row = self._take_row()
+                        self._slots[digest] = row
+                        if self._keys[row].any():
+                            reused.append(row)
+                    self._slots.move_to_end(digest)
+                    rows.append((row, digest))
+                # Unlabel reused rows before overwriting them, and label rows
+                # only once their vector is written, so a row's key never
+                # names a vector it doesn't hold
+                if reused:
+                    self._keys[reused] = 0
+                    self._keys.flush()
+                for (row, _), vector in zip(rows, vectors):
+                    self._vectors[row] = vector
+                self._vectors.flush()
+                for row, digest in rows:
+                    self._keys[row] = np.frombuffer(digest, dtype=np.uint8)
+                self._keys.flush()
+                self._keys_stamp = self._stamp()
+                self._unsaved += len(rows)
+                if self._unsaved >= INDEX_SAVE_EVERY:
+                    self._save_index()
+
+    # ==================== Maintenance ====================
+
+    def flush(self):
+        """Persist the recency index if it has unsaved changes"""
+        with self._lock:
+            if self._unsaved and self._dim is not None:
+                with embedding_cache_lock(self.directory):
+                    self._save_index()
+
+    def clear(self):
+        """Delete every cached embedding for this model (counters are kept)"""
+        with self._lock:
+            self._open()
+            with embedding_cache_lock(self.directory):
+                self._map(0)
+                for path in (self.vectors_path, self.keys_path, self.index_path):
+                    path.unlink(missing_ok=True)
+                self._dim = None
+                self._slots.clear()
+                self._free = []
+                self._keys_stamp = None
+                self._unsaved = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters (hits, misses, evictions, hit_rate) and size (entries, rows, dim, bytes)"""
+        with self._lock:
+            self._open()
+            self._sync()
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._slots)
+            stats["rows"] = self._rows
+            stats["dim"] = self._dim
+            stats["dtype"] = self.dtype.name
+            stats["bytes"] = self._rows * ((self._dim or 0) * self.dtype.itemsize + KEY_BYTES)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+def _flush_all():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.flush()
+        except Exception as e:  # interpreter shutdown: never fail the exit
+            print(f"[WARNING] Failed to flush embedding cache: {e}")
+
+
+atexit.register(_flush_all)
+
+
+def main():
+    """CLI interface: show or clear the embedding cache for a model"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Embedding cache')
+    parser.add_argument('action', choices=['stats', 'clear'], help='Action to perform')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='Model name')
+    parser.add_argument('--dir', help='Cache directory (default: ASTRAL_EMBEDDING_CACHE)')
+
+    args = parser.parse_args()
+
+    cache = EmbeddingCache.for_model(args.model, Path(args.dir) if args.dir else None)
+    if cache is None:
+        print("[ERROR] Embedding cache is disabled (ASTRAL_EMBEDDING_CACHE)")
+        sys.exit(1)
+
+    if args.action == 'stats':
+        print(json.dumps(cache.stats(), indent=2))
+    elif args.action == 'clear':
+        cache.clear()
+        print(f"[SUCCESS] Cleared embedding cache for {args.model}")
+
+
+if __name__ == "__main__":
+    main()
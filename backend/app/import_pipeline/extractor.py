@@ -2,21 +2,29 @@
 """
 RAG Extractor - Document Vectorization for /enhance
 
-Simple pipeline:
-1. Extract text from document
-2. Split into chunks
-3. Embed chunks locally
-4. Store in campaign-specific vector store
+Streaming pipeline, one page at a time:
+1. Read text from the document page by page
+2. Cut it into chunks as it arrives
+3. Embed new chunks locally in micro-batches
+4. Upsert each batch into the campaign-specific vector store
+5. Delete chunks of the previous import that no longer appear
+
+Chunk IDs come from the document name and a hash of the chunk text, and a
+manifest records what each document has embedded, so re-importing a revised
+document only embeds the chunks that changed. Memory stays bounded by one
+page and one batch, however long the document. Progress events are yielded
+as batches are stored (see iter_extract).
 
 No categorization - all chunks are stored uniformly and queried by semantic similarity.
 """
 
-import re
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
 from datetime import datetime
 
+from app.import_pipeline.document_stream import IncrementalChunker, iter_chunks, iter_document, split_by_paragraphs
 from app.import_pipeline.embedder import LocalEmbedder
+from app.import_pipeline.manifest import ImportManifest, chunk_id
 from app.import_pipeline.vector_store import CampaignVectorStore
 
 
@@ -25,6 +33,12 @@ class RAGExtractor:
 
     DEFAULT_CHUNK_SIZE = 3000
 
+    # Chunks embedded and stored together
+    EMBED_BATCH_SIZE = 32
+
+    # IDs per metadata update or delete call
+    UPDATE_BATCH_SIZE = 500
+
     def __init__(
         self,
         campaign_dir: str,
@@ -66,58 +80,144 @@ class RAGExtractor:
             Dict with extraction stats
         """
         filepath = Path(filepath)
-        self._document_name = filepath.stem
 
         print(f"RAG Extraction: {filepath.name}")
         print("=" * 50)
 
+        for event in self.iter_extract(filepath, clear_existing):
+            if event["stage"] == "start":
+                if event["cleared"]:
+                    print("Cleared existing vectors")
+                elif event["existing_chunks"] > 0:
+                    print(f"Preserving {event['existing_chunks']} existing vectors (use clear_existing=True to reset)")
+            elif event["stage"] == "stored":
+                pages = f"page {event['page']}/{event['total_pages']}" if event["total_pages"] else f"block {event['page']}"
+                print(f"  {pages}: {event['chunks']} chunks ({event['embedded']} embedded, {event['unchanged']} unchanged)")
+            elif event["stage"] == "done":
+                print(f"  {event['embedded']} embedded, {event['unchanged']} unchanged, {event['removed']} removed")
+                print(f"  Stored {event['total_chunks_in_store']} chunks total")
+
+        print("\nExtraction complete!")
+        return self._extraction_metadata
+
+    def iter_extract(
+        self,
+        filepath: str,
+        clear_existing: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a document into the vector store, yielding progress events.
+
+        Only chunks not already stored for this document (by content hash)
+        are embedded; chunks of the previous import that no longer appear are
+        deleted afterwards. Embeddings from a different model are redone.
+
+        Events are dicts with a 'stage':
+        - 'start': 'document', 'cleared', 'existing_chunks' (of this document)
+        - 'stored': after each batch; 'page', 'total_pages' (None if unknown),
+          'chunks' (read so far), 'embedded', 'unchanged', 'chars'
+        - 'done': the extraction metadata plus 'embedded', 'unchanged',
+          'removed' and 'total_chunks_in_store'
+
+        Args:
+            filepath: Path to the document (PDF, DOCX, TXT, etc.)
+            clear_existing: Whether to clear existing vectors first (default: False)
+        """
+        filepath = Path(filepath)
+        document = self._document_name = filepath.stem
+        manifest = ImportManifest(self.vector_store.vectors_dir)
+
         # Clear existing vectors if explicitly requested
+        existing: set = set()
+        entry: Dict[str, Any] = {}
         if clear_existing:
-            print("Clearing existing vectors...")
             self.vector_store.clear()
+            manifest.clear()
         else:
-            existing_count = self.vector_store.count()
-            if existing_count > 0:
-                print(f"Preserving {existing_count} existing vectors (use clear_existing=True to reset)")
-
-        # Step 1: Extract raw text
-        print("Step 1: Extracting text from document...")
-        raw_text = self._extract_text(filepath)
-        print(f"  Extracted {len(raw_text):,} characters")
-
-        # Step 2: Split into chunks
-        print("Step 2: Splitting into chunks...")
-        chunks = self._split_into_chunks(raw_text)
-        print(f"  Created {len(chunks)} chunks")
-
-        # Step 3: Embed all chunks
-        print("Step 3: Embedding chunks...")
-        embeddings = self.embedder.embed_batch(
-            chunks,
-            batch_size=32,
-            show_progress=True
-        )
-        print(f"  Embedded {len(embeddings)} chunks")
+            existing = set(self.vector_store.get_ids(where={"document": document}))
+            entry = manifest.get(document) or {}
+        previous_order = {cid: i for i, cid in enumerate(entry.get("chunks", []))}
+        yield {
+            "stage": "start",
+            "document": document,
+            "cleared": clear_existing,
+            "existing_chunks": len(existing),
+        }
 
-        # Step 4: Store in vector database
-        print("Step 4: Storing in vector database...")
-        self._store_chunks(chunks, embeddings)
+        # Stored chunks can be kept only if the same model embedded them
+        same_model = entry.get("model", self.embedder.model_name) == self.embedder.model_name
+        reusable = existing if same_model else set()
+
+        ids: List[str] = []
+        occurrences: Dict[str, int] = {}
+        batch: List[tuple] = []     # (index, id, text) to embed
+        moved: List[tuple] = []     # (index, id) kept but now at another position
+        counts = {"embedded": 0, "unchanged": 0}
+        chars = 0
+        page, total_pages = 0, None
+
+        for chunk, page, total_pages in iter_chunks(filepath, self.chunk_size):
+            base = chunk_id(document, chunk)
+            cid = chunk_id(document, chunk, occurrences.get(base, 0))
+            occurrences[base] = occurrences.get(base, 0) + 1
+            index = len(ids)
+            ids.append(cid)
+            chars += len(chunk)
+
+            if cid in reusable:
+                counts["unchanged"] += 1
+                if previous_order.get(cid) != index:
+                    moved.append((index, cid))
+                continue
 
-        stats = self.vector_store.get_stats()
-        print(f"  Stored {stats['total_chunks']} chunks total")
+            batch.append((index, cid, chunk))
+            if len(batch) >= self.EMBED_BATCH_SIZE:
+                self._store_batch(batch)
+                counts["embedded"] += len(batch)
+                batch = []
+                yield self._progress(len(ids), counts, chars, page, total_pages)
+
+        if batch:
+            self._store_batch(batch)
+            counts["embedded"] += len(batch)
+        yield self._progress(len(ids), counts, chars, page, total_pages)
+
+        # Kept chunks only need their position updated
+        for start in range(0, len(moved), self.UPDATE_BATCH_SIZE):
+            part = moved[start:start + self.UPDATE_BATCH_SIZE]
+            self.vector_store.update_metadatas(
+                [cid for _, cid in part],
+                [self._chunk_metadata(index) for index, _ in part]
+            )
+
+        # Chunks that vanished from the document
+        vanished = sorted(existing - set(ids))
+        for start in range(0, len(vanished), self.UPDATE_BATCH_SIZE):
+            self.vector_store.delete_ids(vanished[start:start + self.UPDATE_BATCH_SIZE])
+
+        manifest.set(document, ids, self.embedder.model_name, self.chunk_size, str(filepath))
+        manifest.save()
+        self.vector_store.persist()
 
         # Save extraction metadata
         self._extraction_metadata = {
             "source_file": str(filepath),
-            "document_name": self._document_name,
+            "document_name": document,
             "extraction_date": datetime.now().isoformat(),
-            "total_chars": len(raw_text),
-            "total_chunks": len(chunks),
+            "total_chars": chars,
+            "total_chunks": len(ids),
+            "total_pages": total_pages,
             "chunk_size": self.chunk_size,
+            "embedded": counts["embedded"],
+            "unchanged": counts["unchanged"],
+            "removed": len(vanished),
         }
+        yield {"stage": "done", **self._extraction_metadata, "total_chunks_in_store": self.vector_store.count()}
 
-        print("\nExtraction complete!")
-        return self._extraction_metadata
+    @staticmethod
+    def _progress(chunks: int, counts: Dict[str, int], chars: int, page: int, total_pages: Optional[int]) -> Dict[str, Any]:
+        return {"stage": "stored", "page": page, "total_pages": total_pages, "chunks": chunks,
+                "embedded": counts["embedded"], "unchanged": counts["unchanged"], "chars": chars}
 
     def query(
         self,
@@ -164,84 +264,30 @@ class RAGExtractor:
         }
 
     def _extract_text(self, filepath: Path) -> str:
-        """Extract text from a document file."""
-        from lib.content_extractor import ContentExtractor
-
-        extractor = ContentExtractor()
-        return extractor.extract_text(str(filepath))
+        """Extract the full text of a document (buffers it all; prefer iter_extract)."""
+        return "".join(text for text, _, _ in iter_document(filepath))
 
     def _split_into_chunks(self, text: str) -> List[str]:
         """Split text into chunks of approximately chunk_size characters."""
-        chunks = []
-
-        # Try to split by headers first (markdown or common patterns)
-        header_pattern = r'^(?:#{1,3}\s+.+|[A-Z][A-Z\s]+:|Chapter \d+|PART [IVX]+)'
-        sections = re.split(f'({header_pattern})', text, flags=re.MULTILINE)
-
-        current_chunk = ""
-
-        for section in sections:
-            if not section.strip():
-                continue
-
-            if len(current_chunk) + len(section) > self.chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-
-                # If section itself is too large, split it further
-                if len(section) > self.chunk_size:
-                    sub_chunks = self._split_by_paragraphs(section)
-                    chunks.extend(sub_chunks[:-1])  # Add all but last
-                    current_chunk = sub_chunks[-1] if sub_chunks else ""
-                else:
-                    current_chunk = section
-            else:
-                current_chunk += section
-
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-
-        # If we got very few chunks, fall back to paragraph splitting
-        if len(chunks) <= 1 and len(text) > self.chunk_size:
-            chunks = self._split_by_paragraphs(text)
-
-        return chunks
+        chunker = IncrementalChunker(self.chunk_size)
+        return chunker.feed(text) + chunker.finish()
 
     def _split_by_paragraphs(self, text: str) -> List[str]:
         """Split text by paragraphs, respecting chunk size."""
-        chunks = []
-        paragraphs = text.split('\n\n')
-
-        current_chunk = ""
-
-        for para in paragraphs:
-            if len(current_chunk) + len(para) > self.chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para
-            else:
-                current_chunk += "\n\n" + para if current_chunk else para
-
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-
-        return chunks
-
-    def _store_chunks(self, chunks: List[str], embeddings):
-        """Store chunks in the vector store with basic metadata."""
-        metadatas = []
-        for i in range(len(chunks)):
-            metadatas.append({
-                "chunk_index": i,
-                "document": self._document_name or "unknown",
-            })
+        return split_by_paragraphs(text, self.chunk_size)
+
+    def _chunk_metadata(self, index: int) -> Dict[str, Any]:
+        return {"chunk_index": index, "document": self._document_name or "unknown"}
 
-        # Store all chunks
-        self.vector_store.add_chunks(
+    def _store_batch(self, batch: List[tuple]):
+        """Embed a batch of (index, id, text) chunks and upsert it with basic metadata."""
+        chunks = [text for _, _, text in batch]
+        embeddings = self.embedder.embed_batch(chunks, batch_size=self.EMBED_BATCH_SIZE)
+        self.vector_store.upsert_chunks(
             chunks=chunks,
-            embeddings=[emb.tolist() for emb in embeddings],
-            metadatas=metadatas,
-            ids=[f"doc_{i:04d}" for i in range(len(chunks))]
+            embeddings=embeddings,
+            metadatas=[self._chunk_metadata(index) for index, _, _ in batch],
+            ids=[cid for _, cid, _ in batch]
         )
 
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Import manifest - which chunks of which documents are already embedded
+
+Chunk IDs are derived from the document name and a hash of the chunk text,
+so the same chunk always gets the same ID. The manifest (vectors/manifest.json)
+records, per document, the chunk IDs in order plus the embedding model and
+chunk size they were made with. A re-import embeds only chunks whose IDs are
+new and deletes the ones that vanished.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Hex digits of the SHA-256 of the chunk text kept in an ID
+CHUNK_HASH_CHARS = 16
+
+
+def chunk_id(document: str, text: str, occurrence: int = 0) -> str:
+    """
+    Stable ID for a chunk of a document
+    occurrence numbers repeats of identical text within the document
+    """
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:CHUNK_HASH_CHARS]
+    return f"{document}:{digest}" if occurrence == 0 else f"{document}:{digest}:{occurrence}"
+
+
+class ImportManifest:
+    """Per-campaign record of embedded documents, stored next to the vectors."""
+
+    def __init__(self, vectors_dir: Path):
+        self.path = Path(vectors_dir) / MANIFEST_FILE
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "documents": {}}
+        except (ValueError, OSError) as e:
+            # Only costs a full re-embed of documents imported before
+            print(f"[WARNING] Ignoring unreadable import manifest: {e}")
+            return {"version": MANIFEST_VERSION, "documents": {}}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {"version": MANIFEST_VERSION, "documents": {}}
+        data.setdefault("documents", {})
+        return data
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f"{MANIFEST_FILE}.", suffix=".tmp")
+        temp_path = Path(temp_name)
+        try:
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2)
+            temp_path.replace(self.path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def documents(self) -> List[str]:
+        """Names of the documents in the manifest"""
+        return list(self._data["documents"])
+
+    def get(self, document: str) -> Optional[Dict[str, Any]]:
+        """Entry for a document: 'chunks' (IDs in order), 'model', 'chunk_size', 'source_file', 'updated'"""
+        return self._data["documents"].get(document)
+
+    def set(self, document: str, chunk_ids: List[str], model: str, chunk_size: int, source_file: str):
+        """Record a document's chunks after an import"""
+        self._data["documents"][document] = {
+            "source_file": source_file,
+            "model": model,
+            "chunk_size": chunk_size,
+            "updated": datetime.now().isoformat(),
+            "chunks": chunk_ids,
+        }
+
+    def remove(self, document: str):
+        """Forget a document"""
+        self._data["documents"].pop(document, None)
+
+    def clear(self):
+        """Forget every document"""
+        self._data["documents"] = {}
@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Lightweight local vector index - an alternative engine to ChromaDB
+
+Stores a collection in one directory:
+
+    vectors.<n>.f32     rows x dim matrix of L2-normalized float32 embeddings
+    documents.<n>.txt   chunk texts, appended (entries point at byte ranges)
+    index.json          per row: id, document range and metadata (null =
+                        deleted), plus n, the file generation in use
+
+Files are only appended to; index.json is replaced atomically after each
+write, so a crash mid-write leaves the previous state readable. Deleted and
+replaced rows are tombstoned and compacted once they outnumber live ones:
+compaction writes the next file generation, switches index.json over to it
+and only then deletes the old files.
+
+Queries are exact top-k by cosine similarity (one matrix-vector product over
+the memory-mapped matrix). Above HNSW_MIN_ROWS rows an HNSW graph is used
+instead when hnswlib is installed; it is rebuilt after writes, on the first
+query. The collection mirrors the subset of the ChromaDB Collection API the
+vector store uses (add, upsert, update, delete, get, query, count), including
+'where' metadata filters and 'where_document' text filters.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+import numpy as np
+
+from app.game.locks import get_campaign_lock
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+INDEX_VERSION = 1
+
+INDEX_FILE = "index.json"
+# Data files, named by file generation (bumped by each compaction)
+VECTORS_FILE = "vectors.{}.f32"
+DOCUMENTS_FILE = "documents.{}.txt"
+HNSW_FILE = "hnsw.bin"
+HNSW_META_FILE = "hnsw.json"
+
+# Live rows from which the HNSW graph is used (exact search is fast below)
+HNSW_MIN_ROWS = 20000
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Chunks per upsert when loading benchmark stores (ChromaDB caps batch sizes)
+BENCH_LOAD_BATCH = 1000
+
+# Tombstones tolerated before the files are compacted
+COMPACT_MIN_TOMBSTONES = 64
+
+_indexes: Dict[str, "LocalVectorIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+def is_hnsw_available() -> bool:
+    """Whether hnswlib is installed"""
+    return hnswlib is not None
+
+
+# ==================== Filters ====================
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def matches_where(metadata: Optional[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether metadata satisfies a ChromaDB-style filter:
+    {"field": value}, {"field": {"$gt": 3}} (also $eq, $ne, $gte, $lt, $lte,
+    $in, $nin), {"$and": [...]}, {"$or": [...]}; several keys mean AND
+    """
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                compare = _COMPARISONS.get(op)
+                if compare is None:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                try:
+                    if not compare(value, target):
+                        return False
+                except TypeError:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def matches_document(text: str, where_document: Optional[Dict[str, Any]]) -> bool:
+    """Whether text satisfies {"$contains": s}, {"$not_contains": s}, {"$and": [...]} or {"$or": [...]}"""
+    if not where_document:
+        return True
+    for key, condition in where_document.items():
+        if key == "$contains":
+            ok = condition in text
+        elif key == "$not_contains":
+            ok = condition not in text
+        elif key == "$and":
+            ok = all(matches_document(text, sub) for sub in condition)
+        elif key == "$or":
+            ok = any(matches_document(text, sub) for sub in condition)
+        else:
+            raise ValueError(f"Unsupported where_document operator: {key}")
+        if not ok:
+            return False
+    return True
+
+
+def _normalized(embeddings: Any) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+# ==================== Index ====================
+
+class LocalVectorIndex:
+    """One collection on disk. Use LocalVectorIndex.for_dir() to get the shared instance."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_FILE
+        self._lock = threading.RLock()
+        self._stamp: Optional[tuple] = None
+        self._loaded = False
+        self._dim: Optional[int] = None
+        self._generation = 0
+        # Generation of the data files index.json points at
+        self._files = 0
+        # Per row; None marks a deleted row
+        self._ids: List[Optional[str]] = []
+        self._docs: List[Optional[List[int]]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._row_of: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._hnsw = None
+        self._hnsw_generation = -1
+        self._live: Optional[np.ndarray] = None
+        self._live_generation = -1
+
+    @classmethod
+    def for_dir(cls, directory: Path) -> "LocalVectorIndex":
+        """Get the shared index for a collection directory"""
+        key = os.path.abspath(directory)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = cls(Path(key))
+                _indexes[key] = index
+            return index
+
+    # ==================== Storage ====================
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / VECTORS_FILE.format(self._files)
+
+    @property
+    def documents_path(self) -> Path:
+        return self.directory / DOCUMENTS_FILE.format(self._files)
+
+    def _data_files(self) -> List[Path]:
+        """Data files of every generation present in the directory"""
+        return [path for pattern in (VECTORS_FILE, DOCUMENTS_FILE)
+                for path in self.directory.glob(pattern.format("*"))]
+
+    def _remove_stale_files(self):
+        """Delete data files of generations index.json no longer points at"""
+        current = {self.vectors_path, self.documents_path}
+        for path in self._data_files():
+            if path not in current:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    print(f"[WARNING] Failed to remove old vector index file {path.name}: {e}")
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.index_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self):
+        """Reload if another instance or process rewrote the index"""
+        stamp = self._file_stamp()
+        if self._loaded and stamp == self._stamp:
+            return
+        data: Dict[str, Any] = {}
+        if stamp is not None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (ValueError, OSError) as e:
+                print(f"[WARNING] Ignoring unreadable vector index: {e}")
+                data = {}
+            if data.get("version") != INDEX_VERSION:
+                data = {}
+        self._dim = data.get("dim")
+        self._generation = data.get("generation", 0)
+        self._files = data.get("files", 0)
+        self._ids = data.get("ids", [])
+        self._docs = data.get("documents", [])
+        self._metadatas = data.get("metadatas", [])
+        self._row_of = {cid: row for row, cid in enumerate(self._ids) if cid is not None}
+        self._map()
+        self._stamp = stamp
+        self._loaded = True
+
+    def _map(self):
+        rows = len(self._ids)
+        if rows == 0 or self._dim is None:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+
+    def _save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "dim": self._dim,
+            "generation": self._generation,
+            "files": self._files,
+            "ids": self._ids,
+            "documents": self._docs,
+            "metadatas": self._metadatas,
+        }
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=f"{INDEX_FILE}.", suffix=".tmp")
+        temp_path = Path(temp_name)
+        try:
+            os.chmod(temp_path, 0o644)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            temp_path.replace(self.index_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._stamp = self._file_stamp()
+
+    def _read_documents(self, rows: Sequence[int]) -> List[str]:
+        if not len(rows):
+            return []
+        texts = []
+        with open(self.documents_path, "rb") as f:
+            for row in rows:
+                offset, length = self._docs[row]
+                f.seek(offset)
+                texts.append(f.read(length).decode("utf-8"))
+        return texts
+
+    def _writing(self):
+        """Lock for a write: in-process and across processes sharing the directory"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return get_campaign_lock(self.directory).hold()
+
+    # ==================== Writes ====================
+
+    def add(self, ids: List[str], embeddings: Any, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Add chunks; IDs already present are ignored (as in ChromaDB)"""
+        self._write(ids, embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids: List[str], embeddings: Any, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None):
+        """Add chunks, replacing any stored under the same IDs"""
+        self._write(ids, embeddings, documents, metadatas, replace=True)
+
+    def _write(self, ids, embeddings, documents, metadatas, replace: bool):
+        vectors = _normalized(embeddings)
+        if len(ids) == 0:
+            return
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} embeddings for {len(ids)} IDs")
+        documents = documents if documents is not None else [""] * len(ids)
+        metadatas = metadatas if metadatas is not None else [None] * len(ids)
+
+        with self._lock, self._writing():
+            self._refresh()
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self._dim}")
+
+            # Later duplicates within one call win, as separate upserts would
+            latest = {cid: i for i, cid in enumerate(ids)}
+            keep = [i for i, cid in enumerate(ids) if latest[cid] == i and (replace or cid not in self._row_of)]
+            if not keep:
+                return
+
+            first_row = len(self._ids)
+            with open(self.documents_path, "ab") as f:
+                spans = []
+                for i in keep:
+                    raw = (documents[i] or "").encode("utf-8")
+                    spans.append([f.tell(), len(raw)])
+                    f.write(raw)
+            mode = "r+b" if self.vectors_path.exists() else "w+b"
+            with open(self.vectors_path, mode) as f:
+                # Rows past the index are leftovers of an interrupted write
+                f.seek(first_row * self._dim * 4)
+                f.write(np.ascontiguousarray(vectors[keep]).tobytes())
+                f.truncate()
+
+            for span, i in zip(spans, keep):
+                cid = ids[i]
+                old = self._row_of.get(cid)
+                if old is not None:
+                    self._tombstone(old)
+                self._row_of[cid] = len(self._ids)
+                self._ids.append(cid)
+                self._docs.append(span)
+                self._metadatas.append(dict(metadatas[i]) if metadatas[i] else None)
+            self._commit()
+
+    def update(self, ids: List[str], metadatas: Optional[List[Dict[str, Any]]] = None,
+               embeddings: Any = None, documents: Optional[List[str]] = None):
+        """Change stored chunks; unknown IDs are ignored"""
+        if embeddings is not None or documents is not None:
+            # New vectors or text go through the append path
+            with self._lock:
+                self._refresh()
+                known = [i for i, cid in enumerate(ids) if cid in self._row_of]
+                if not known:
+                    return
+                rows = [self._row_of[ids[i]] for i in known]
+                vectors = _normalized(embeddings)[known] if embeddings is not None else self._matrix[rows]
+                texts = [documents[i] for i in known] if documents is not None else self._read_documents(rows)
+                metas = [metadatas[i] for i in known] if metadatas is not None else [self._metadatas[r] for r in rows]
+                self.upsert([ids[i] for i in known], vectors, texts, metas)
+            return
+
+        with self._lock, self._writing():
+            self._refresh()
+            changed = False
+            for cid, metadata in zip(ids, metadatas or []):
+                row = self._row_of.get(cid)
+                if row is not None:
+                    self._metadatas[row] = dict(metadata) if metadata else None
+                    changed = True
+            if changed:
+                self._commit(vectors_changed=False)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Delete chunks by ID and/or metadata filter"""
+        with self._lock, self._writing():
+            self._refresh()
+            rows = set()
+            if ids is not None:
+                rows.update(self._row_of[cid] for cid in ids if cid in self._row_of)
+            if where:
+                candidates = rows if ids is not None else set(self._row_of.values())
+                rows = {row for row in candidates if matches_where(self._metadatas[row], where)}
+            if not rows:
+                return
+            for row in rows:
+                del self._row_of[self._ids[row]]
+                self._tombstone(row)
+            self._commit()
+
+    def clear(self):
+        """Delete everything in the collection"""
+        with self._lock, self._writing():
+            for path in self._data_files():
+                path.unlink(missing_ok=True)
+            for name in (HNSW_FILE, HNSW_META_FILE):
+                (self.directory / name).unlink(missing_ok=True)
+            self._dim = None
+            self._files = 0
+            self._ids, self._docs, self._metadatas, self._row_of = [], [], [], {}
+            self._generation += 1
+            self._matrix = None
+            self._hnsw = None
+            self._save()
+
+    def _tombstone(self, row: int):
+        self._ids[row] = None
+        self._docs[row] = None
+        self._metadatas[row] = None
+
+    def _commit(self, vectors_changed: bool = True):
+        compacted = False
+        if vectors_changed:
+            self._generation += 1
+            tombstones = len(self._ids) - len(self._row_of)
+            if tombstones >= COMPACT_MIN_TOMBSTONES and tombstones > len(self._row_of):
+                self._compact()
+                compacted = True
+            self._map()
+        # The index switches readers (and a restart) over to compacted files
+        self._save()
+        if compacted:
+            self._remove_stale_files()
+
+    def _compact(self):
+        """
+        Write the live rows to the next file generation (holding the write lock)
+        The current files stay untouched until index.json points at the new ones
+        """
+        live = [row for row, cid in enumerate(self._ids) if cid is not None]
+        matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                           shape=(len(self._ids), self._dim)) if self._ids else None
+        texts = self._read_documents(live)
+
+        files = self._files + 1
+        with open(self.directory / VECTORS_FILE.format(files), "wb") as f:
+            if live:
+                f.write(np.ascontiguousarray(matrix[live]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        spans = []
+        with open(self.directory / DOCUMENTS_FILE.format(files), "wb") as f:
+            for text in texts:
+                raw = text.encode("utf-8")
+                spans.append([f.tell(), len(raw)])
+                f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        del matrix
+
+        self._files = files
+        self._ids = [self._ids[row] for row in live]
+        self._metadatas = [self._metadatas[row] for row in live]
+        self._docs = spans
+        self._row_of = {cid: row for row, cid in enumerate(self._ids)}
+
+    # ==================== Reads ====================
+
+    def count(self) -> int:
+        """Number of stored chunks"""
+        with self._lock:
+            self._refresh()
+            return len(self._row_of)
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            where_document: Optional[Dict[str, Any]] = None,
+            include: Sequence[str] = ("documents", "metadatas")) -> Dict[str, Any]:
+        """Chunks by ID and/or filter, in insertion order (ChromaDB get() shape)"""
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                rows = [self._row_of[cid] for cid in ids if cid in self._row_of]
+            else:
+                rows = [row for row, cid in enumerate(self._ids) if cid is not None]
+            rows = [row for row in rows if matches_where(self._metadatas[row], where)]
+            if where_document:
+                rows = [row for row, text in zip(rows, self._read_documents(rows)) if matches_document(text, where_document)]
+            rows = rows[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": self._read_documents(rows) if "documents" in include else None,
+                "metadatas": [self._metadatas[row] for row in rows] if "metadatas" in include else None,
+                "embeddings": np.array(self._matrix[rows]) if "embeddings" in include and rows else None,
+            }
+
+    def query(self, query_embeddings: Any, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              where_document: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = ("documents", "metadatas", "distances")) -> Dict[str, Any]:
+        """
+        Nearest chunks by cosine distance (1 - similarity) for each query
+        Returns ChromaDB query() shape: one list per query embedding
+        """
+        queries = _normalized(query_embeddings)
+        with self._lock:
+            self._refresh()
+            if self._dim is not None and queries.shape[1] != self._dim:
+                raise ValueError(f"Query dimension {queries.shape[1]} does not match collection dimensionality {self._dim}")
+
+            mask = self._mask(where, where_document)
+            results: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            for query in queries:
+                rows, scores = self._nearest(query, n_results, mask)
+                results["ids"].append([self._ids[row] for row in rows])
+                results["documents"].append(self._read_documents(rows) if "documents" in include else None)
+                results["metadatas"].append([self._metadatas[row] for row in rows] if "metadatas" in include else None)
+                results["distances"].append([float(1.0 - s) for s in scores] if "distances" in include else None)
+            return results
+
+    def _mask(self, where, where_document) -> Optional[np.ndarray]:
+        """Boolean mask of rows eligible for a query (None if there are none)"""
+        if not self._row_of:
+            return None
+        if self._live_generation != self._generation or self._live is None or len(self._live) != len(self._ids):
+            self._live = np.fromiter((cid is not None for cid in self._ids), dtype=bool, count=len(self._ids))
+            self._live_generation = self._generation
+        live = self._live
+        if not where and not where_document:
+            return live
+        live = live.copy()
+        if where:
+            for row in np.flatnonzero(live):
+                if not matches_where(self._metadatas[row], where):
+                    live[row] = False
+        if where_document:
+            rows = np.flatnonzero(live).tolist()
+            for row, text in zip(rows, self._read_documents(rows)):
+                if not matches_document(text, where_document):
+                    live[row] = False
+        return live if live.any() else None
+
+    def _nearest(self, query: np.ndarray, n: int, mask: Optional[np.ndarray]):
+        if mask is None or n <= 0:
+            return [], []
+        eligible = int(mask.sum())
+        k = min(n, eligible)
+
+        # The graph pays off only over many eligible rows; a narrow filter
+        # is answered exactly over just the rows it lets through
+        graph = self._graph() if eligible >= HNSW_MIN_ROWS else None
+        if graph is not None:
+            try:
+                graph.set_ef(max(HNSW_EF_SEARCH, k * 2))
+                filtered = eligible < len(self._row_of)
+                labels, distances = graph.knn_query(
+                    query, k=k, filter=(lambda label: bool(mask[label])) if filtered else None
+                )
+                return labels[0].tolist(), (1.0 - distances[0]).tolist()
+            except RuntimeError:
+                pass  # too few reachable under the filter: exact search instead
+
+        if eligible == len(mask):
+            rows = None
+            scores = self._matrix @ query
+        else:
+            rows = np.flatnonzero(mask)
+            scores = self._matrix[rows] @ query
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return (top if rows is None else rows[top]).tolist(), scores[top].tolist()
+
+    # ==================== HNSW ====================
+
+    def _graph(self):
+        """HNSW graph for the current rows, or None to search exactly"""
+        if hnswlib is None or len(self._row_of) < HNSW_MIN_ROWS:
+            return None
+        if self._hnsw is not None and self._hnsw_generation == self._generation:
+            return self._hnsw
+
+        graph_path = self.directory / HNSW_FILE
+        meta_path = self.directory / HNSW_META_FILE
+        graph = hnswlib.Index(space="ip", dim=self._dim)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                saved = json.load(f).get("generation")
+        except (OSError, ValueError):
+            saved = None
+        if saved == self._generation and graph_path.exists():
+            graph.load_index(str(graph_path), max_elements=len(self._ids))
+        else:
+            live = np.fromiter(self._row_of.values(), dtype=np.int64)
+            graph.init_index(max_elements=len(self._ids), ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+            graph.add_items(self._matrix[live], live)
+            try:
+                graph.save_index(str(graph_path))
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"generation": self._generation}, f)
+            except OSError as e:
+                # Rebuilt in memory by the next process instead
+                print(f"[WARNING] Failed to persist HNSW graph: {e}")
+        self._hnsw = graph
+        self._hnsw_generation = self._generation
+        return graph
+
+    def prepare(self):
+        """Build and persist the HNSW graph now if the index is large enough (after an import)"""
+        with self._lock:
+            self._refresh()
+            self._graph()
+
+    def stats(self) -> Dict[str, Any]:
+        """Rows (live and deleted), dimension and search method"""
+        with self._lock:
+            self._refresh()
+            return {
+                "chunks": len(self._row_of),
+                "tombstones": len(self._ids) - len(self._row_of),
+                "dim": self._dim,
+                "search": "hnsw" if hnswlib is not None and len(self._row_of) >= HNSW_MIN_ROWS else "exact",
+            }
+
+
+# ==================== Benchmark ====================
+
+_BENCH_CHILD = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+from app.import_pipeline.vector_store import CampaignVectorStore
+store = CampaignVectorStore(sys.argv[1], backend=sys.argv[2])
+count = store.count()
+startup = time.perf_counter() - start
+queries = json.loads(sys.stdin.read())
+start = time.perf_counter()
+store.query_similar(queries[0], n_results=8)
+first = time.perf_counter() - start
+start = time.perf_counter()
+for query in queries:
+    store.query_similar(query, n_results=8)
+query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"count": count, "startup_ms": startup * 1000, "first_query_ms": first * 1000,
+                  "query_ms": query_ms, "rss_mb": rss_kb / 1024}))
+"""
+
+
+def benchmark(chunks: List[str], backends: List[str], queries: int = 50, dim: int = 384) -> Dict[str, Dict[str, float]]:
+    """
+    Load chunks into a fresh store per backend, then time a new process
+    opening it (import + open + count), its first query, the mean query
+    latency and its peak RSS. Embeddings are random unit vectors; the
+    engines' cost doesn't depend on the values.
+    """
+    import subprocess
+    from app.import_pipeline.vector_store import CampaignVectorStore
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((len(chunks), dim)).astype(np.float32)
+    query_vectors = rng.standard_normal((queries, dim)).astype(np.float32).tolist()
+    metadatas = [{"chunk_index": i, "document": "bench"} for i in range(len(chunks))]
+    ids = [f"bench:{i}" for i in range(len(chunks))]
+    backend_root = Path(__file__).resolve().parent.parent.parent
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for backend in backends:
+            campaign_dir = Path(tmpdir) / backend
+            store = CampaignVectorStore(str(campaign_dir), backend=backend)
+            start = time.perf_counter()
+            for first in range(0, len(chunks), BENCH_LOAD_BATCH):
+                part = slice(first, first + BENCH_LOAD_BATCH)
+                store.upsert_chunks(chunks[part], embeddings[part], metadatas[part], ids[part])
+            store.persist()
+            load_ms = (time.perf_counter() - start) * 1000
+
+            child = subprocess.run(
+                [sys.executable, "-c", _BENCH_CHILD, str(campaign_dir), backend],
+                input=json.dumps(query_vectors), capture_output=True, text=True,
+                cwd=backend_root, env={**os.environ, "PYTHONPATH": str(backend_root)},
+            )
+            if child.returncode != 0:
+                print(f"[ERROR] {backend} benchmark failed: {child.stderr.strip()[-500:]}")
+                continue
+            results[backend] = {"load_ms": load_ms, **json.loads(child.stdout.strip().splitlines()[-1])}
+    return results
+
+
+def main():
+    """CLI interface: stats for a campaign's local index, or benchmark it against ChromaDB"""
+    import argparse
+
+    default_campaign = Path(__file__).parent.parent.parent / 'data' / 'campaigns' / 'lost-mine-of-phandelver'
+
+    parser = argparse.ArgumentParser(description='Local vector index')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+
+    stats_parser = subparsers.add_parser('stats', help='Show a campaign\'s local index')
+    stats_parser.add_argument('campaign_dir', nargs='?', default=str(default_campaign), help='Campaign directory')
+
+    bench_parser = subparsers.add_parser('bench', help='Compare startup, RSS and query latency with ChromaDB')
+    bench_parser.add_argument('campaign_dir', nargs='?', default=str(default_campaign),
+                              help='Campaign whose chunks/*.txt are loaded (default: bundled Lost Mine of Phandelver)')
+    bench_parser.add_argument('--repeat', type=int, default=1, help='Load the chunks this many times (larger corpora)')
+    bench_parser.add_argument('--queries', type=int, default=50, help='Queries per backend')
+
+    args = parser.parse_args()
+
+    if args.action == 'stats':
+        from app.import_pipeline.vector_store import CampaignVectorStore
+        store = CampaignVectorStore(args.campaign_dir, backend="local")
+        print(json.dumps(store.get_stats(), indent=2))
+
+    elif args.action == 'bench':
+        from app.import_pipeline.vector_store import CampaignVectorStore
+
+        chunks = [path.read_text(encoding="utf-8") for path in sorted((Path(args.campaign_dir) / 'chunks').glob('chunk_*.txt'))]
+        if not chunks:
+            print(f"[ERROR] No chunk files in {Path(args.campaign_dir) / 'chunks'}")
+            sys.exit(1)
+        chunks = [f"{text}\n[{n}]" for n in range(max(args.repeat, 1)) for text in chunks]
+
+        backends = ["local"]
+        if CampaignVectorStore.chroma_available():
+            backends.append("chroma")
+        else:
+            print("[INFO] chromadb not installed; benchmarking the local index only")
+
+        results = benchmark(chunks, backends, args.queries)
+        print(f"{len(chunks)} chunks, {args.queries} queries, search: "
+              f"{'hnsw' if is_hnsw_available() and len(chunks) >= HNSW_MIN_ROWS else 'exact'}")
+        print(f"{'backend':<10}{'load ms':>10}{'startup ms':>12}{'1st query ms':>14}{'query ms':>10}{'RSS MB':>9}")
+        for backend, r in results.items():
+            print(f"{backend:<10}{r['load_ms']:>10.1f}{r['startup_ms']:>12.1f}{r['first_query_ms']:>14.2f}"
+                  f"{r['query_ms']:>10.3f}{r['rss_mb']:>9.1f}")
+
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
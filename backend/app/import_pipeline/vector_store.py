@@ -2,7 +2,13 @@
 """
 Campaign-specific Vector Store for RAG-based Extraction
 
-Uses ChromaDB with persistent storage per campaign.
+Persistent storage per campaign, on one of two engines:
+    local   built-in memory-mapped index (vector_index.py); needs only numpy
+    chroma  ChromaDB PersistentClient
+
+ASTRAL_VECTOR_BACKEND picks one; the default (auto) keeps campaigns that
+already have a ChromaDB store on ChromaDB while chromadb is installed and
+uses the local index for everything else.
 """
 
 import os
@@ -12,28 +18,53 @@ import json
 
 
 class CampaignVectorStore:
-    """ChromaDB wrapper with campaign-specific persistence."""
+    """Vector collection with campaign-specific persistence (local index or ChromaDB)."""
+
+    BACKENDS = ("auto", "local", "chroma")
 
-    def __init__(self, campaign_dir: str, collection_name: str = "document_chunks"):
+    def __init__(self, campaign_dir: str, collection_name: str = "document_chunks", backend: Optional[str] = None):
         """
         Initialize the vector store for a campaign.
 
         Args:
             campaign_dir: Path to the campaign folder
                          (e.g., world-state/campaigns/my-campaign/)
-            collection_name: Name of the ChromaDB collection
+            collection_name: Name of the collection
+            backend: 'local', 'chroma' or 'auto' (default: ASTRAL_VECTOR_BACKEND, else auto)
         """
         self.campaign_dir = Path(campaign_dir)
         self.vectors_dir = self.campaign_dir / "vectors"
         self.collection_name = collection_name
+        self.backend = self.resolve_backend(self.vectors_dir, backend)
         self._client = None
         self._collection = None
+        self._lists_only = False
 
         # Ensure vectors directory exists
         self.vectors_dir.mkdir(parents=True, exist_ok=True)
 
+    @classmethod
+    def resolve_backend(cls, vectors_dir: Path, backend: Optional[str] = None) -> str:
+        """Engine for a vectors folder: 'local' or 'chroma'"""
+        backend = (backend or os.environ.get("ASTRAL_VECTOR_BACKEND", "auto")).strip().lower() or "auto"
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"Unknown vector backend: {backend} (use one of {', '.join(cls.BACKENDS)})")
+        if backend == "auto":
+            existing_chroma = (Path(vectors_dir) / "chroma.sqlite3").exists()
+            return "chroma" if existing_chroma and cls.chroma_available() else "local"
+        return backend
+
     @staticmethod
     def is_available() -> bool:
+        """Check if a vector engine is available (numpy for the local index, or ChromaDB)."""
+        try:
+            import numpy
+            return True
+        except ImportError:
+            return CampaignVectorStore.chroma_available()
+
+    @staticmethod
+    def chroma_available() -> bool:
         """Check if ChromaDB is available."""
         try:
             import chromadb
@@ -42,7 +73,13 @@ class CampaignVectorStore:
             return False
 
     def _ensure_client(self):
-        """Lazy-load ChromaDB client and collection."""
+        """Lazy-load the collection (and the ChromaDB client)."""
+        if self._collection is not None:
+            return
+        if self.backend == "local":
+            from app.import_pipeline.vector_index import LocalVectorIndex
+            self._collection = LocalVectorIndex.for_dir(self.vectors_dir / self.collection_name)
+            return
         if self._client is None:
             import chromadb
             from chromadb.config import Settings
@@ -74,13 +111,33 @@ class CampaignVectorStore:
 
         Args:
             chunks: List of text chunks
-            embeddings: List of embedding vectors (as lists, not numpy arrays)
+            embeddings: Embedding vectors (n x dim numpy array, or list of vectors)
             metadatas: Optional list of metadata dicts per chunk
             ids: Optional list of unique IDs. Auto-generated if not provided.
 
         Returns:
             Number of chunks added
         """
+        return self._write("add", chunks, embeddings, metadatas, ids)
+
+    def upsert_chunks(
+        self,
+        chunks: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> int:
+        """
+        Add chunks, replacing any already stored under the same IDs.
+
+        Args: as add_chunks
+
+        Returns:
+            Number of chunks written
+        """
+        return self._write("upsert", chunks, embeddings, metadatas, ids)
+
+    def _write(self, method: str, chunks, embeddings, metadatas, ids) -> int:
         self._ensure_client()
 
         if len(chunks) == 0:
@@ -96,20 +153,20 @@ class CampaignVectorStore:
         if metadatas is None:
             metadatas = [{"index": i} for i in range(len(chunks))]
 
-        # Ensure embeddings are lists (ChromaDB requirement)
+        # Numpy matrices go straight through; older ChromaDB releases only
+        # take lists, so fall back to converting once if one is rejected
+        if getattr(embeddings, "ndim", None) == 2 and not self._lists_only:
+            try:
+                getattr(self._collection, method)(documents=chunks, embeddings=embeddings, metadatas=metadatas, ids=ids)
+                return len(chunks)
+            except ValueError:
+                self._lists_only = True
+
         embeddings_list = [
             emb.tolist() if hasattr(emb, 'tolist') else list(emb)
             for emb in embeddings
         ]
-
-        # Add to collection
-        self._collection.add(
-            documents=chunks,
-            embeddings=embeddings_list,
-            metadatas=metadatas,
-            ids=ids
-        )
-
+        getattr(self._collection, method)(documents=chunks, embeddings=embeddings_list, metadatas=metadatas, ids=ids)
         return len(chunks)
 
     def query_similar(
@@ -208,6 +265,45 @@ class CampaignVectorStore:
 
         return chunks
 
+    def get_ids(self, where: Optional[Dict] = None) -> List[str]:
+        """
+        IDs of stored chunks, optionally filtered by metadata.
+
+        Args:
+            where: Optional metadata filter (e.g. {"document": name})
+
+        Returns:
+            List of chunk IDs
+        """
+        self._ensure_client()
+        return list(self._collection.get(where=where, include=[])["ids"])
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> int:
+        """
+        Replace the metadata of stored chunks (embeddings are untouched).
+
+        Returns:
+            Number of chunks updated
+        """
+        self._ensure_client()
+        if len(ids) == 0:
+            return 0
+        self._collection.update(ids=ids, metadatas=metadatas)
+        return len(ids)
+
+    def delete_ids(self, ids: List[str]) -> int:
+        """
+        Delete chunks by ID.
+
+        Returns:
+            Number of IDs deleted
+        """
+        self._ensure_client()
+        if len(ids) == 0:
+            return 0
+        self._collection.delete(ids=ids)
+        return len(ids)
+
     def count(self) -> int:
         """Get total number of chunks in the collection."""
         self._ensure_client()
@@ -222,7 +318,7 @@ class CampaignVectorStore:
 
         counts = {}
         for metadata in results["metadatas"]:
-            cat = metadata.get("category", "uncategorized")
+            cat = (metadata or {}).get("category", "uncategorized")
             counts[cat] = counts.get(cat, 0) + 1
 
         return counts
@@ -230,6 +326,9 @@ class CampaignVectorStore:
     def clear(self):
         """Clear all chunks from the collection."""
         self._ensure_client()
+        if self.backend == "local":
+            self._collection.clear()
+            return
         # Delete collection and recreate
         self._client.delete_collection(self.collection_name)
         self._collection = self._client.create_collection(
@@ -241,11 +340,14 @@ class CampaignVectorStore:
         """
         Persist the vector store to disk.
 
-        Note: ChromaDB PersistentClient auto-persists, but this method
-        is kept for explicit clarity and future compatibility.
+        Both engines persist every write (ChromaDB's PersistentClient, the
+        local index's atomic index.json). For the local index this also
+        builds the HNSW graph of a large collection up front, so the first
+        query after an import doesn't pay for it.
         """
-        # PersistentClient handles this automatically
-        pass
+        self._ensure_client()
+        if self.backend == "local":
+            self._collection.prepare()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
@@ -255,6 +357,7 @@ class CampaignVectorStore:
             "campaign_dir": str(self.campaign_dir),
             "vectors_dir": str(self.vectors_dir),
             "collection_name": self.collection_name,
+            "backend": self.backend,
             "total_chunks": self.count(),
             "by_category": self.count_by_category(),
         }
@@ -1,14 +1,20 @@
 """DM orchestrator — Claude API tool-use loop driving the game session."""
 
-import json
+import logging
 import os
+import time
+from itertools import groupby
 from pathlib import Path
 from typing import AsyncGenerator
 
 import anthropic
 
+from app.game import codec
+from app.game.session_log import SessionLog
 from app.orchestrator.parser import strip_markers
-from app.orchestrator.tools import TOOL_SCHEMAS, ToolHandler
+from app.orchestrator.tools import TOOL_SCHEMAS, get_tool_handler
+
+log = logging.getLogger(__name__)
 
 PROMPTS_DIR = Path(__file__).parent / "prompts"
 MAX_TOOL_ROUNDS = 10
@@ -26,7 +32,7 @@ def build_context_block(campaign_dir: Path) -> str:
     # Campaign overview
     overview_path = campaign_dir / "campaign-overview.json"
     if overview_path.exists():
-        overview = json.loads(overview_path.read_text())
+        overview = codec.read_file(overview_path)
         parts.append(f"Campaign: {overview.get('campaign_name', 'Unknown')}")
         pos = overview.get("player_position", {})
         if pos.get("current_location"):
@@ -36,18 +42,17 @@ def build_context_block(campaign_dir: Path) -> str:
     # Character summary
     char_path = campaign_dir / "character.json"
     if char_path.exists():
-        char = json.loads(char_path.read_text())
+        char = codec.read_file(char_path)
         parts.append(
             f"Player character: {char.get('name', '?')} — "
             f"Level {char.get('level', 1)} {char.get('race', '?')} {char.get('class', '?')}, "
             f"HP {char.get('hp', {}).get('current', '?')}/{char.get('hp', {}).get('max', '?')}"
         )
 
-    # Session log tail
-    log_path = campaign_dir / "session-log.md"
-    if log_path.exists():
-        lines = log_path.read_text().strip().split("\n")
-        tail = lines[-20:] if len(lines) > 20 else lines
+    # Session log tail, read back from the end of the file
+    session_log = SessionLog.for_path(campaign_dir / "session-log.md")
+    if session_log.exists():
+        tail = session_log.tail(20)
         parts.append(f"Recent session log:\n{''.join(l + chr(10) for l in tail)}")
 
     return "\n\n".join(parts)
@@ -61,7 +66,7 @@ class DMOrchestrator:
         self.data_dir = data_dir
         self.client = anthropic.AsyncAnthropic()
         self.model = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5-20250929")
-        self.tools = ToolHandler(campaign_dir, data_dir)
+        self.tools = get_tool_handler(campaign_dir, data_dir)
         self.system_prompt = load_system_prompt()
         self.context = build_context_block(campaign_dir)
         self.messages: list[dict] = []
@@ -135,29 +140,39 @@ class DMOrchestrator:
                             })
                             pending_tools.append(block)
 
-            # Stream closed — now process tools (safe to yield/suspend)
+            # Stream closed — now process tools (safe to yield/suspend), in
+            # call order. Each consecutive run of non-roll calls executes as
+            # one batch (independent reads concurrently, writes coalesced
+            # under the campaign lock); roll requests suspend in between.
             tool_results = []
-            for block in pending_tools:
-                if block.name == "roll_dice":
-                    yield {
-                        "type": "roll_request",
-                        "tool_use_id": block.id,
-                        "notation": block.input["notation"],
-                        "reason": block.input.get("reason", ""),
-                    }
-                    result = self._roll_result
-                    self._roll_result = None
+            for is_roll, run in groupby(pending_tools, key=lambda b: b.name == "roll_dice"):
+                run = list(run)
+                if is_roll:
+                    results = []
+                    for block in run:
+                        yield {
+                            "type": "roll_request",
+                            "tool_use_id": block.id,
+                            "notation": block.input["notation"],
+                            "reason": block.input.get("reason", ""),
+                        }
+                        results.append(self._roll_result)
+                        self._roll_result = None
                 else:
-                    result = self.tools.execute(block.name, block.input)
-
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": block.id,
-                    "content": json.dumps(result, default=str),
-                })
+                    round_start = time.perf_counter()
+                    async with self.tools.lock.async_guard():
+                        results = await self.tools.execute_round_async([(b.name, b.input) for b in run])
+                    log.info("Tool round: %d calls in %.1f ms", len(run), (time.perf_counter() - round_start) * 1000)
+
+                for block, result in zip(run, results):
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": codec.dumps(result, pretty=False, default=str),
+                    })
 
-                if block.name in ("update_hp", "update_xp", "update_inventory", "update_gold"):
-                    yield {"type": "state", "updates": result}
+                    if block.name in ("update_hp", "update_xp", "update_inventory", "update_gold"):
+                        yield {"type": "state", "updates": result}
 
             self.messages.append({"role": "assistant", "content": assistant_content})
 
@@ -1,10 +1,18 @@
 """Tool schemas and handlers for the DM orchestrator."""
 
+import asyncio
 import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+from app.game import codec
 from app.game.dice import DiceRoller
+from app.game.locks import get_campaign_lock
 from app.game.player_manager import PlayerManager
 from app.game.npc_manager import NPCManager
 from app.game.location_manager import LocationManager
@@ -12,6 +20,118 @@ from app.game.session_manager import SessionManager
 from app.game.plot_manager import PlotManager
 from app.game.consequence_manager import ConsequenceManager
 from app.game.search import WorldSearcher
+from app.game.search_index import DEFAULT_LIMIT
+from app.game.query import parse_fields, project
+from app.game.sqlite_store import DB_FILE
+
+log = logging.getLogger(__name__)
+
+# Tool calls run on this pool so blocking I/O never stalls the event loop
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+
+# World-state files each tool reads and writes, used to schedule a round:
+# calls that write, or read something written in the same round, run in order
+# in one coalesced task; everything else runs concurrently.
+WORLD_FILES = frozenset({
+    "campaign-overview.json", "character.json", "npcs.json", "locations.json",
+    "plots.json", "facts.json", "consequences.json", "items.json",
+})
+TOOL_FILES: dict[str, tuple[frozenset, frozenset]] = {
+    "roll_dice": (frozenset(), frozenset()),
+    "lookup_monster": (frozenset(), frozenset()),
+    "lookup_spell": (frozenset(), frozenset()),
+    "search_world": (frozenset({"npcs.json", "locations.json", "plots.json", "facts.json", "consequences.json", "items.json"}), frozenset()),
+    "get_character": (frozenset({"character.json", "campaign-overview.json"}), frozenset()),
+    "get_npc": (frozenset({"npcs.json"}), frozenset()),
+    "list_npcs": (frozenset({"npcs.json"}), frozenset()),
+    "get_location": (frozenset({"locations.json"}), frozenset()),
+    "find_route": (frozenset({"locations.json"}), frozenset()),
+    "get_related": (frozenset({"npcs.json", "locations.json", "plots.json", "items.json"}), frozenset()),
+    "search_plots": (frozenset({"plots.json"}), frozenset()),
+    "check_consequences": (frozenset({"consequences.json"}), frozenset()),
+    "update_hp": (frozenset({"character.json"}), frozenset({"character.json"})),
+    "update_xp": (frozenset({"character.json"}), frozenset({"character.json"})),
+    "update_inventory": (frozenset({"character.json"}), frozenset({"character.json"})),
+    "update_gold": (frozenset({"character.json"}), frozenset({"character.json"})),
+    "update_npc": (frozenset({"npcs.json"}), frozenset({"npcs.json"})),
+    "create_npc": (frozenset({"npcs.json"}), frozenset({"npcs.json"})),
+    "update_plot": (frozenset({"plots.json"}), frozenset({"plots.json"})),
+    "move_party": (
+        frozenset({"campaign-overview.json", "locations.json", "character.json"}),
+        frozenset({"campaign-overview.json", "locations.json", "character.json"}),
+    ),
+}
+
+# Default projections for listing tools; the model can ask for other fields
+PLOT_SUMMARY_FIELDS = [
+    "type", "status", "description[:300]", "quest_giver", "npcs", "locations", "objectives", "events[-3:]",
+]
+NPC_SUMMARY_FIELDS = ["description[:200]", "attitude", "location", "tags", "events[-3:]"]
+NPC_DETAIL_FIELDS = ["*", "events[-10:]"]
+LIST_LIMIT = 10
+# Largest neighbourhood find_route will list
+MAX_ROUTE_HOPS = 3
+# Result-size cap (characters of compact JSON) for listing tools
+TOOL_RESULT_MAX_CHARS = int(os.getenv("TOOL_RESULT_MAX_CHARS", "12000"))
+
+_FIELDS_SCHEMA = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": "Fields to return, e.g. [\"status\", \"events[-3:]\", \"description[:200]\"]; \"*\" for all",
+}
+_PAGING_SCHEMA = {
+    "sort": {"type": "string", "description": "Field to sort by ('-field' for descending, 'name' for name)"},
+    "limit": {"type": "integer", "description": f"Maximum results (default {LIST_LIMIT})"},
+    "offset": {"type": "integer", "description": "Results to skip (use next_offset from a previous call)"},
+}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazy-init singleton thread pool shared by all sessions."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+        return _executor
+
+
+_handlers: dict[tuple[str, str], tuple[tuple, "ToolHandler"]] = {}
+_handlers_lock = threading.Lock()
+
+
+def _campaign_stamp(campaign_dir: Path) -> tuple:
+    """Identity of what a ToolHandler is bound to; any change forces a rebuild.
+
+    Covers the campaign directory itself (replaced or recreated) and whether
+    it is SQLite-backed. File contents are not part of it — managers read
+    through the JsonOperations document cache.
+    """
+    stamp = []
+    for path in (campaign_dir, campaign_dir / DB_FILE):
+        try:
+            st = path.stat()
+            stamp.append((st.st_dev, st.st_ino))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def get_tool_handler(campaign_dir: Path, data_dir: Path) -> "ToolHandler":
+    """Shared ToolHandler (and managers) for a campaign, reused across connections."""
+    key = (os.path.abspath(campaign_dir), os.path.abspath(data_dir))
+    stamp = _campaign_stamp(Path(campaign_dir))
+    with _handlers_lock:
+        entry = _handlers.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        if entry is not None:
+            log.info("Campaign %s changed on disk — rebuilding tool handler", key[0])
+        handler = ToolHandler(Path(campaign_dir), Path(data_dir))
+        _handlers[key] = (stamp, handler)
+        return handler
 
 
 TOOL_SCHEMAS = [
@@ -34,6 +154,7 @@ TOOL_SCHEMAS = [
             "type": "object",
             "properties": {
                 "query": {"type": "string", "description": "Search query"},
+                "limit": {"type": "integer", "description": "Maximum results, best matches first (default 20)"},
             },
             "required": ["query"],
         },
@@ -106,10 +227,25 @@ TOOL_SCHEMAS = [
             "type": "object",
             "properties": {
                 "name": {"type": "string", "description": "NPC name"},
+                "fields": _FIELDS_SCHEMA,
             },
             "required": ["name"],
         },
     },
+    {
+        "name": "list_npcs",
+        "description": "List NPCs, optionally filtered by attitude, location tag, or quest tag (summaries by default)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "attitude": {"type": "string", "description": "Filter by attitude (e.g. friendly, hostile)"},
+                "location": {"type": "string", "description": "Filter by location tag"},
+                "quest": {"type": "string", "description": "Filter by quest tag"},
+                "fields": _FIELDS_SCHEMA,
+                **_PAGING_SCHEMA,
+            },
+        },
+    },
     {
         "name": "update_npc",
         "description": "Record an event in an NPC's history",
@@ -157,6 +293,32 @@ TOOL_SCHEMAS = [
             "required": ["name"],
         },
     },
+    {
+        "name": "find_route",
+        "description": "Plan travel: the route between two locations (each leg with its path), "
+                       "or the locations within a few steps of one",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "from": {"type": "string", "description": "Starting location"},
+                "to": {"type": "string", "description": "Destination (omit to list nearby locations)"},
+                "hops": {"type": "integer", "description": "Steps to look around 'from' when no destination is given (default 1)"},
+            },
+            "required": ["from"],
+        },
+    },
+    {
+        "name": "get_related",
+        "description": "List everything connected to an NPC, location, plot, or item (linked NPCs, locations, plots, and items)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Entity name"},
+                "kind": {"type": "string", "enum": ["npcs", "locations", "plots", "items"], "description": "Entity kind (optional)"},
+            },
+            "required": ["name"],
+        },
+    },
     {
         "name": "search_plots",
         "description": "Find active quests and story threads",
@@ -165,6 +327,9 @@ TOOL_SCHEMAS = [
             "properties": {
                 "query": {"type": "string", "description": "Search query (optional)"},
                 "status": {"type": "string", "enum": ["active", "completed", "failed"], "description": "Filter by status"},
+                "type": {"type": "string", "description": "Filter by plot type (e.g. main, side)"},
+                "fields": _FIELDS_SCHEMA,
+                **_PAGING_SCHEMA,
             },
         },
     },
@@ -220,23 +385,118 @@ class ToolHandler:
         self.campaign_dir = campaign_dir
         self.data_dir = data_dir
         self.dice = DiceRoller()
-        self.player = PlayerManager(str(data_dir))
-        self.npc = NPCManager(str(data_dir))
-        self.location = LocationManager(str(data_dir))
-        self.session = SessionManager(str(data_dir))
-        self.plot = PlotManager(str(data_dir))
-        self.consequence = ConsequenceManager(str(data_dir))
-        self.searcher = WorldSearcher(str(data_dir))
+        self.player = PlayerManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.npc = NPCManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.location = LocationManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.session = SessionManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.plot = PlotManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.consequence = ConsequenceManager(str(data_dir), campaign_dir=str(campaign_dir))
+        self.searcher = WorldSearcher(str(data_dir), campaign_dir=str(campaign_dir))
+        self.lock = get_campaign_lock(campaign_dir)
+        self.timings: dict[str, dict[str, float]] = {}
+        self.payloads: dict[str, dict[str, int]] = {}
+        self._timings_lock = threading.Lock()
+
+    def execute_round(self, calls: list[tuple[str, dict]]) -> list[dict[str, Any]]:
+        """Execute one round of tool calls with their writes coalesced.
+
+        All calls run under the campaign lock inside a single transaction, so
+        several mutations of the same file reach disk as one write. Results
+        are returned in call order.
+        """
+        try:
+            with self.npc.json_ops.transaction():
+                return [self.execute(name, inp) for name, inp in calls]
+        except IOError as e:
+            return [{"error": f"Failed to save world state: {e}"} for _ in calls]
+
+    async def execute_round_async(self, calls: list[tuple[str, dict]]) -> list[dict[str, Any]]:
+        """Execute one round of tool calls on the tool pool, off the event loop.
+
+        Calls are scheduled from TOOL_FILES: mutating calls, and reads of any
+        file mutated in this round, run in their original order as one
+        coalesced execute_round() task. Independent reads (and network
+        lookups) run concurrently alongside it. Unknown tools are treated as
+        mutating everything. Results are returned in call order.
+        """
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+
+        access = [TOOL_FILES.get(name, (WORLD_FILES, WORLD_FILES)) for name, _ in calls]
+        written = frozenset().union(*(writes for _, writes in access))
+        serial = [i for i, (reads, writes) in enumerate(access) if writes or reads & written]
+        parallel = [i for i in range(len(calls)) if i not in serial]
+
+        jobs = [loop.run_in_executor(executor, self.execute, *calls[i]) for i in parallel]
+        if serial:
+            jobs.append(loop.run_in_executor(executor, self.execute_round, [calls[i] for i in serial]))
+        outputs = await asyncio.gather(*jobs)
+
+        results: list[dict[str, Any] | None] = [None] * len(calls)
+        for i, result in zip(parallel, outputs):
+            results[i] = result
+        if serial:
+            for i, result in zip(serial, outputs[-1]):
+                results[i] = result
+        return results
 
     def execute(self, tool_name: str, tool_input: dict) -> dict[str, Any]:
         """Execute a tool call and return the result."""
         handler = getattr(self, f"_handle_{tool_name}", None)
         if handler is None:
             return {"error": f"Unknown tool: {tool_name}"}
+        start = time.perf_counter()
         try:
             return handler(tool_input)
         except Exception as e:
             return {"error": f"Tool {tool_name} failed: {str(e)}"}
+        finally:
+            self._record_timing(tool_name, (time.perf_counter() - start) * 1000)
+
+    def _record_timing(self, tool_name: str, elapsed_ms: float):
+        """Accumulate per-tool call count and latency."""
+        log.debug("Tool %s took %.1f ms", tool_name, elapsed_ms)
+        with self._timings_lock:
+            stats = self.timings.setdefault(tool_name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def get_timings(self) -> dict[str, dict[str, float]]:
+        """Per-tool timing summary: calls, total_ms, avg_ms, max_ms."""
+        with self._timings_lock:
+            return {
+                name: {**stats, "avg_ms": stats["total_ms"] / stats["calls"]}
+                for name, stats in self.timings.items()
+            }
+
+    @staticmethod
+    def _not_found(label: str, name: str, suggestions: list[str]) -> dict:
+        """Error result for a failed lookup, with the closest names so the model can retry."""
+        result: dict[str, Any] = {"error": f"{label} '{name}' not found"}
+        if suggestions:
+            result["did_you_mean"] = suggestions
+        return result
+
+    def _record_payload(self, tool_name: str, stats: dict[str, int]):
+        """Accumulate result bytes sent vs. the untrimmed entities they replaced."""
+        saved = max(stats["full_bytes"] - stats["bytes"], 0)
+        log.debug("Tool %s returned %d bytes (%d saved)", tool_name, stats["bytes"], saved)
+        with self._timings_lock:
+            totals = self.payloads.setdefault(tool_name, {"calls": 0, "bytes": 0, "full_bytes": 0, "bytes_saved": 0})
+            totals["calls"] += 1
+            totals["bytes"] += stats["bytes"]
+            totals["full_bytes"] += stats["full_bytes"]
+            totals["bytes_saved"] += saved
+
+    def get_payload_stats(self) -> dict[str, dict[str, int]]:
+        """Per-tool result size summary: calls, bytes, full_bytes, bytes_saved."""
+        with self._timings_lock:
+            return {name: dict(totals) for name, totals in self.payloads.items()}
+
+    def get_search_cache_stats(self) -> dict[str, Any]:
+        """Search result cache counters: hits, misses, stale, evictions, entries, hit_rate."""
+        return self.searcher.results.stats()
 
     def _handle_roll_dice(self, inp: dict) -> dict:
         result = self.dice.roll(inp["notation"])
@@ -244,7 +504,7 @@ class ToolHandler:
         return result
 
     def _handle_search_world(self, inp: dict) -> dict:
-        return self.searcher.search_all(inp["query"])
+        return self.searcher.search_hybrid(inp["query"], inp.get("limit", DEFAULT_LIMIT))
 
     def _handle_get_character(self, inp: dict) -> dict:
         name = inp.get("name")
@@ -272,11 +532,36 @@ class ToolHandler:
 
     def _handle_get_npc(self, inp: dict) -> dict:
         result = self.npc.get_npc_status(inp["name"])
-        return result or {"error": f"NPC '{inp['name']}' not found"}
+        if not result:
+            return self._not_found("NPC", inp["name"], self.npc.suggest_names(inp["name"]))
+        full_bytes = len(codec.dumps_bytes(result, pretty=False, default=str))
+        result = project(inp["name"], result, parse_fields(inp.get("fields") or NPC_DETAIL_FIELDS))
+        self._record_payload("get_npc", {
+            "bytes": len(codec.dumps_bytes(result, pretty=False, default=str)), "full_bytes": full_bytes,
+        })
+        return result
+
+    def _handle_list_npcs(self, inp: dict) -> dict:
+        where = {
+            field: inp[key]
+            for key, field in (("attitude", "attitude"), ("location", "tags.locations"), ("quest", "tags.quests"))
+            if inp.get(key)
+        }
+        page, stats = self.npc.query_npcs(
+            where, inp.get("fields") or NPC_SUMMARY_FIELDS, inp.get("sort"),
+            inp.get("limit", LIST_LIMIT), inp.get("offset", 0), TOOL_RESULT_MAX_CHARS,
+        )
+        self._record_payload("list_npcs", stats)
+        return page
 
     def _handle_update_npc(self, inp: dict) -> dict:
         success = self.npc.update_npc(inp["name"], inp["event"])
-        return {"success": success, "npc": inp["name"], "event": inp["event"]}
+        result: dict[str, Any] = {"success": success, "npc": inp["name"], "event": inp["event"]}
+        if not success:
+            suggestions = self.npc.suggest_names(inp["name"])
+            if suggestions:
+                result["did_you_mean"] = suggestions
+        return result
 
     def _handle_create_npc(self, inp: dict) -> dict:
         success = self.npc.create_npc(inp["name"], inp["description"], inp["attitude"])
@@ -287,18 +572,41 @@ class ToolHandler:
 
     def _handle_get_location(self, inp: dict) -> dict:
         result = self.location.get_location(inp["name"])
-        return result or {"error": f"Location '{inp['name']}' not found"}
+        return result or self._not_found("Location", inp["name"], self.location.suggest_names(inp["name"]))
+
+    def _handle_find_route(self, inp: dict) -> dict:
+        start, destination = inp.get("from"), inp.get("to")
+        if not start:
+            return {"error": "Missing required parameter 'from'"}
+        for name in (start, destination):
+            if name and not self.location.resolve_place(name):
+                return self._not_found("Location", name, self.location.suggest_names(name))
+        if destination:
+            route = self.location.find_route(start, destination)
+            return route or {"error": f"No known route from '{start}' to '{destination}'"}
+        return self.location.get_nearby(start, min(max(inp.get("hops", 1), 1), MAX_ROUTE_HOPS))
+
+    def _handle_get_related(self, inp: dict) -> dict:
+        result = self.searcher.get_related(inp["name"], inp.get("kind"))
+        return result or {"error": f"No NPC, location, plot, or item named '{inp['name']}'"}
 
     def _handle_search_plots(self, inp: dict) -> dict:
-        query = inp.get("query")
-        status = inp.get("status")
-        if query:
-            return self.plot.search_plots(query)
-        return self.plot.list_plots(status=status)
+        where = {field: inp[field] for field in ("status", "type") if inp.get(field)}
+        page, stats = self.plot.query_plots(
+            inp.get("query"), where, inp.get("fields") or PLOT_SUMMARY_FIELDS, inp.get("sort"),
+            inp.get("limit", LIST_LIMIT), inp.get("offset", 0), TOOL_RESULT_MAX_CHARS,
+        )
+        self._record_payload("search_plots", stats)
+        return page
 
     def _handle_update_plot(self, inp: dict) -> dict:
         success = self.plot.update_plot(inp["name"], inp["event"])
-        return {"success": success, "plot": inp["name"]}
+        result: dict[str, Any] = {"success": success, "plot": inp["name"]}
+        if not success:
+            suggestions = self.plot.suggest_names(inp["name"])
+            if suggestions:
+                result["did_you_mean"] = suggestions
+        return result
 
     def _handle_check_consequences(self, inp: dict) -> dict:
         pending = self.consequence.check_pending()
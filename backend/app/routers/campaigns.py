@@ -1,10 +1,13 @@
 """Campaign management routes — list, detail, import."""
 
-import json
 from pathlib import Path
 
 from fastapi import APIRouter, UploadFile
 
+from app.game import codec
+from app.game.json_ops import JsonOperations
+from app.game.sqlite_store import SqliteStore
+
 router = APIRouter()
 
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
@@ -27,10 +30,10 @@ async def list_campaigns():
         overview_path = campaign_dir / "campaign-overview.json"
         if overview_path.exists():
             try:
-                overview = json.loads(overview_path.read_text())
+                overview = codec.read_file(overview_path)
                 campaign["name"] = overview.get("campaign_name", campaign_dir.name)
                 campaign["sessionCount"] = overview.get("session_count", 0)
-            except (json.JSONDecodeError, IOError):
+            except (codec.JSONDecodeError, IOError):
                 pass
 
         # Read character
@@ -38,26 +41,30 @@ async def list_campaigns():
         campaign["hasCharacter"] = char_path.exists()
         if char_path.exists():
             try:
-                char = json.loads(char_path.read_text())
+                char = codec.read_file(char_path)
                 campaign["character"] = {
                     "name": char.get("name", "Unknown"),
                     "race": char.get("race", "?"),
                     "class": char.get("class", "?"),
                     "level": char.get("level", 1),
                 }
-            except (json.JSONDecodeError, IOError):
+            except (codec.JSONDecodeError, IOError):
                 pass
 
         # Count entities
         counts = {}
+        store = SqliteStore.for_campaign(campaign_dir)
         for entity_file in ["npcs.json", "locations.json", "plots.json"]:
+            if store is not None:
+                counts[entity_file.replace(".json", "")] = store.count(SqliteStore.table_for(entity_file))
+                continue
             entity_path = campaign_dir / entity_file
             if entity_path.exists():
                 try:
-                    data = json.loads(entity_path.read_text())
+                    data = codec.read_file(entity_path)
                     key = entity_file.replace(".json", "")
                     counts[key] = len(data) if isinstance(data, (dict, list)) else 0
-                except (json.JSONDecodeError, IOError):
+                except (codec.JSONDecodeError, IOError):
                     pass
         if counts:
             campaign["entityCounts"] = counts
@@ -76,14 +83,20 @@ async def get_campaign(campaign_id: str):
 
     result = {"id": campaign_id}
 
+    # Entity files may live in campaign.db; JsonOperations reads either backend
+    if SqliteStore.for_campaign(campaign_dir) is not None:
+        json_ops = JsonOperations(str(campaign_dir))
+        for filename in ["npcs.json", "locations.json", "plots.json"]:
+            result[filename.replace(".json", "")] = json_ops.load_json(filename, readonly=True)
+
     # Load all JSON files
     for filename in ["campaign-overview.json", "character.json", "npcs.json", "locations.json", "plots.json"]:
         filepath = campaign_dir / filename
-        if filepath.exists():
+        key = filename.replace(".json", "").replace("-", "_")
+        if filepath.exists() and key not in result:
             try:
-                key = filename.replace(".json", "").replace("-", "_")
-                result[key] = json.loads(filepath.read_text())
-            except (json.JSONDecodeError, IOError):
+                result[key] = codec.read_file(filepath)
+            except (codec.JSONDecodeError, IOError):
                 pass
 
     return result
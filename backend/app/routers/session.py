@@ -1,8 +1,6 @@
 """WebSocket gameplay session."""
 
 import asyncio
-import hashlib
-import json
 import logging
 from pathlib import Path
 
@@ -10,6 +8,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.audio.pipeline import AudioPipeline
 from app.audio.streaming import StreamingAudioBuffer
+from app.game import codec
+from app.game.session_log import SessionLog
 from app.orchestrator.dm import DMOrchestrator
 
 log = logging.getLogger(__name__)
@@ -30,11 +30,8 @@ CACHE_FILE = "opening-cache.json"
 
 
 def _session_log_hash(campaign_dir: Path) -> str:
-    """Hash the session log content to detect changes."""
-    log_path = campaign_dir / "session-log.md"
-    if not log_path.exists():
-        return ""
-    return hashlib.sha256(log_path.read_bytes()).hexdigest()
+    """Fingerprint of the session log to detect changes (without reading all of it)."""
+    return SessionLog.for_path(campaign_dir / "session-log.md").fingerprint()
 
 
 def _load_opening_cache(campaign_dir: Path, current_hash: str) -> list[dict] | None:
@@ -43,10 +40,10 @@ def _load_opening_cache(campaign_dir: Path, current_hash: str) -> list[dict] | N
     if not cache_path.exists():
         return None
     try:
-        cache = json.loads(cache_path.read_text())
+        cache = codec.read_file(cache_path)
         if cache.get("session_log_hash") == current_hash:
             return cache.get("messages", [])
-    except (json.JSONDecodeError, KeyError):
+    except (codec.JSONDecodeError, KeyError):
         pass
     return None
 
@@ -54,10 +51,10 @@ def _load_opening_cache(campaign_dir: Path, current_hash: str) -> list[dict] | N
 def _save_opening_cache(campaign_dir: Path, current_hash: str, messages: list[dict]) -> None:
     """Save opening messages to cache."""
     cache_path = campaign_dir / CACHE_FILE
-    cache_path.write_text(json.dumps({
+    cache_path.write_bytes(codec.dumps_bytes({
         "session_log_hash": current_hash,
         "messages": messages,
-    }))
+    }, pretty=False))
 
 
 @router.websocket("/ws/session/{campaign_id}")
@@ -86,7 +83,7 @@ async def session_ws(websocket: WebSocket, campaign_id: str):
     # Send initial state
     char_path = campaign_dir / "character.json"
     if char_path.exists():
-        char = json.loads(char_path.read_text())
+        char = codec.read_file(char_path)
         await websocket.send_json({"type": "state", "updates": char})
 
     # Opening turn — serve from cache if session log hasn't changed
@@ -105,11 +102,7 @@ async def session_ws(websocket: WebSocket, campaign_id: str):
     else:
         log.info("Opening cache MISS for %s — generating fresh opening", campaign_id)
         # Generate fresh opening
-        log_path = campaign_dir / "session-log.md"
-        has_history = False
-        if log_path.exists():
-            log_text = log_path.read_text().strip()
-            has_history = "### Session Ended:" in log_text
+        has_history = SessionLog.for_path(campaign_dir / "session-log.md").ended_count() > 0
 
         if has_history:
             opening_prompt = (
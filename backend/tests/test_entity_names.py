@@ -0,0 +1,43 @@
+"""Writes resolve names by case and alias only; typos get suggestions instead"""
+
+import json
+
+import pytest
+
+from app.game.npc_manager import NPCManager
+from app.game.plot_manager import PlotManager
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    (tmp_path / "npcs.json").write_text(json.dumps({
+        "Gundren Rockseeker": {"description": "dwarf", "attitude": "friendly"},
+        "Sildar Hallwinter": {"description": "knight"},
+    }))
+    (tmp_path / "plots.json").write_text(json.dumps({
+        "Find Cragmaw Castle": {"status": "active"},
+        "Redbrand Hideout": {"status": "active"},
+    }))
+    return str(tmp_path)
+
+
+def test_update_npc_does_not_autocorrect(campaign):
+    npcs = NPCManager(campaign_dir=campaign)
+    assert not npcs.update_npc("Nundro Rockseeker", "freed from the mine")
+    assert not npcs.get_npc_status("Gundren Rockseeker").get("events")
+    assert "Gundren Rockseeker" in npcs.suggest_names("Nundro Rockseeker")
+
+
+def test_update_npc_accepts_case_variants(campaign):
+    npcs = NPCManager(campaign_dir=campaign)
+    assert npcs.update_npc("sildar hallwinter", "joined the party")
+    assert npcs.get_npc_status("Sildar Hallwinter")["events"][-1]["event"] == "joined the party"
+
+
+def test_plot_writes_do_not_autocorrect(campaign):
+    plots = PlotManager(campaign_dir=campaign)
+    assert not plots.complete_plot("Redbrand Hideout 2", "cleared")
+    assert not plots.fail_plot("Find Cragmaw Hideout")
+    assert not plots.update_plot("Redbrand Hideout 2", "scouted")
+    assert plots.get_plot("Redbrand Hideout")["status"] == "active"
+    assert plots.suggest_names("Redbrand Hideout 2")[0] == "Redbrand Hideout"
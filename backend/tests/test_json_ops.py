@@ -0,0 +1,130 @@
+"""Transaction journal: failed applies, replay and recovery ordering"""
+
+import json
+
+import pytest
+
+from app.game import codec
+from app.game import json_ops
+from app.game.json_ops import JsonOperations, JOURNAL_FILE
+
+
+def read(directory, name):
+    with open(directory / name) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    for name in ("a.json", "b.json"):
+        (tmp_path / name).write_text(json.dumps({"v": 0}))
+    (tmp_path / "npcs.json").write_text(json.dumps({"Sildar": {"description": "knight"}}))
+    return tmp_path
+
+
+@pytest.fixture
+def fail_b(monkeypatch):
+    """Make writes of b.json fail with ENOSPC the next `failures` times"""
+    real = json_ops._write_file
+    state = {"failures": 0}
+
+    def flaky(path, *args, **kwargs):
+        if str(path).endswith("b.json") and state["failures"]:
+            state["failures"] -= 1
+            raise OSError(28, "No space left on device")
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(json_ops, "_write_file", flaky)
+    return state
+
+
+def commit_both(ops, value):
+    with ops.transaction():
+        ops.save_json("a.json", {"v": value})
+        ops.save_json("b.json", {"v": value})
+
+
+def test_commit_retries_failed_apply(campaign, fail_b):
+    ops = JsonOperations(str(campaign))
+    fail_b["failures"] = 1
+    commit_both(ops, 1)
+    assert read(campaign, "a.json") == read(campaign, "b.json") == {"v": 1}
+    assert not (campaign / JOURNAL_FILE).exists()
+
+
+def test_failed_apply_raises_and_keeps_journal(campaign, fail_b):
+    ops = JsonOperations(str(campaign))
+    fail_b["failures"] = 2
+    with pytest.raises(IOError):
+        commit_both(ops, 1)
+    assert (campaign / JOURNAL_FILE).exists()
+
+
+def test_next_transaction_replays_pending_journal(campaign, fail_b):
+    ops = JsonOperations(str(campaign))
+    fail_b["failures"] = 2
+    with pytest.raises(IOError):
+        commit_both(ops, 1)
+
+    with ops.transaction():
+        ops.save_json("a.json", {"v": 2})
+    assert read(campaign, "a.json") == {"v": 2}
+    assert read(campaign, "b.json") == {"v": 1}
+    assert not (campaign / JOURNAL_FILE).exists()
+
+
+def test_writer_replays_before_writing(campaign, fail_b):
+    ops = JsonOperations(str(campaign))
+    fail_b["failures"] = 2
+    with pytest.raises(IOError):
+        commit_both(ops, 1)
+
+    assert ops.save_json("a.json", {"v": 5})
+    JsonOperations(str(campaign))  # a restart must not replay over newer data
+    assert read(campaign, "a.json") == {"v": 5}
+    assert read(campaign, "b.json") == {"v": 1}
+
+
+def test_writer_refuses_while_journal_cannot_apply(campaign, fail_b):
+    ops = JsonOperations(str(campaign))
+    fail_b["failures"] = 2
+    with pytest.raises(IOError):
+        commit_both(ops, 1)
+
+    fail_b["failures"] = 1
+    assert not ops.save_json("a.json", {"v": 5})
+    assert read(campaign, "a.json") == {"v": 1}
+    assert (campaign / JOURNAL_FILE).exists()
+
+
+def test_open_replays_interrupted_commit(campaign, monkeypatch):
+    ops = JsonOperations(str(campaign))
+
+    def crash(journal, directory, replay=False):
+        raise KeyboardInterrupt  # process dies after the journal landed
+
+    monkeypatch.setattr(json_ops, "_apply_journal", crash)
+    with pytest.raises(KeyboardInterrupt):
+        commit_both(ops, 1)
+    monkeypatch.undo()
+    assert read(campaign, "a.json") == {"v": 0}
+
+    JsonOperations(str(campaign))
+    assert read(campaign, "a.json") == read(campaign, "b.json") == {"v": 1}
+    assert not (campaign / JOURNAL_FILE).exists()
+
+
+def test_replay_appends_events_once(campaign):
+    ops = JsonOperations(str(campaign))
+    journal = {
+        "id": "t1",
+        "files": [{"path": str(campaign / "a.json"), "indent": 2, "data": {"v": 1}}],
+        "events": [["npcs.json", "Sildar", {"event": "rescued"}]],
+    }
+    # Crash after applying but before the journal was removed
+    codec.write_file(campaign / JOURNAL_FILE, journal)
+    json_ops._apply_journal(journal, campaign)
+
+    ops = JsonOperations(str(campaign))
+    assert ops.load_json("npcs.json")["Sildar"]["events"] == [{"event": "rescued"}]
+    assert not (campaign / JOURNAL_FILE).exists()
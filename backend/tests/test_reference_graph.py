@@ -0,0 +1,78 @@
+"""Incremental reference graph maintenance matches a fresh build"""
+
+import json
+
+import pytest
+
+from app.game.json_ops import JsonOperations
+from app.game.reference_graph import ReferenceGraph, SOURCES
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    files = {
+        "npcs.json": {
+            "Sildar Hallwinter": {"location": "Phandalin", "quests": ["Find Cragmaw Castle"]},
+            "Toblen Stonehill": {"location": "Stonehill Inn"},
+        },
+        "locations.json": {"Phandalin": {}, "Stonehill Inn": {}, "Cragmaw Hideout": {}},
+        "plots.json": {
+            "Find Cragmaw Castle": {"npcs": ["Sildar Hallwinter", "Gundren Rockseeker"],
+                                    "locations": ["Cragmaw Castle"]},
+        },
+        "items.json": {"Spider Staff": {"location": "Cragmaw Castle"}},
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_text(json.dumps(data))
+    return tmp_path
+
+
+def snapshot(graph, ops):
+    return {
+        (kind, name): graph.related(ops, kind, name)
+        for filename, kind in SOURCES.items()
+        for name in ops.load_json(filename)
+    }
+
+
+def assert_matches_fresh(graph, ops, directory):
+    fresh = ReferenceGraph(directory)
+    assert snapshot(graph, ops) == snapshot(fresh, ops)
+    assert graph.stats() == fresh.stats()
+
+
+def test_edits_relink_incrementally(campaign):
+    ops = JsonOperations(str(campaign))
+    graph = ReferenceGraph(campaign)
+    assert graph.related(ops, "npcs", "Sildar Hallwinter") == {
+        "locations": ["Phandalin"], "plots": ["Find Cragmaw Castle"]}
+
+    # A newly added entity is linked from texts that already named it
+    ops.update_json("npcs.json", {"Gundren Rockseeker": {"location": "Cragmaw Castle"}})
+    ops.update_json("locations.json", {"Cragmaw Castle": {}})
+    assert graph.related(ops, "locations", "Cragmaw Castle") == {
+        "items": ["Spider Staff"], "npcs": ["Gundren Rockseeker"], "plots": ["Find Cragmaw Castle"]}
+    assert_matches_fresh(graph, ops, campaign)
+
+    # Changed references re-link just that entity
+    ops.update_json("npcs.json", {"location": "Cragmaw Hideout"}, ["Toblen Stonehill"])
+    assert graph.related(ops, "locations", "Stonehill Inn") == {}
+    assert_matches_fresh(graph, ops, campaign)
+
+    # A removed entity disappears from both directions
+    ops.delete_key("npcs.json", "Sildar Hallwinter")
+    assert "npcs" not in graph.related(ops, "locations", "Phandalin")
+    assert graph.related(ops, "plots", "Find Cragmaw Castle")["npcs"] == ["Gundren Rockseeker"]
+    assert_matches_fresh(graph, ops, campaign)
+
+
+def test_event_append_skips_extraction(campaign, monkeypatch):
+    ops = JsonOperations(str(campaign))
+    graph = ReferenceGraph(campaign)
+    graph.refresh(ops)
+
+    calls = []
+    monkeypatch.setattr(ReferenceGraph, "_extract", staticmethod(lambda kind, data: calls.append(kind)))
+    assert ops.append_event("npcs.json", "Sildar Hallwinter", {"event": "rescued"})
+    assert not graph.refresh(ops)
+    assert calls == []